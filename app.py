@@ -11,17 +11,66 @@ from modules.data_loader import (
     load_vfm_data,
     load_grid_mapping,
     merge_vfm_with_district,
-    get_data_summary
+    get_data_summary,
+    count_vfm_grades,
+    preload_all_data,
+    prefetch_contract_type,
+    VFM_GRADE_CODES
+)
+from modules.snapshots import load_snapshot_store, get_snapshot
+from modules.timelapse import get_timelapse_map, TIMELAPSE_START
+from modules.map_builder import create_map, load_prerendered_map_html
+from modules.choropleth import create_grid_choropleth_map, create_district_choropleth_map
+from modules.skyline import get_skyline_frame
+from modules.metadata import load_metadata, load_count_cube, query_count_cube
+from modules.moments import (
+    load_moments,
+    correlation_from_moments,
+    MOMENT_FEATURE_LABELS
+)
+from modules.export import (
+    export_search_result,
+    export_matching_history,
+    EXPORT_MIME_TYPES
+)
+from modules.scoring import (
+    load_location_matrix,
+    apply_location_weights,
+    is_default_weights,
+    LOCATION_INDEX_COLUMNS,
+    LOCATION_INDEX_LABELS,
+    DEFAULT_WEIGHT
+)
+from modules.anomalies import (
+    load_anomaly_scores,
+    ANOMALY_Z_THRESHOLD
+)
+from modules.trends import (
+    load_trend_metrics,
+    TREND_FILTER_LABELS
+)
+from modules.scenarios import (
+    load_conversion_scenario,
+    apply_conversion_scenario,
+    CONVERSION_RATE_RANGE,
+    CONVERSION_RATE_STEP,
+    DEFAULT_CONVERSION_RATE
+)
+from modules.filters import (
+    build_filter_mask,
+    is_default_search,
+    get_visible_grade_codes,
+    attach_precomputed_columns,
+    PRICE_SLIDER_RANGE,
+    PRICE_SLIDER_STEP
 )
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
-import folium
-from streamlit_folium import st_folium
-from folium.plugins import HeatMap
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
+import time
+from functools import partial
 from pathlib import Path
 
 # 프로젝트 루트를 sys.path에 추가
@@ -260,6 +309,9 @@ def load_data_simple(contract_type):
         df_grid = load_grid_mapping()
         df = merge_vfm_with_district(df_vfm, df_grid)
 
+        # 사전 계산된 이상치 점수/플래그, 추세 지표 (행 순서 배열 → 컬럼 부착만)
+        df = attach_precomputed_columns(df, contract_type)
+
         if 'vfm_index' in df.columns:
             df['custom_vfm'] = df['vfm_index']
         else:
@@ -274,333 +326,54 @@ def load_data_simple(contract_type):
         return pd.DataFrame()
 
 
-def create_map(df, map_type="marker", contract_type="monthly", marker_limit=100, sort_order="desc", vfm_grades=None):
-    """지도 생성 - 입지 지표 5개 """
-
-    m = folium.Map(
-        location=[37.5665, 126.9780],
-        zoom_start=11,
-        tiles='CartoDB positron'
-    )
-
-    if df is None or len(df) == 0:
-        folium.Marker(
-            [37.5665, 126.9780],
-            popup="검색 결과가 없습니다",
-            icon=folium.Icon(color='red', icon='info-sign')
-        ).add_to(m)
-        return m
-
-    df_valid = df.dropna(subset=['lat', 'lon']).copy()
-    df_valid = df_valid.reset_index(drop=True)
-
-    if len(df_valid) == 0:
-        return m
-
-    # VFM 등급별 필터링
-    if vfm_grades and len(vfm_grades) > 0 and len(vfm_grades) < 3:
-        conditions = []
-        if 'excellent' in vfm_grades:
-            conditions.append(df_valid['custom_vfm'] >= 2.0)
-        if 'good' in vfm_grades:
-            conditions.append((df_valid['custom_vfm'] >= 1.0) & (
-                df_valid['custom_vfm'] < 2.0))
-        if 'normal' in vfm_grades:
-            conditions.append((df_valid['custom_vfm'] >= 0.5) & (
-                df_valid['custom_vfm'] < 1.0))
-
-        if conditions:
-            combined_condition = conditions[0]
-            for condition in conditions[1:]:
-                combined_condition = combined_condition | condition
-            df_valid = df_valid[combined_condition].copy()
-            df_valid = df_valid.reset_index(drop=True)
-
-    data_count = len(df_valid)
-    display_count = min(
-        marker_limit, data_count) if map_type == "marker" else data_count
-
-    # 계약 타입 라벨
-    contract_label = '월세 (전환보증금)' if contract_type == 'monthly' else '전세'
-
-    # 범례 HTML
-    legend_html = f"""
-    <div style="position: fixed; top: 10px; left: 50px; width: 280px; background-color: white; 
-                border: 2px solid #667eea; border-radius: 10px; padding: 12px; font-size: 13px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1); z-index: 9999;">
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;
-                    padding: 8px; margin: -12px -12px 10px -12px; border-radius: 8px 8px 0 0;
-                    font-weight: 600; text-align: center; font-size: 14px;">
-            📊 VFM 지수 범례 ({contract_label})
-        </div>
-        <div style="margin-bottom: 6px;">
-            <span style="color: green; font-size: 16px;">●</span>
-            <strong style="color: green; margin-left: 5px; font-size: 12px;">2.0 이상</strong>
-            <span style="font-size: 10px; color: #666; margin-left: 5px;">최우수</span>
-        </div>
-        <div style="margin-bottom: 6px;">
-            <span style="color: blue; font-size: 16px;">●</span>
-            <strong style="color: blue; margin-left: 5px; font-size: 12px;">1.0 ~ 2.0</strong>
-            <span style="font-size: 10px; color: #666; margin-left: 5px;">우수</span>
-        </div>
-        <div style="margin-bottom: 6px;">
-            <span style="color: orange; font-size: 16px;">●</span>
-            <strong style="color: orange; margin-left: 5px; font-size: 12px;">0.5 ~ 1.0</strong>
-            <span style="font-size: 10px; color: #666; margin-left: 5px;">보통</span>
-        </div>
-        <div style="margin-top: 8px; padding-top: 8px; border-top: 1px solid #e9ecef; font-size: 11px; color: #495057;">
-            <strong>📍 전체:</strong> {data_count:,}건<br>
-            <strong>🗺️ 표시:</strong> {display_count:,}건
-        </div>
-    </div>
-    """
-
-    m.get_root().html.add_child(folium.Element(legend_html))
-
-    # 히트맵
-    if map_type == "heatmap":
-        heat_data = []
-        for idx, row in df_valid.iterrows():
-            vfm = row.get('custom_vfm', 1.0)
-            normalized = min(vfm / 3.0, 1.0)
-            heat_data.append([row['lat'], row['lon'], float(normalized)])
-
-        if heat_data:
-            HeatMap(
-                heat_data,
-                min_opacity=0.3,
-                max_opacity=0.8,
-                radius=15,
-                blur=20,
-                gradient={0.0: 'red', 0.3: 'orange',
-                          0.5: 'yellow', 0.7: 'lime', 1.0: 'green'}
-            ).add_to(m)
-
-    # 마커
-    else:
-        total_count = len(df_valid)
-
-        if total_count <= marker_limit:
-            if sort_order == "desc":
-                df_display = df_valid.sort_values(
-                    'custom_vfm', ascending=False).copy()
-            else:
-                df_display = df_valid.sort_values(
-                    'custom_vfm', ascending=True).copy()
-            df_display = df_display.reset_index(drop=True)
-        else:
-            if sort_order == "desc":
-                df_display = df_valid.nlargest(
-                    marker_limit, 'custom_vfm').copy()
-            else:
-                df_display = df_valid.nsmallest(
-                    marker_limit, 'custom_vfm').copy()
-            df_display = df_display.reset_index(drop=True)
-
-        green_markers = []
-        blue_markers = []
-        orange_markers = []
-
-        for idx, row in df_display.iterrows():
-            vfm = float(row.get('custom_vfm', 1.0))
-
-            if vfm >= 2.0:
-                color = 'green'
-                icon = 'star'
-                grade = '최우수 (2.0+)'
-                marker_list = green_markers
-            elif vfm >= 1.0:
-                color = 'blue'
-                icon = 'home'
-                grade = '우수 (1.0~2.0)'
-                marker_list = blue_markers
-            else:
-                color = 'orange'
-                icon = 'home'
-                grade = '보통 (0.5~1.0)'
-                marker_list = orange_markers
-
-            size_cat = row.get('size_category', '미분류')
-
-            # 가격 정보
-            size_cat = row.get('size_category', '미분류')
-            current_price = row.get('total_deposit_median', 0)
-            future_price = row.get('future_price', 0)
-            price_change_pct = row.get('price_change_pct', 0)
-
-            # NameError 해결을 위해 price_label을 여기서 정의합니다.
-            if contract_type == 'monthly':
-                price_label = '전환보증금'
-                price_note = '<div style="font-size: 0.6rem; color: #888; margin-top: 2px;">※ 월세를 보증금으로 전환한 금액</div>'
-            else:
-                price_label = '전세가'
-                price_note = ''
-
-            price_html = f"""
-                <div style='margin-bottom: 8px;'>
-                    <div style='font-size: 0.75rem; color: #666; margin-bottom: 4px; font-weight: 600;'>
-                        💵 {contract_label} 정보
-                    </div>
-                    <div style='background: #e8f5e9; padding: 8px; border-radius: 4px;'>
-                        <div style='font-size: 0.7rem; color: #388e3c;'>💰 현재 {price_label}</div>
-                        <div style='font-size: 1.1rem; font-weight: 700; color: #1b5e20;'>{current_price:,.0f}만원</div>
-                        {price_note}
-                    </div>
-                    
-                </div>
-            """
-
-            # 예측 정보 HTML
-            if future_price > 0:
-                if price_change_pct > 0:
-                    trend_color = '#d32f2f'
-                    trend_icon = '📈'
-                    trend_text = '상승'
-                elif price_change_pct < 0:
-                    trend_color = '#1976d2'
-                    trend_icon = '📉'
-                    trend_text = '하락'
-                else:
-                    trend_color = '#757575'
-                    trend_icon = '➡️'
-                    trend_text = '보합'
-
-                price_diff = abs(future_price - current_price)
-
-                prediction_html = f"""
-                    <div style='background: #f5f5f5; padding: 8px; border-radius: 4px; margin-bottom: 8px; 
-                                border-left: 3px solid {trend_color};'>
-                        <div style='font-size: 0.7rem; color: #666; margin-bottom: 3px;'>
-                            {trend_icon} <strong>12개월 후 AI 예측</strong>
-                        </div>
-                        <div style='display: flex; justify-content: space-between; align-items: center;'>
-                            <div>
-                                <div style='font-size: 0.8rem; color: {trend_color}; font-weight: 600;'>
-                                    {future_price:,.0f}만원
-                                </div>
-                            </div>
-                            <div style='background: {trend_color}; color: white; 
-                                        padding: 2px 6px; border-radius: 3px; font-size: 0.7rem; font-weight: 600;'>
-                                {price_change_pct:+.1f}%
-                            </div>
-                        </div>
-                        <div style='font-size: 0.65rem; color: #999; margin-top: 2px;'>
-                            예상 {trend_text}: {price_diff:,.0f}만원
-                        </div>
-                    </div>
-                """
-            else:
-                prediction_html = ""
-
-            # ✅ 입지 지표 5개
-            trans_val = row.get('trans_index', 0)
-            conv_val = row.get('conv_index', 0)
-            env_val = row.get('env_index', 0)
-            hospital_val = row.get('hospital_index', 0)
-            safety_val = row.get('safety_score_scaled', 0)
-
-            popup_html = f"""
-            <div style='width: 300px; font-family: "Segoe UI", Arial, sans-serif; position: relative;'>
-                <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                            color: white; padding: 12px; border-radius: 8px 8px 0 0; 
-                            margin: -10px -10px 8px -10px; position: relative;'>
-                    <h4 style='margin: 0; font-size: 0.95rem; font-weight: 600; padding-right: 20px;'>
-                        📍 {row.get('district', '알 수 없음')} | 📏 {size_cat}
-                    </h4>
-                    <p style='margin: 3px 0 0 0; font-size: 0.7rem; opacity: 0.9;'>
-                        Grid ID: {row.get('grid_id', 'N/A')}
-                    </p>
-                </div>
-                <div style='padding: 8px;'>
-                    <div style='background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); 
-                                padding: 10px; border-radius: 6px; margin-bottom: 8px; text-align: center;
-                                border: 2px solid {color};'>
-                        <div style='font-size: 0.75rem; color: #6c757d; margin-bottom: 2px;'>VFM 지수</div>
-                        <div style='font-size: 1.6rem; font-weight: 700; color: {color};'>{vfm:.3f}</div>
-                        <div style='font-size: 0.65rem; color: #999; margin-top: 2px;'>{grade}</div>
-                    </div>
-                    {price_html}
-                    {prediction_html}
-                    <div style='font-size: 0.7rem; color: #495057; padding-top: 6px; border-top: 1px solid #e9ecef;'>
-                        <div style='font-size: 0.75rem; color: #666; margin-bottom: 4px; font-weight: 600;'>📊 입지 지표</div>
-                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
-                            <span>🚇 교통</span><strong style='color: #667eea;'>{trans_val:.4f}</strong>
-                        </div>
-                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
-                            <span>🏪 편의</span><strong style='color: #667eea;'>{conv_val:.4f}</strong>
-                        </div>
-                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
-                            <span>🌳 환경</span><strong style='color: #667eea;'>{env_val:.4f}</strong>
-                        </div>
-                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
-                            <span>🏥 의료</span><strong style='color: #667eea;'>{hospital_val:.4f}</strong>
-                        </div>
-                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
-                            <span>🛡️ 안전</span><strong style='color: #667eea;'>{safety_val:.4f}</strong>
-                        </div>
-                       
-                    </div>
-                </div>
-            </div>
-            """
-
-            # 툴팁
-            if contract_type == 'monthly':
-                tooltip_text = f"VFM: {vfm:.3f} | {size_cat} | 전환보증금: {current_price:,.0f}만"
-            else:
-                tooltip_text = f"VFM: {vfm:.3f} | {size_cat} | 전세: {current_price:,.0f}만"
-
-            marker = folium.Marker(
-                location=[row['lat'], row['lon']],
-                popup=folium.Popup(popup_html, max_width=320),
-                icon=folium.Icon(color=color, icon=icon, prefix='fa'),
-                tooltip=tooltip_text
-            )
-            marker_list.append(marker)
-
-        for marker in orange_markers:
-            marker.add_to(m)
-        for marker in blue_markers:
-            marker.add_to(m)
-        for marker in green_markers:
-            marker.add_to(m)
-
-    if len(df_valid) > 0:
-        m.location = [df_valid['lat'].mean(), df_valid['lon'].mean()]
-        m.zoom_start = 12
-
-    return m
-
-
-def create_visualizations(df_filtered, contract_type):
-    """시각화 생성 - 8개 그래프"""
-
-    if df_filtered.empty:
-        st.warning("⚠️ 표시할 데이터가 없습니다.")
-        return
+# 다른 계약 유형 백그라운드 사전 로딩 대상 (검색/필터 패널이 쓰는 캐시 로더)
+PREFETCH_LOADERS = [load_vfm_data, load_location_matrix, load_metadata, load_count_cube,
+                    load_anomaly_scores, load_trend_metrics]
+
+PREFETCH_STATE_LABELS = {
+    'loading': '⏳ 진행 중',
+    'ready': '✅ 완료',
+    'failed': '⚠️ 실패'
+}
+
+# 지도 표시 방식 라벨
+MAP_TYPE_LABELS = {
+    'marker': '📍 마커',
+    'heatmap': '🔥 히트맵',
+    'grid': '🟩 격자',
+    'district': '🏙️ 구별',
+    'timelapse': '🎞️ 타임랩스'
+}
+
+# 마커 지도 정렬 기준 (추세 지표는 히스토리 기반 사전 계산 컬럼)
+MAP_SORT_LABELS = {
+    'custom_vfm': 'VFM',
+    'vfm_slope_12m': 'VFM 추세 기울기',
+    'vfm_change_12m': '12개월 VFM 변화율',
+    'vfm_volatility_12m': 'VFM 변동성'
+}
+
+# 그래프 공통 스타일 (plotly는 시각화 탭에서 그래프를 처음 만들 때 로드)
+CHART_MARGIN = dict(l=60, r=60, t=80, b=60)
+CHART_HOVER_STYLE = dict(
+    bgcolor="white",
+    bordercolor="white"
+)
+CHART_CONFIG = {'displayModeBar': False}
 
-    # 가격 라벨 설정
-    if contract_type == 'monthly':
-        price_label = '전환보증금'
-    else:
-        price_label = '전세가'
-    price_col = 'total_deposit_median'
+# 진한 색상 팔레트
+CHART_DARK_COLORS = ['#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6',
+                     '#1abc9c', '#e67e22', '#34495e', '#16a085', '#c0392b']
 
-    # 공통 마진 설정
-    common_margin = dict(l=60, r=60, t=80, b=60)
 
-    # 공통 호버 스타일
-    hover_style = dict(
-        bgcolor="white",
-        bordercolor="white"
-    )
+def get_price_label(contract_type):
+    """계약 유형별 가격 라벨"""
+    return '전환보증금' if contract_type == 'monthly' else '전세가'
 
-    # 진한 색상 팔레트
-    dark_colors = ['#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6',
-                   '#1abc9c', '#e67e22', '#34495e', '#16a085', '#c0392b']
 
-    # 1. VFM 지수 분포 (히스토그램)
-    st.subheader("📊 VFM 지수 분포")
+def build_vfm_histogram(df_filtered, contract_type):
+    """1. VFM 지수 분포 (히스토그램)"""
+    import plotly.express as px
     fig_hist = px.histogram(
         df_filtered,
         x='custom_vfm',
@@ -621,81 +394,78 @@ def create_visualizations(df_filtered, contract_type):
         plot_bgcolor='white',
         paper_bgcolor='white',
         height=400,
-        margin=common_margin
+        margin=CHART_MARGIN
     )
-    fig_hist.update_traces(hoverlabel=hover_style)
-    st.plotly_chart(fig_hist, use_container_width=True,
-                    config={'displayModeBar': False})
-
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    # 2-3. 구별 분석
-    st.subheader("🗺️ 구별 분석")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        district_avg = df_filtered.groupby(
-            'district')['custom_vfm'].mean().reset_index()
-        district_avg.columns = ['구', '평균 VFM']
-        district_avg = district_avg.sort_values(
-            '평균 VFM', ascending=False).head(10)
-
-        fig_district = px.bar(
-            district_avg,
-            x='구',
-            y='평균 VFM',
-            title='구별 평균 VFM (상위 10개)',
-            color='평균 VFM',
-            color_continuous_scale='Viridis'
-        )
-        fig_district.update_layout(
-            font=dict(size=16, family="Arial, sans-serif", color="#000000"),
-            title_font=dict(
-                size=22, family="Arial, sans-serif", color="#000000"),
-            xaxis=dict(tickfont=dict(size=14, color="#000000")),
-            yaxis=dict(tickfont=dict(size=14, color="#000000")),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            showlegend=False,
-            height=400,
-            margin=common_margin
-        )
-        fig_district.update_traces(hoverlabel=hover_style)
-        st.plotly_chart(fig_district, use_container_width=True,
-                        config={'displayModeBar': False})
-
-    with col2:
-        district_count = df_filtered['district'].value_counts().head(
-            10).reset_index()
-        district_count.columns = ['구', '매물 수']
-
-        fig_pie = px.pie(
-            district_count,
-            values='매물 수',
-            names='구',
-            title='구별 매물 수 (상위 10개)',
-            color_discrete_sequence=dark_colors
-        )
-        fig_pie.update_layout(
-            font=dict(size=16, family="Arial, sans-serif", color="#000000"),
-            title_font=dict(
-                size=22, family="Arial, sans-serif", color="#000000"),
-            paper_bgcolor='white',
-            height=400,
-            margin=common_margin
-        )
-        fig_pie.update_traces(
-            textfont=dict(size=14, color="white"),
-            textinfo='percent+label',
-            hoverlabel=hover_style
-        )
-        st.plotly_chart(fig_pie, use_container_width=True,
-                        config={'displayModeBar': False})
+    fig_hist.update_traces(hoverlabel=CHART_HOVER_STYLE)
+    return fig_hist
+
+
+def build_district_vfm_bar(df_filtered, contract_type):
+    """2. 구별 평균 VFM (상위 10개)"""
+    import plotly.express as px
+    district_avg = df_filtered.groupby(
+        'district')['custom_vfm'].mean().reset_index()
+    district_avg.columns = ['구', '평균 VFM']
+    district_avg = district_avg.sort_values(
+        '평균 VFM', ascending=False).head(10)
+
+    fig_district = px.bar(
+        district_avg,
+        x='구',
+        y='평균 VFM',
+        title='구별 평균 VFM (상위 10개)',
+        color='평균 VFM',
+        color_continuous_scale='Viridis'
+    )
+    fig_district.update_layout(
+        font=dict(size=16, family="Arial, sans-serif", color="#000000"),
+        title_font=dict(
+            size=22, family="Arial, sans-serif", color="#000000"),
+        xaxis=dict(tickfont=dict(size=14, color="#000000")),
+        yaxis=dict(tickfont=dict(size=14, color="#000000")),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        showlegend=False,
+        height=400,
+        margin=CHART_MARGIN
+    )
+    fig_district.update_traces(hoverlabel=CHART_HOVER_STYLE)
+    return fig_district
+
+
+def build_district_count_pie(df_filtered, contract_type):
+    """3. 구별 매물 수 (상위 10개)"""
+    import plotly.express as px
+    district_count = df_filtered['district'].value_counts().head(
+        10).reset_index()
+    district_count.columns = ['구', '매물 수']
+
+    fig_pie = px.pie(
+        district_count,
+        values='매물 수',
+        names='구',
+        title='구별 매물 수 (상위 10개)',
+        color_discrete_sequence=CHART_DARK_COLORS
+    )
+    fig_pie.update_layout(
+        font=dict(size=16, family="Arial, sans-serif", color="#000000"),
+        title_font=dict(
+            size=22, family="Arial, sans-serif", color="#000000"),
+        paper_bgcolor='white',
+        height=400,
+        margin=CHART_MARGIN
+    )
+    fig_pie.update_traces(
+        textfont=dict(size=14, color="white"),
+        textinfo='percent+label',
+        hoverlabel=CHART_HOVER_STYLE
+    )
+    return fig_pie
 
-    st.markdown("<br>", unsafe_allow_html=True)
 
-    # 4. 평형별 평균 VFM
-    st.subheader("📏 평형별 평균 VFM")
+def build_size_vfm_bar(df_filtered, contract_type):
+    """4. 평형별 평균 VFM"""
+    import plotly.express as px
     size_avg = df_filtered.groupby('size_category')[
         'custom_vfm'].mean().reset_index()
     size_avg.columns = ['평형', '평균 VFM']
@@ -721,223 +491,496 @@ def create_visualizations(df_filtered, contract_type):
         paper_bgcolor='white',
         showlegend=False,
         height=400,
-        margin=common_margin
+        margin=CHART_MARGIN
+    )
+    fig_size.update_traces(hoverlabel=CHART_HOVER_STYLE)
+    return fig_size
+
+
+def build_vfm_scatter(df_filtered, x_col, x_label, title):
+    """VFM 산점도 공통 (최대 1,000건 샘플)"""
+    import plotly.express as px
+    sample_df = df_filtered.sample(min(1000, len(df_filtered)))
+
+    fig_scatter = px.scatter(
+        sample_df,
+        x=x_col,
+        y='custom_vfm',
+        title=title,
+        labels={x_col: x_label, 'custom_vfm': 'VFM 지수'},
+        color='custom_vfm',
+        color_continuous_scale='RdYlGn',
+        opacity=0.7
     )
-    fig_size.update_traces(hoverlabel=hover_style)
-    st.plotly_chart(fig_size, use_container_width=True,
-                    config={'displayModeBar': False})
+    fig_scatter.update_traces(marker=dict(size=8), hoverlabel=CHART_HOVER_STYLE)
+    fig_scatter.update_layout(
+        font=dict(size=18, family="Arial, sans-serif", color="#000000"),
+        title_font=dict(
+            size=26, family="Arial, sans-serif", color="#000000"),
+        xaxis=dict(tickfont=dict(size=16, color="#000000"),
+                   showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
+        yaxis=dict(tickfont=dict(size=16, color="#000000"),
+                   showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        height=450,
+        margin=CHART_MARGIN,
+        coloraxis_colorbar=dict(title=dict(text="VFM", font=dict(
+            size=16, color="#000000")), tickfont=dict(size=14, color="#000000"))
+    )
+    return fig_scatter
 
-    st.markdown("<br>", unsafe_allow_html=True)
 
-    # 5. 가격 vs VFM (산점도)
-    st.subheader(f"💰 {price_label} vs VFM")
-    if price_col in df_filtered.columns:
-        sample_df = df_filtered.sample(min(1000, len(df_filtered)))
-
-        fig_price = px.scatter(
-            sample_df,
-            x=price_col,
-            y='custom_vfm',
-            title=f'{price_label} vs VFM',
-            labels={price_col: f'{price_label} (만원)', 'custom_vfm': 'VFM 지수'},
-            color='custom_vfm',
-            color_continuous_scale='RdYlGn',
-            opacity=0.7
-        )
-        fig_price.update_traces(marker=dict(size=8), hoverlabel=hover_style)
-        fig_price.update_layout(
-            font=dict(size=18, family="Arial, sans-serif", color="#000000"),
-            title_font=dict(
-                size=26, family="Arial, sans-serif", color="#000000"),
-            xaxis=dict(tickfont=dict(size=16, color="#000000"),
-                       showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
-            yaxis=dict(tickfont=dict(size=16, color="#000000"),
-                       showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            height=450,
-            margin=common_margin,
-            coloraxis_colorbar=dict(title=dict(text="VFM", font=dict(
-                size=16, color="#000000")), tickfont=dict(size=14, color="#000000"))
-        )
-        st.plotly_chart(fig_price, use_container_width=True,
-                        config={'displayModeBar': False})
+def build_price_scatter(df_filtered, contract_type):
+    """5. 가격 vs VFM (산점도)"""
+    price_col = 'total_deposit_median'
+    if price_col not in df_filtered.columns:
+        return None
+    price_label = get_price_label(contract_type)
+    return build_vfm_scatter(df_filtered, price_col, f'{price_label} (만원)',
+                             f'{price_label} vs VFM')
+
+
+def build_infra_scatter(df_filtered, contract_type):
+    """6. 인프라 종합 vs VFM (산점도)"""
+    if 'infra_score' in df_filtered.columns:
+        infra_col = 'infra_score'
+    elif 'total_infra_score' in df_filtered.columns:
+        infra_col = 'total_infra_score'
+    else:
+        return None
+    return build_vfm_scatter(df_filtered, infra_col, '인프라 종합 점수',
+                             '인프라 종합 점수 vs VFM')
 
-    st.markdown("<br>", unsafe_allow_html=True)
 
-    # 6. 인프라 종합 vs VFM (산점도)
-    st.subheader("🏗️ 인프라 종합 점수 vs VFM")
-    if 'infra_score' in df_filtered.columns or 'total_infra_score' in df_filtered.columns:
-        infra_col = 'infra_score' if 'infra_score' in df_filtered.columns else 'total_infra_score'
-        sample_df = df_filtered.sample(min(1000, len(df_filtered)))
-
-        fig_infra = px.scatter(
-            sample_df,
-            x=infra_col,
-            y='custom_vfm',
-            title='인프라 종합 점수 vs VFM',
-            labels={infra_col: '인프라 종합 점수', 'custom_vfm': 'VFM 지수'},
-            color='custom_vfm',
-            color_continuous_scale='RdYlGn',
-            opacity=0.7
-        )
-        fig_infra.update_traces(marker=dict(size=8), hoverlabel=hover_style)
-        fig_infra.update_layout(
-            font=dict(size=18, family="Arial, sans-serif", color="#000000"),
-            title_font=dict(
-                size=26, family="Arial, sans-serif", color="#000000"),
-            xaxis=dict(tickfont=dict(size=16, color="#000000"),
-                       showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
-            yaxis=dict(tickfont=dict(size=16, color="#000000"),
-                       showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            height=450,
-            margin=common_margin,
-            coloraxis_colorbar=dict(title=dict(text="VFM", font=dict(
-                size=16, color="#000000")), tickfont=dict(size=14, color="#000000"))
+def build_prediction_box(df_filtered, contract_type):
+    """7. 기간별 예측 비교 (박스플롯) - 호버 비활성화 + 수치 텍스트 표시"""
+    import plotly.express as px
+    price_col = 'total_deposit_median'
+    pred_cols = []
+    pred_labels = []
+
+    if 'pred_3m' in df_filtered.columns:
+        pred_cols.append('pred_3m')
+        pred_labels.append('3개월')
+    if 'pred_6m' in df_filtered.columns:
+        pred_cols.append('pred_6m')
+        pred_labels.append('6개월')
+    if 'pred_9m' in df_filtered.columns:
+        pred_cols.append('pred_9m')
+        pred_labels.append('9개월')
+    if 'pred_12m' in df_filtered.columns:
+        pred_cols.append('pred_12m')
+        pred_labels.append('12개월')
+
+    if not pred_cols:
+        return None
+
+    pred_stats = []
+    pred_change_data = []
+
+    for col, label in zip(pred_cols, pred_labels):
+        mask = (df_filtered[price_col] > 0) & (df_filtered[col] > 0)
+        change_pct = ((df_filtered.loc[mask, col] - df_filtered.loc[mask,
+                      price_col]) / df_filtered.loc[mask, price_col] * 100)
+        change_pct = change_pct[(
+            change_pct >= -100) & (change_pct <= 100)]
+
+        if len(change_pct) > 0:
+            # 사분위수 3개를 정렬 1회로 계산
+            q1, median, q3 = np.percentile(change_pct.values, [25, 50, 75])
+            pred_stats.append({
+                'label': label,
+                'median': median,
+                'q1': q1,
+                'q3': q3
+            })
+
+        for val in change_pct:
+            pred_change_data.append({'기간': label, '변화율': val})
+
+    pred_df = pd.DataFrame(pred_change_data)
+    if pred_df.empty:
+        return None
+
+    fig_box = px.box(
+        pred_df,
+        x='기간',
+        y='변화율',
+        title='기간별 예측 변화율 분포',
+        labels={'기간': '예측 기간', '변화율': '변화율 (%)'},
+        color='기간',
+        color_discrete_sequence=[
+            '#3498db', '#2ecc71', '#f39c12', '#e74c3c']
+    )
+    fig_box.add_hline(y=0, line_dash="dash",
+                      line_color="black", line_width=1)
+
+    # 각 박스플롯 위에 중앙값 텍스트 추가
+    for stat in pred_stats:
+        fig_box.add_annotation(
+            x=stat['label'],
+            y=stat['q3'] + 8,
+            text=f"중앙값: {stat['median']:.1f}%",
+            showarrow=False,
+            font=dict(size=11, color="black", family="Arial"),
+            bgcolor="white",
+            bordercolor="gray",
+            borderwidth=1,
+            borderpad=3
         )
-        st.plotly_chart(fig_infra, use_container_width=True,
-                        config={'displayModeBar': False})
+
+    fig_box.update_layout(
+        font=dict(size=16, family="Arial, sans-serif",
+                  color="#000000"),
+        title_font=dict(
+            size=22, family="Arial, sans-serif", color="#000000"),
+        xaxis=dict(tickfont=dict(size=14, color="#000000")),
+        yaxis=dict(
+            tickfont=dict(size=14, color="#000000"),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.1)',
+            range=[-80, 80]
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        showlegend=False,
+        height=450,
+        margin=CHART_MARGIN
+    )
+    fig_box.update_traces(hoverinfo='skip', hovertemplate=None)
+    return fig_box
+
+
+def build_district_prediction_bar(df_filtered, contract_type):
+    """8. 구별 예측 상승률 TOP 10 (막대)"""
+    import plotly.express as px
+    if 'price_change_pct' not in df_filtered.columns:
+        return None
+
+    filtered_for_district = df_filtered[(
+        df_filtered['price_change_pct'] >= -100) & (df_filtered['price_change_pct'] <= 100)]
+    district_pred = filtered_for_district.groupby(
+        'district')['price_change_pct'].mean().reset_index()
+    district_pred.columns = ['구', '평균 예측 변화율']
+    district_pred = district_pred.sort_values(
+        '평균 예측 변화율', ascending=False).head(10)
+
+    colors = ['#e74c3c' if x >
+              0 else '#3498db' for x in district_pred['평균 예측 변화율']]
+
+    fig_district_pred = px.bar(
+        district_pred,
+        x='구',
+        y='평균 예측 변화율',
+        title='구별 12개월 예측 상승률 TOP 10',
+        labels={'구': '구', '평균 예측 변화율': '평균 변화율 (%)'},
+    )
+    fig_district_pred.update_traces(
+        marker_color=colors, hoverlabel=CHART_HOVER_STYLE)
+    fig_district_pred.add_hline(
+        y=0, line_dash="dash", line_color="black", line_width=1)
+    fig_district_pred.update_layout(
+        font=dict(size=16, family="Arial, sans-serif",
+                  color="#000000"),
+        title_font=dict(
+            size=22, family="Arial, sans-serif", color="#000000"),
+        xaxis=dict(tickfont=dict(size=14, color="#000000")),
+        yaxis=dict(tickfont=dict(size=14, color="#000000"),
+                   showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        height=450,
+        margin=CHART_MARGIN
+    )
+    return fig_district_pred
+
+
+CHART_BUILDERS = {
+    'vfm_histogram': build_vfm_histogram,
+    'district_vfm': build_district_vfm_bar,
+    'district_count': build_district_count_pie,
+    'size_vfm': build_size_vfm_bar,
+    'price_scatter': build_price_scatter,
+    'infra_scatter': build_infra_scatter,
+    'prediction_box': build_prediction_box,
+    'district_prediction': build_district_prediction_bar
+}
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def get_chart(chart_name, search_key, _df_filtered, contract_type):
+    """검색 조건(search_key)별 그래프 캐시 → 같은 검색 결과면 그래프를 다시 만들지 않음"""
+    return CHART_BUILDERS[chart_name](_df_filtered, contract_type)
+
+
+@st.fragment
+def render_chart_block(title, chart_names, df_filtered, contract_type, search_key):
+    """시각화 블록 1개 (독립 실행 fragment, 그래프 여러 개면 가로 배치)"""
+    st.subheader(title)
+    columns = st.columns(len(chart_names)) if len(
+        chart_names) > 1 else [st.container()]
+
+    for column, chart_name in zip(columns, chart_names):
+        fig = get_chart(chart_name, search_key, df_filtered, contract_type)
+        if fig is not None:
+            with column:
+                st.plotly_chart(fig, use_container_width=True,
+                                config=CHART_CONFIG)
+
+
+@st.fragment
+def render_correlation_block(contract_type, search_key):
+    """
+    지표 간 상관관계 (사전 계산 모멘트 누적값을 구/평형/기준 월 조건으로 합산)
+    누적값에 없는 검색 조건(가격 범위 등)은 반영할 수 없으므로 활성화된 경우 명시
+    """
+    # 차트 모듈(plotly)은 시각화 탭을 처음 열 때 로드
+    from modules.visualizations import create_heatmap_correlation
+
+    (_, snapshot_month, location_weights, selected_districts, selected_sizes,
+     price_range, conversion_rate, exclude_anomalies, trend_filter) = search_key
+    if snapshot_month:
+        moments = load_moments(contract_type, 'history')
+        months = [snapshot_month]
+    else:
+        moments = load_moments(contract_type, 'hybrid')
+        months = None
+
+    st.subheader("🔗 지표 간 상관관계")
+    corr_matrix = correlation_from_moments(
+        moments, selected_districts, selected_sizes, months)
+    if corr_matrix.empty:
+        st.info("상관관계를 계산할 데이터가 부족합니다.")
+        return
+
+    ignored = []
+    if tuple(price_range) != PRICE_SLIDER_RANGE:
+        ignored.append(f"가격 범위 {price_range[0]:,}~{price_range[1]:,}")
+    if not is_default_weights(location_weights):
+        ignored.append("사용자 가중치")
+    if conversion_rate is not None:
+        ignored.append(f"전환율 {conversion_rate:.1f}%")
+    if exclude_anomalies:
+        ignored.append("이상치 제외")
+    if trend_filter != 'all':
+        ignored.append(f"추세 {TREND_FILTER_LABELS[trend_filter]}")
+    if ignored:
+        st.warning(f"⚠️ 현재 검색 조건 중 {', '.join(ignored)} 미반영 - "
+                   f"위 검색 결과와 다른 집단(구·평형·기준 월 조건 전체)의 상관관계입니다.")
+    st.caption("※ 구·평형·기준 월 조건 기준 (가격 범위·사용자 가중치·전환율 시나리오·이상치/추세 필터 미적용)")
+    corr_matrix = corr_matrix.rename(
+        index=MOMENT_FEATURE_LABELS, columns=MOMENT_FEATURE_LABELS)
+    fig_corr = create_heatmap_correlation(
+        None, list(corr_matrix.columns), corr_matrix=corr_matrix)
+    fig_corr.update_layout(width=None)
+    st.plotly_chart(fig_corr, use_container_width=True, config=CHART_CONFIG)
+
+
+def create_visualizations(df_filtered, contract_type, search_key):
+    """시각화 생성 - 8개 그래프 (블록별 fragment + 검색 조건별 그래프 캐시)"""
+
+    if df_filtered.empty:
+        st.warning("⚠️ 표시할 데이터가 없습니다.")
+        return
+
+    price_label = get_price_label(contract_type)
+    blocks = [
+        ("📊 VFM 지수 분포", ['vfm_histogram']),
+        ("🗺️ 구별 분석", ['district_vfm', 'district_count']),
+        ("📏 평형별 평균 VFM", ['size_vfm']),
+        (f"💰 {price_label} vs VFM", ['price_scatter']),
+        ("🏗️ 인프라 종합 점수 vs VFM", ['infra_scatter'])
+    ]
+    for i, (title, chart_names) in enumerate(blocks):
+        if i > 0:
+            st.markdown("<br>", unsafe_allow_html=True)
+        render_chart_block(title, chart_names, df_filtered,
+                           contract_type, search_key)
 
     # ========== 예측 관련 시각화 ==========
     st.markdown("---")
-    st.subheader("🔮 AI 예측 분석")
+    render_chart_block("🔮 AI 예측 분석", ['prediction_box', 'district_prediction'],
+                       df_filtered, contract_type, search_key)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    render_correlation_block(contract_type, search_key)
+
+
+def render_export_buttons(df_filtered, contract_type):
+    """검색 결과/히스토리 내보내기 버튼 (파일은 클릭 시 별도 스레드에서 청크 단위로 생성)"""
+    st.write("### 📥 결과 내보내기")
+    grid_ids = df_filtered['grid_id'].values
+    size_categories = df_filtered['size_category'].values
+
+    exports = [
+        ('📄 검색 결과 CSV', 'result', 'csv'),
+        ('📦 검색 결과 Parquet', 'result', 'parquet'),
+        ('📄 히스토리 CSV', 'history', 'csv'),
+        ('📦 히스토리 Parquet', 'history', 'parquet')
+    ]
+    for col, (label, scope, file_format) in zip(st.columns(len(exports)), exports):
+        if scope == 'result':
+            make_file = partial(export_search_result, df_filtered, file_format)
+        else:
+            make_file = partial(export_matching_history, contract_type,
+                                grid_ids, size_categories, file_format)
+        with col:
+            st.download_button(
+                label,
+                data=make_file,
+                file_name=f"vfm_{contract_type}_{scope}.{file_format}",
+                mime=EXPORT_MIME_TYPES[file_format],
+                on_click='ignore',
+                key=f"export_{scope}_{file_format}"
+            )
+
+
+def is_weights_only_change(result_key, search_key):
+    """검색 조건 키에서 입지 가중치(3번째 항목)만 다르면 True"""
+    return (result_key[2] != search_key[2] and
+            result_key[:2] + result_key[3:] == search_key[:2] + search_key[3:])
+
+
+def run_search(contract_type, snapshot_month, location_weights,
+               selected_districts, selected_sizes, price_range, conversion_rate=None,
+               exclude_anomalies=False, trend='all'):
+    """
+    검색 실행 → (필터링된 결과, 결과 행의 정규화 입지 행렬)
+    입지 행렬은 세션에 보관 → 이후 가중치 변경은 검색 없이 즉시 재순위
+    데이터 로딩 실패 시 (None, None)
+    """
+    if snapshot_month:
+        snapshot_store = load_snapshot_store(contract_type)
+        df = get_snapshot(snapshot_store, snapshot_month)
+        location_matrix = snapshot_store['matrices'][snapshot_month]
+    else:
+        df = load_data_simple(contract_type)
+        location_matrix = load_location_matrix(contract_type)
+
+    if df.empty:
+        return None, None
+
+    # 전환율 시나리오 (전환율별 캐시된 전환보증금/변화율/VFM 배열로 교체, 최신 데이터만)
+    if conversion_rate is not None and not snapshot_month:
+        df = apply_conversion_scenario(
+            df, load_conversion_scenario(contract_type, conversion_rate))
+
+    # 사용자 가중치로 전체 데이터 VFM 재계산 (행렬-벡터 곱 1회)
+    df = apply_location_weights(df, location_matrix, location_weights)
+    mask = build_filter_mask(
+        df, selected_districts, selected_sizes, price_range, exclude_anomalies, trend)
+    return df[mask].reset_index(drop=True), np.ascontiguousarray(location_matrix[mask])
+
 
-    col1, col2 = st.columns(2)
+@st.fragment
+def render_map_panel(df_filtered, contract_type, vfm_grades, allow_prerendered,
+                     snapshot_month=None, districts=None, sizes=None):
+    """지도 패널 (지도 설정 위젯 변경 시 이 fragment만 다시 실행)"""
+    # 지도 렌더링 라이브러리는 지도 탭을 처음 열 때 로드
+    from streamlit_folium import st_folium
 
-    # 7. 기간별 예측 비교 (박스플롯) - 호버 비활성화 + 수치 텍스트 표시
+    st.markdown("""
+        <div class='panel-section'>
+            <div class='section-title'><span class='section-icon'>🗺️</span><span>지도 설정</span></div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns([1.2, 1, 1.5])
     with col1:
-        pred_cols = []
-        pred_labels = []
-
-        if 'pred_3m' in df_filtered.columns:
-            pred_cols.append('pred_3m')
-            pred_labels.append('3개월')
-        if 'pred_6m' in df_filtered.columns:
-            pred_cols.append('pred_6m')
-            pred_labels.append('6개월')
-        if 'pred_9m' in df_filtered.columns:
-            pred_cols.append('pred_9m')
-            pred_labels.append('9개월')
-        if 'pred_12m' in df_filtered.columns:
-            pred_cols.append('pred_12m')
-            pred_labels.append('12개월')
-
-        if pred_cols:
-            pred_stats = []
-            pred_change_data = []
-
-            for col, label in zip(pred_cols, pred_labels):
-                mask = (df_filtered[price_col] > 0) & (df_filtered[col] > 0)
-                change_pct = ((df_filtered.loc[mask, col] - df_filtered.loc[mask,
-                              price_col]) / df_filtered.loc[mask, price_col] * 100)
-                change_pct = change_pct[(
-                    change_pct >= -100) & (change_pct <= 100)]
-
-                if len(change_pct) > 0:
-                    pred_stats.append({
-                        'label': label,
-                        'median': change_pct.median(),
-                        'q1': change_pct.quantile(0.25),
-                        'q3': change_pct.quantile(0.75)
-                    })
-
-                for val in change_pct:
-                    pred_change_data.append({'기간': label, '변화율': val})
-
-            pred_df = pd.DataFrame(pred_change_data)
-
-            if not pred_df.empty:
-                fig_box = px.box(
-                    pred_df,
-                    x='기간',
-                    y='변화율',
-                    title='기간별 예측 변화율 분포',
-                    labels={'기간': '예측 기간', '변화율': '변화율 (%)'},
-                    color='기간',
-                    color_discrete_sequence=[
-                        '#3498db', '#2ecc71', '#f39c12', '#e74c3c']
-                )
-                fig_box.add_hline(y=0, line_dash="dash",
-                                  line_color="black", line_width=1)
-
-                # 각 박스플롯 위에 중앙값 텍스트 추가
-                for stat in pred_stats:
-                    fig_box.add_annotation(
-                        x=stat['label'],
-                        y=stat['q3'] + 8,
-                        text=f"중앙값: {stat['median']:.1f}%",
-                        showarrow=False,
-                        font=dict(size=11, color="black", family="Arial"),
-                        bgcolor="white",
-                        bordercolor="gray",
-                        borderwidth=1,
-                        borderpad=3
-                    )
-
-                fig_box.update_layout(
-                    font=dict(size=16, family="Arial, sans-serif",
-                              color="#000000"),
-                    title_font=dict(
-                        size=22, family="Arial, sans-serif", color="#000000"),
-                    xaxis=dict(tickfont=dict(size=14, color="#000000")),
-                    yaxis=dict(
-                        tickfont=dict(size=14, color="#000000"),
-                        showgrid=True,
-                        gridcolor='rgba(0,0,0,0.1)',
-                        range=[-80, 80]
-                    ),
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    showlegend=False,
-                    height=450,
-                    margin=common_margin
-                )
-                fig_box.update_traces(hoverinfo='skip', hovertemplate=None)
-                st.plotly_chart(fig_box, use_container_width=True,
-                                config={'displayModeBar': False})
-
-    # 8. 구별 예측 상승률 TOP 10 (막대)
-    with col2:
-        if 'price_change_pct' in df_filtered.columns:
-            filtered_for_district = df_filtered[(
-                df_filtered['price_change_pct'] >= -100) & (df_filtered['price_change_pct'] <= 100)]
-            district_pred = filtered_for_district.groupby(
-                'district')['price_change_pct'].mean().reset_index()
-            district_pred.columns = ['구', '평균 예측 변화율']
-            district_pred = district_pred.sort_values(
-                '평균 예측 변화율', ascending=False).head(10)
-
-            colors = ['#e74c3c' if x >
-                      0 else '#3498db' for x in district_pred['평균 예측 변화율']]
-
-            fig_district_pred = px.bar(
-                district_pred,
-                x='구',
-                y='평균 예측 변화율',
-                title='구별 12개월 예측 상승률 TOP 10',
-                labels={'구': '구', '평균 예측 변화율': '평균 변화율 (%)'},
+        map_type = st.radio(
+            "지도 표시 방식",
+            options=['marker', 'heatmap', 'grid', 'district', 'timelapse'],
+            format_func=lambda x: MAP_TYPE_LABELS[x],
+            horizontal=True,
+            label_visibility='collapsed',
+            key='map_type'
+        )
+
+    if map_type == 'marker':
+        with col2:
+            sort_column = st.selectbox(
+                "정렬 기준",
+                options=list(MAP_SORT_LABELS),
+                format_func=lambda x: MAP_SORT_LABELS[x],
+                label_visibility='collapsed',
+                key='map_sort_column'
             )
-            fig_district_pred.update_traces(
-                marker_color=colors, hoverlabel=hover_style)
-            fig_district_pred.add_hline(
-                y=0, line_dash="dash", line_color="black", line_width=1)
-            fig_district_pred.update_layout(
-                font=dict(size=16, family="Arial, sans-serif",
-                          color="#000000"),
-                title_font=dict(
-                    size=22, family="Arial, sans-serif", color="#000000"),
-                xaxis=dict(tickfont=dict(size=14, color="#000000")),
-                yaxis=dict(tickfont=dict(size=14, color="#000000"),
-                           showgrid=True, gridcolor='rgba(0,0,0,0.1)'),
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                height=450,
-                margin=common_margin
+            sort_order = st.radio(
+                "정렬 순서",
+                options=['desc', 'asc'],
+                format_func=lambda x: '⬇️ 높은 순 (추천)' if x == 'desc' else '⬆️ 낮은 순',
+                label_visibility='collapsed',
+                key='map_sort_order'
             )
-            st.plotly_chart(fig_district_pred, use_container_width=True, config={
-                            'displayModeBar': False})
+        with col3:
+            marker_limit = st.slider(
+                "마커 개수",
+                min_value=50,
+                max_value=1000,
+                value=100,
+                step=50,
+                label_visibility='collapsed',
+                key='map_marker_limit'
+            )
+    else:
+        marker_limit = 100
+        sort_order = 'desc'
+        sort_column = 'custom_vfm'
+
+    if map_type != 'timelapse':
+        show_frontier = st.checkbox(
+            "🏆 파레토 최적 레이어 (가격↓·VFM↑·입지↑)", value=False, key='map_show_frontier')
+    else:
+        show_frontier = False
+
+    start_time = time.perf_counter()
+
+    if map_type == 'marker' and len(df_filtered) > marker_limit:
+        sort_label = "높은" if sort_order == "desc" else "낮은"
+        st.warning(
+            f"⚠️ 검색 결과 **{len(df_filtered):,}건** 중 **{MAP_SORT_LABELS[sort_column]} {sort_label} 순 {marker_limit}개**만 표시됩니다.")
+
+    # 기본 검색 조건이면 사전 렌더링된 지도 사용
+    prerendered_html = None
+    if allow_prerendered and not show_frontier and sort_column == 'custom_vfm':
+        prerendered_html = load_prerendered_map_html(
+            contract_type, map_type, marker_limit, sort_order)
+
+    if map_type == 'timelapse':
+        st.caption(
+            f"🎞️ {TIMELAPSE_START} 이후 서울 전체 그리드의 월별 평균 VFM (필터 미적용)")
+        with st.spinner('🎞️ 타임랩스 준비 중...'):
+            folium_map = get_timelapse_map(contract_type)
+        st_folium(folium_map, width=None,
+                  height=600, returned_objects=[])
+    elif prerendered_html:
+        components.html(prerendered_html, height=600)
+    else:
+        # 구/평형/가격 필터 범위 내 파레토 최적 매물
+        frontier_df = get_skyline_frame(
+            df_filtered) if show_frontier else None
+        if frontier_df is not None:
+            st.caption(
+                f"🏆 파레토 최적 매물 {len(frontier_df):,}건 (더 싸면서 VFM·입지 총점이 모두 높은 매물이 없는 곳)")
+
+        if map_type == 'district':
+            # 사전 계산 집계 기반 → 검색 결과 건수와 무관하게 구 25개 도형만 렌더링
+            st.caption(
+                f"🏙️ {snapshot_month or '최신 월'} 구별 집계 (평형 필터만 적용, 기본 가중치 VFM)")
+            folium_map = create_district_choropleth_map(
+                contract_type, snapshot_month, sizes, districts, frontier_df=frontier_df)
+        elif map_type == 'grid':
+            folium_map = create_grid_choropleth_map(
+                df_filtered, contract_type, vfm_grades, frontier_df=frontier_df)
+        else:
+            folium_map = create_map(
+                df_filtered, map_type, contract_type, marker_limit, sort_order, vfm_grades,
+                frontier_df=frontier_df, sort_column=sort_column)
+        st_folium(folium_map, width=None,
+                  height=600, returned_objects=[])
+
+    st.caption(f"⏱️ 지도 렌더링: {time.perf_counter() - start_time:.2f}초")
 
 
 def main():
@@ -978,46 +1021,27 @@ def main():
         )
         st.session_state.contract_type = contract_type
 
-        # 지도 설정 (지도 탭에서만 표시)
-        if view_tab == '🗺️ 지도':
-            st.markdown("""
-                <div class='panel-section'>
-                    <div class='section-title'><span class='section-icon'>🗺️</span><span>지도 설정</span></div>
-                </div>
-            """, unsafe_allow_html=True)
-
-            map_type = st.radio(
-                "지도 표시 방식",
-                options=['marker', 'heatmap'],
-                format_func=lambda x: '📍 마커' if x == 'marker' else '🔥 히트맵',
-                label_visibility='collapsed'
-            )
-
-            if map_type == 'marker':
-                st.markdown("**📊 VFM 정렬**")
-                sort_order = st.radio(
-                    "정렬 순서",
-                    options=['desc', 'asc'],
-                    format_func=lambda x: '⬇️ 높은 순 (추천)' if x == 'desc' else '⬆️ 낮은 순',
-                    label_visibility='collapsed'
-                )
+        st.markdown("""
+            <div class='panel-section'>
+                <div class='section-title'><span class='section-icon'>📅</span><span>기준 시점</span></div>
+            </div>
+        """, unsafe_allow_html=True)
 
-                st.markdown("**📍 마커 표시 개수**")
-                marker_limit = st.slider(
-                    "마커 개수",
-                    min_value=50,
-                    max_value=1000,
-                    value=100,
-                    step=50,
+        use_snapshot = st.checkbox("과거 시점으로 검색", value=False)
+        snapshot_month = None
+        if use_snapshot:
+            with st.spinner('히스토리 스냅샷 준비 중...'):
+                snapshot_store = load_snapshot_store(contract_type)
+
+            if snapshot_store['months']:
+                snapshot_month = st.select_slider(
+                    "기준 월",
+                    options=snapshot_store['months'],
+                    value=snapshot_store['months'][-1],
                     label_visibility='collapsed'
                 )
             else:
-                marker_limit = 100
-                sort_order = 'desc'
-        else:
-            map_type = 'marker'
-            marker_limit = 100
-            sort_order = 'desc'
+                st.warning("⚠️ 히스토리 데이터가 없습니다.")
 
         st.markdown("""
             <div class='panel-section'>
@@ -1050,28 +1074,54 @@ def main():
             st.warning("⚠️ 최소 하나의 등급을 선택해주세요!")
             vfm_grades = ['excellent', 'good', 'normal']
 
+        exclude_anomalies = st.checkbox(
+            "🚫 이상치 제외", value=False,
+            help=f"구·평형·월 그룹 내 VFM robust z-score 절댓값이 {ANOMALY_Z_THRESHOLD} 초과인 매물 제외")
+
+        trend_filter = st.radio(
+            "VFM 추세 (최근 12개월)",
+            options=list(TREND_FILTER_LABELS),
+            format_func=lambda x: TREND_FILTER_LABELS[x],
+            horizontal=True,
+            help="히스토리 기반 최근 12개월 VFM 기울기 부호로 필터링"
+        )
+
         st.markdown("""
             <div class='panel-section'>
-                <div class='section-title'><span class='section-icon'>📍</span><span>지역 선택 (구)</span></div>
+                <div class='section-title'><span class='section-icon'>⚖️</span><span>입지 가중치</span></div>
             </div>
         """, unsafe_allow_html=True)
 
-        with st.spinner('구 목록 로딩 중...'):
-            temp_df = load_data_simple(contract_type)
+        with st.expander("사용자 VFM 가중치 설정"):
+            st.caption("※ 모든 가중치가 같으면 기본 VFM과 동일합니다 · 검색 후 변경하면 결과에 즉시 반영")
+            location_weights = [
+                st.slider(
+                    LOCATION_INDEX_LABELS[col],
+                    min_value=0.0,
+                    max_value=3.0,
+                    value=DEFAULT_WEIGHT,
+                    step=0.1,
+                    key=f"weight_{col}"
+                )
+                for col in LOCATION_INDEX_COLUMNS
+            ]
 
-        if not temp_df.empty and 'district' in temp_df.columns:
-            available_districts = sorted(
-                temp_df['district'].dropna().unique().tolist())
-            district_options = ['전체'] + available_districts
+        st.markdown("""
+            <div class='panel-section'>
+                <div class='section-title'><span class='section-icon'>📍</span><span>지역 선택 (구)</span></div>
+            </div>
+        """, unsafe_allow_html=True)
 
-            selected_districts = st.multiselect(
-                "구 선택",
-                options=district_options,
-                default=['전체'],
-                label_visibility='collapsed'
-            )
-        else:
-            selected_districts = ['전체']
+        # 필터 위젯은 메타데이터 사이드카만으로 렌더링 (전체 데이터 로딩 불필요)
+        metadata = load_metadata(contract_type)
+        district_options = ['전체'] + metadata['districts']
+
+        selected_districts = st.multiselect(
+            "구 선택",
+            options=district_options,
+            default=['전체'],
+            label_visibility='collapsed'
+        )
 
         st.markdown("""
             <div class='panel-section'>
@@ -1079,21 +1129,14 @@ def main():
             </div>
         """, unsafe_allow_html=True)
 
-        if not temp_df.empty and 'size_category' in temp_df.columns:
-            available_sizes = temp_df['size_category'].dropna(
-            ).unique().tolist()
-            size_order = ['초소형', '소형', '중형', '대형']
-            available_sizes = [s for s in size_order if s in available_sizes]
-            size_options = ['전체'] + available_sizes
-
-            selected_sizes = st.multiselect(
-                "평형 선택",
-                options=size_options,
-                default=['전체'],
-                label_visibility='collapsed'
-            )
-        else:
-            selected_sizes = ['전체']
+        size_options = ['전체'] + metadata['size_categories']
+
+        selected_sizes = st.multiselect(
+            "평형 선택",
+            options=size_options,
+            default=['전체'],
+            label_visibility='collapsed'
+        )
 
         st.markdown("""
             <div class='panel-section'>
@@ -1108,127 +1151,202 @@ def main():
         else:
             st.markdown("**전세 범위**")
 
+        price_histogram = metadata['price_histogram']
+        st.bar_chart(
+            pd.Series(price_histogram['counts'],
+                      index=price_histogram['edges'][:-1], name='매물 수'),
+            height=80
+        )
         price_range = st.slider(
-            "가격", 0, 100000, (0, 100000), step=1000, label_visibility='collapsed'
+            "가격", PRICE_SLIDER_RANGE[0], PRICE_SLIDER_RANGE[1], PRICE_SLIDER_RANGE,
+            step=PRICE_SLIDER_STEP, label_visibility='collapsed'
         )
+        st.caption(
+            f"데이터 범위: {metadata['price_min']:,.0f} ~ {metadata['price_max']:,.0f}만원")
+
+        # 전환율 시나리오 (월세만, 데이터 전환율과 다른 값을 고르면 검색 시 재계산)
+        conversion_rate = None
+        if contract_type == 'monthly':
+            base_rate = metadata.get('conversion_rate') or DEFAULT_CONVERSION_RATE
+            base_rate = round(min(max(base_rate, CONVERSION_RATE_RANGE[0]),
+                                  CONVERSION_RATE_RANGE[1]), 1)
+            with st.expander("💱 전환율 시나리오"):
+                st.caption(f"※ 데이터 전환율 {base_rate:.1f}% 기준 전환보증금을 다시 계산합니다")
+                scenario_rate = st.slider(
+                    "전환율 (%)",
+                    min_value=CONVERSION_RATE_RANGE[0],
+                    max_value=CONVERSION_RATE_RANGE[1],
+                    value=base_rate,
+                    step=CONVERSION_RATE_STEP,
+                    key="conversion_rate"
+                )
+                if snapshot_month:
+                    st.caption("※ 과거 시점 검색에는 적용되지 않습니다")
+            if scenario_rate != base_rate and not snapshot_month:
+                conversion_rate = scenario_rate
+
+        # 결과 건수 미리보기 (건수 큐브 조회 → 검색 버튼 없이 위젯 변경마다 즉시 갱신)
+        preview_counts = query_count_cube(
+            load_count_cube(contract_type), selected_districts, selected_sizes, price_range)
+        # 검색/지도와 같은 등급 기준 (전체 선택이면 미달(0) 포함)
+        preview_total = int(preview_counts[get_visible_grade_codes(vfm_grades)].sum())
+        st.markdown(f"**🔎 예상 결과: {preview_total:,}건**")
+        st.caption(
+            f"🟢 {preview_counts[VFM_GRADE_CODES['excellent']]:,} · "
+            f"🔵 {preview_counts[VFM_GRADE_CODES['good']]:,} · "
+            f"🟠 {preview_counts[VFM_GRADE_CODES['normal']]:,} · "
+            f"⚪ 미달 {preview_counts[0]:,}")
+        if preview_total == 0:
+            st.warning("⚠️ 조건에 맞는 매물이 없습니다. 가격 범위를 넓혀보세요.")
+        if snapshot_month or conversion_rate is not None or not is_default_weights(location_weights):
+            st.caption("※ 미리보기는 최신 데이터·기본 가중치·데이터 전환율 기준")
+        if exclude_anomalies or trend_filter != 'all':
+            st.caption("※ 미리보기 건수에는 이상치 제외·추세 조건이 반영되지 않습니다")
 
         st.markdown("<br>", unsafe_allow_html=True)
         search_btn = st.button("🔍 검색하기")
+        startup_caption = st.empty()
 
     with col_right:
+        # 왼쪽 패널 표시 후 현재 계약 유형만 로딩 → 다른 계약 유형은 작업 스레드에서 사전 로딩
+        with st.spinner('🔄 데이터 준비 중...'):
+            startup_stats = preload_all_data(contract_type)
+        other_contract_type = 'jeonse' if contract_type == 'monthly' else 'monthly'
+        prefetch_job = prefetch_contract_type(other_contract_type, PREFETCH_LOADERS)
+        prefetch_label = PREFETCH_STATE_LABELS[prefetch_job['state']]
+        if prefetch_job['elapsed'] is not None:
+            prefetch_label += f" ({prefetch_job['elapsed']:.2f}초)"
+        startup_caption.caption(
+            f"⏱️ 데이터 준비 시간: {startup_stats['elapsed']:.2f}초 · "
+            f"{'전세' if other_contract_type == 'jeonse' else '월세'} 사전 로딩: {prefetch_label}")
+
+        # 검색 조건 (검색 결과/그래프 캐시 키)
+        search_key = (contract_type, snapshot_month, tuple(location_weights),
+                      tuple(selected_districts), tuple(selected_sizes), tuple(price_range),
+                      conversion_rate, exclude_anomalies, trend_filter)
+
+        # 검색 결과는 세션에 보관 → 이후 위젯 변경(지도 설정 등)에도 다시 검색하지 않음
         if search_btn:
             with st.spinner('🔄 데이터 로딩 중...'):
-                df = load_data_simple(contract_type)
+                search_df, search_matrix = run_search(
+                    contract_type, snapshot_month, location_weights,
+                    selected_districts, selected_sizes, price_range,
+                    conversion_rate, exclude_anomalies, trend_filter)
+                st.session_state.search = {
+                    'key': search_key,
+                    'contract_type': contract_type,
+                    'vfm_grades': vfm_grades,
+                    'snapshot_month': snapshot_month,
+                    'districts': list(selected_districts),
+                    'sizes': list(selected_sizes),
+                    'df': search_df,
+                    'location_matrix': search_matrix,
+                    # 기본 검색 조건이면 사전 렌더링된 지도 사용 가능 (가중치는 표시 시점에 확인)
+                    'allow_prerendered': snapshot_month is None and conversion_rate is None and not exclude_anomalies and trend_filter == 'all' and is_default_search(
+                        selected_districts, selected_sizes, price_range, vfm_grades)
+                }
+
+        search = st.session_state.get('search')
+        if search is None:
+            st.info("🔍 왼쪽 패널에서 검색 조건을 설정한 후 '검색하기' 버튼을 눌러주세요.")
+            return
+
+        df_filtered = search['df']
+        if df_filtered is None:
+            st.error("❌ 데이터를 불러올 수 없습니다.")
+            return
+
+        # 가중치만 바뀌었으면 검색 없이 즉시 재순위 (보관된 결과 행 행렬 × 가중치 1회)
+        result_key = search['key']
+        if is_weights_only_change(result_key, search_key):
+            df_filtered = apply_location_weights(
+                df_filtered, search['location_matrix'], location_weights)
+            result_key = search_key
+        if result_key != search_key or search['vfm_grades'] != vfm_grades:
+            st.caption("ℹ️ 검색 조건이 변경되었습니다. '검색하기'를 누르면 결과에 반영됩니다.")
+        allow_prerendered = search['allow_prerendered'] and is_default_weights(result_key[2])
+
+        result_contract_type = search['contract_type']
+        result_grades = search['vfm_grades']
+
+        if len(df_filtered) > 0:
+            grade_counts = count_vfm_grades(
+                df_filtered['vfm_grade'].values)
+            orange_count = grade_counts[VFM_GRADE_CODES['normal']]
+            blue_count = grade_counts[VFM_GRADE_CODES['good']]
+            green_count = grade_counts[VFM_GRADE_CODES['excellent']]
+
+            st.write("### 🎨 VFM 등급별 분포")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(f"""
+                <div style='background: linear-gradient(135deg, #2ecc71 0%, #27ae60 100%); 
+                            padding: 1rem; border-radius: 10px; text-align: center; 
+                            box-shadow: 0 2px 8px rgba(46,204,113,0.4);'>
+                    <div style='color: white; font-size: 0.8rem; margin-bottom: 0.3rem;'>🟢 최우수</div>
+                    <div style='color: white; font-size: 1.8rem; font-weight: 700;'>{green_count:,}개</div>
+                    <div style='color: rgba(255,255,255,0.9); font-size: 0.75rem; margin-top: 0.3rem;'>
+                        {'2.0 이상' if 'excellent' in result_grades else '필터링됨'}
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"""
+                <div style='background: linear-gradient(135deg, #3498db 0%, #2980b9 100%); 
+                            padding: 1rem; border-radius: 10px; text-align: center; 
+                            box-shadow: 0 2px 8px rgba(52,152,219,0.4);'>
+                    <div style='color: white; font-size: 0.8rem; margin-bottom: 0.3rem;'>🔵 우수</div>
+                    <div style='color: white; font-size: 1.8rem; font-weight: 700;'>{blue_count:,}개</div>
+                    <div style='color: rgba(255,255,255,0.9); font-size: 0.75rem; margin-top: 0.3rem;'>
+                        {'1.0~2.0' if 'good' in result_grades else '필터링됨'}
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"""
+                <div style='background: linear-gradient(135deg, #e67e22 0%, #d35400 100%); 
+                            padding: 1rem; border-radius: 10px; text-align: center; 
+                            box-shadow: 0 2px 8px rgba(230,126,34,0.4);'>
+                    <div style='color: white; font-size: 0.8rem; margin-bottom: 0.3rem;'>🟠 보통</div>
+                    <div style='color: white; font-size: 1.8rem; font-weight: 700;'>{orange_count:,}개</div>
+                    <div style='color: rgba(255,255,255,0.9); font-size: 0.75rem; margin-top: 0.3rem;'>
+                        {'0.5~1.0' if 'normal' in result_grades else '필터링됨'}
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
 
-            if df.empty:
-                st.error("❌ 데이터를 불러올 수 없습니다.")
-            else:
-                df_filtered = df.copy()
-
-                if '전체' not in selected_districts and len(selected_districts) > 0:
-                    df_filtered = df_filtered[df_filtered['district'].isin(
-                        selected_districts)]
-
-                if '전체' not in selected_sizes and len(selected_sizes) > 0:
-                    df_filtered = df_filtered[df_filtered['size_category'].isin(
-                        selected_sizes)]
-
-                # 가격 필터링
-                if 'total_deposit_median' in df_filtered.columns:
-                    df_filtered = df_filtered[
-                        (df_filtered['total_deposit_median'] >= price_range[0]) &
-                        (df_filtered['total_deposit_median'] <= price_range[1])
-                    ]
-
-                df_filtered = df_filtered.reset_index(drop=True)
-
-                if len(df_filtered) > 0:
-                    orange_count = len(df_filtered[(df_filtered['custom_vfm'] >= 0.5) & (
-                        df_filtered['custom_vfm'] < 1.0)])
-                    blue_count = len(df_filtered[(df_filtered['custom_vfm'] >= 1.0) & (
-                        df_filtered['custom_vfm'] < 2.0)])
-                    green_count = len(
-                        df_filtered[df_filtered['custom_vfm'] >= 2.0])
-
-                    st.write("### 🎨 VFM 등급별 분포")
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.markdown(f"""
-                        <div style='background: linear-gradient(135deg, #2ecc71 0%, #27ae60 100%); 
-                                    padding: 1rem; border-radius: 10px; text-align: center; 
-                                    box-shadow: 0 2px 8px rgba(46,204,113,0.4);'>
-                            <div style='color: white; font-size: 0.8rem; margin-bottom: 0.3rem;'>🟢 최우수</div>
-                            <div style='color: white; font-size: 1.8rem; font-weight: 700;'>{green_count:,}개</div>
-                            <div style='color: rgba(255,255,255,0.9); font-size: 0.75rem; margin-top: 0.3rem;'>
-                                {'2.0 이상' if show_excellent else '필터링됨'}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col2:
-                        st.markdown(f"""
-                        <div style='background: linear-gradient(135deg, #3498db 0%, #2980b9 100%); 
-                                    padding: 1rem; border-radius: 10px; text-align: center; 
-                                    box-shadow: 0 2px 8px rgba(52,152,219,0.4);'>
-                            <div style='color: white; font-size: 0.8rem; margin-bottom: 0.3rem;'>🔵 우수</div>
-                            <div style='color: white; font-size: 1.8rem; font-weight: 700;'>{blue_count:,}개</div>
-                            <div style='color: rgba(255,255,255,0.9); font-size: 0.75rem; margin-top: 0.3rem;'>
-                                {'1.0~2.0' if show_good else '필터링됨'}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col3:
-                        st.markdown(f"""
-                        <div style='background: linear-gradient(135deg, #e67e22 0%, #d35400 100%); 
-                                    padding: 1rem; border-radius: 10px; text-align: center; 
-                                    box-shadow: 0 2px 8px rgba(230,126,34,0.4);'>
-                            <div style='color: white; font-size: 0.8rem; margin-bottom: 0.3rem;'>🟠 보통</div>
-                            <div style='color: white; font-size: 1.8rem; font-weight: 700;'>{orange_count:,}개</div>
-                            <div style='color: rgba(255,255,255,0.9); font-size: 0.75rem; margin-top: 0.3rem;'>
-                                {'0.5~1.0' if show_normal else '필터링됨'}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    if 'size_category' in df_filtered.columns:
-                        st.write("### 📏 평형별 분포")
-                        col1, col2, col3, col4 = st.columns(4)
-
-                        size_counts = df_filtered['size_category'].value_counts(
-                        )
-
-                        with col1:
-                            count = size_counts.get('초소형', 0)
-                            st.metric("🏠 초소형", f"{count:,}개", delta="<40㎡")
-                        with col2:
-                            count = size_counts.get('소형', 0)
-                            st.metric("🏡 소형", f"{count:,}개", delta="40~60㎡")
-                        with col3:
-                            count = size_counts.get('중형', 0)
-                            st.metric("🏘️ 중형", f"{count:,}개", delta="60~85㎡")
-                        with col4:
-                            count = size_counts.get('대형', 0)
-                            st.metric("🏰 대형", f"{count:,}개", delta="85㎡+")
-
-                st.markdown("<br>", unsafe_allow_html=True)
-
-                # 탭에 따라 다른 내용 표시
-                if view_tab == '🗺️ 지도':
-                    if map_type == 'marker' and len(df_filtered) > marker_limit:
-                        sort_label = "높은" if sort_order == "desc" else "낮은"
-                        st.warning(
-                            f"⚠️ 검색 결과 **{len(df_filtered):,}건** 중 **VFM {sort_label} 순 {marker_limit}개**만 표시됩니다.")
-
-                    folium_map = create_map(
-                        df_filtered, map_type, contract_type, marker_limit, sort_order, vfm_grades)
-                    st_folium(folium_map, width=None,
-                              height=600, returned_objects=[])
-
-                else:  # 시각화 탭
-                    create_visualizations(df_filtered, contract_type)
+            if 'size_category' in df_filtered.columns:
+                st.write("### 📏 평형별 분포")
+                col1, col2, col3, col4 = st.columns(4)
 
-        else:
-            st.info("🔍 왼쪽 패널에서 검색 조건을 설정한 후 '검색하기' 버튼을 눌러주세요.")
+                size_counts = df_filtered['size_category'].value_counts(
+                )
+
+                with col1:
+                    count = size_counts.get('초소형', 0)
+                    st.metric("🏠 초소형", f"{count:,}개", delta="<40㎡")
+                with col2:
+                    count = size_counts.get('소형', 0)
+                    st.metric("🏡 소형", f"{count:,}개", delta="40~60㎡")
+                with col3:
+                    count = size_counts.get('중형', 0)
+                    st.metric("🏘️ 중형", f"{count:,}개", delta="60~85㎡")
+                with col4:
+                    count = size_counts.get('대형', 0)
+                    st.metric("🏰 대형", f"{count:,}개", delta="85㎡+")
+
+            render_export_buttons(df_filtered, result_contract_type)
 
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        # 탭에 따라 다른 내용 표시 (지도/시각화는 각각 독립 fragment)
+        if view_tab == '🗺️ 지도':
+            render_map_panel(df_filtered, result_contract_type,
+                             result_grades, allow_prerendered,
+                             search['snapshot_month'], search['districts'], search['sizes'])
+        else:  # 시각화 탭
+            create_visualizations(
+                df_filtered, result_contract_type, result_key)
 
 if __name__ == "__main__":
     try:
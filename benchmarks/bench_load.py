@@ -0,0 +1,337 @@
+"""
+Load Benchmark
+동시 세션 부하 테스트: 로컬에서 띄운 streamlit 서버에 웹소켓 세션 N개를 동시에 연결
+- 브라우저 대신 BackMsg(rerun_script)를 보내고 script_finished까지 ForwardMsg 수신 → 지연 측정
+- 수신 메시지는 AppTest의 element tree로 파싱 → 위젯 조회/값 변경은 AppTest와 같은 API
+  (AppTest는 실행마다 프로세스 전역 Runtime을 교체하므로 동시 실행 불가)
+- 세션마다 무작위 검색 조건(계약 유형/구/평형/가격/가중치)으로 검색 → 지도 방식 전환(fragment 재실행)
+  → 시각화 탭 → 상세 분석 페이지(구 변경, 그리드 비교)
+- 동작별 지연 p50/p95/p99, 서버 프로세스 최대 RSS / CPU 시간(세션당 평균) 보고 (Linux /proc 기준)
+실행: python benchmarks/bench_load.py [세션 수] [세션당 반복 수] (또는 python -m benchmarks.bench_load)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import subprocess
+import urllib.request
+import numpy as np
+from types import SimpleNamespace
+from collections import defaultdict
+
+# 직접 실행(python benchmarks/bench_load.py)해도 modules를 import할 수 있도록 저장소 루트를 경로에 추가
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from modules.metadata import load_metadata
+from modules.scoring import LOCATION_INDEX_COLUMNS
+
+
+APP_PATH = 'app.py'
+DETAIL_PAGE_NAME = 'detail_analysis'
+SERVER_PORT = 8599
+SERVER_START_TIMEOUT = 60
+RUN_TIMEOUT = 600
+
+MAP_TYPES = ['marker', 'heatmap', 'grid', 'district']
+LATENCY_PERCENTILES = [50, 95, 99]
+COMPARE_GRIDS = 5
+
+
+def start_server(port=SERVER_PORT):
+    """streamlit 서버 실행 후 health 체크가 될 때까지 대기"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+         '--server.headless', 'true', '--server.port', str(port),
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.perf_counter() + SERVER_START_TIMEOUT
+    while time.perf_counter() < deadline:
+        try:
+            urllib.request.urlopen(f'http://localhost:{port}/_stcore/health', timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"서버 시작 실패 (port {port})")
+
+
+def read_process_usage(pid):
+    """서버 프로세스 (CPU 시간(초), 현재 RSS(MB)) - /proc 기준"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    with open(f'/proc/{pid}/statm') as f:
+        rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    return cpu, rss
+
+
+def find_widget(elements, label):
+    """라벨로 위젯 찾기"""
+    return [element for element in elements if element.label == label][0]
+
+
+def random_filters(rng, metadata):
+    """실사용에 가까운 검색 조건 (구 1~3개 또는 전체, 가격은 슬라이더 눈금 위)"""
+    districts = ['전체'] if rng.random() < 0.3 else list(
+        rng.choice(metadata['districts'], rng.integers(1, 4), replace=False))
+    sizes = ['전체'] if rng.random() < 0.5 else list(
+        rng.choice(metadata['size_categories'], rng.integers(1, 3), replace=False))
+    low = int(rng.integers(0, 40)) * 1000
+    high = min(low + int(rng.integers(5, 60)) * 1000, 100000)
+    return districts, sizes, (low, high)
+
+
+def pick_option(widget, rng, options=None):
+    """화면에 표시된 옵션 라벨 중 하나 선택 (브라우저는 선택 위젯 값을 라벨로 전송)"""
+    options = widget.options if options is None else options
+    return str(options[rng.integers(len(options))])
+
+
+class SessionClient:
+    """
+    웹소켓 세션 1개 (브라우저 역할)
+    브라우저처럼 현재 화면의 위젯 상태를 모두 보관해 매 실행마다 전송 (버튼 트리거는 1회만)
+    선택 위젯 값은 옵션 라벨 그대로 설정 (AppTest 세션 상태 대신 format_func = str)
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.messages = {}
+        self.widget_states = {}
+        self.widget_fragments = {}
+        self.page_hashes = {}
+        self.page_hash = ''
+
+    def collect_widget_states(self, tree):
+        """set_value / click 된 위젯을 보관 상태에 반영 → (전송할 WidgetStates, 바꾼 위젯의 fragment id)"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetStates
+        from streamlit.testing.v1.element_tree import Widget, Button, DownloadButton, InitialValue
+
+        triggers = []
+        fragments = set()
+        for node in tree or []:
+            if not isinstance(node, Widget):
+                continue
+            value = node._value
+            is_trigger = isinstance(node, (Button, DownloadButton))
+            if value is None or isinstance(value, InitialValue) or (is_trigger and value is False):
+                continue
+            if is_trigger:
+                triggers.append(node._widget_state)
+            else:
+                self.widget_states[node.id] = node._widget_state
+            fragments.add(self.widget_fragments.get(node.id, ''))
+
+        states = WidgetStates()
+        states.widgets.extend(list(self.widget_states.values()) + triggers)
+        return states, fragments
+
+    async def run(self, tree=None, page=None):
+        """
+        스크립트 재실행 → 새 element tree
+        바꾼 위젯이 모두 같은 fragment 안에 있으면 브라우저처럼 해당 fragment만 재실행
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+        states, fragments = self.collect_widget_states(tree)
+        fragment_id = fragments.pop() if len(fragments) == 1 else ''
+        if page is not None:
+            self.page_hash = self.page_hashes.get(page, '')
+            self.widget_states = {}
+            fragment_id = ''
+
+        back_msg = BackMsg()
+        back_msg.rerun_script.widget_states.CopyFrom(states)
+        back_msg.rerun_script.page_script_hash = self.page_hash
+        back_msg.rerun_script.fragment_id = fragment_id
+        await self.websocket.send(back_msg.SerializeToString())
+
+        if not fragment_id:
+            self.messages = {}
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await asyncio.wait_for(self.websocket.recv(), RUN_TIMEOUT))
+            if msg.HasField('navigation'):
+                self.page_hashes = {page.url_pathname: page.page_script_hash
+                                    for page in msg.navigation.app_pages}
+            elif msg.HasField('delta'):
+                path = tuple(msg.metadata.delta_path)
+                self.messages[path] = msg
+                if msg.delta.HasField('new_element'):
+                    element = msg.delta.new_element
+                    widget = getattr(element, element.WhichOneof('type'))
+                    if hasattr(widget, 'id'):
+                        self.widget_fragments[widget.id] = msg.delta.fragment_id
+            elif msg.HasField('script_finished'):
+                break
+        from streamlit.runtime.state.common import TESTING_KEY
+
+        tree = parse_tree_from_messages(list(self.messages.values()))
+        if not fragment_id:
+            # 전체 실행 후 화면에 없는 위젯 상태는 버림 (브라우저와 동일)
+            shown = {node.id for node in tree if hasattr(node, 'id')}
+            self.widget_states = {widget_id: state for widget_id, state
+                                  in self.widget_states.items() if widget_id in shown}
+        tree._runner = SimpleNamespace(
+            _session_state={TESTING_KEY: defaultdict(lambda: str)}, _cleared_form_ids=set())
+        return tree
+
+
+class LatencyRecorder:
+    """동작별 지연 기록 (전체 세션 공유)"""
+
+    def __init__(self):
+        self.timings = []
+
+    async def __call__(self, action, run):
+        start = time.perf_counter()
+        tree = await run
+        self.timings.append((action, time.perf_counter() - start))
+        return tree
+
+    def summarize(self):
+        """동작별 (건수, p50, p95, p99) (ms)"""
+        actions = {}
+        for action, elapsed in self.timings:
+            actions.setdefault(action, []).append(elapsed * 1000)
+        actions['전체'] = [elapsed * 1000 for _, elapsed in self.timings]
+        return {action: (len(values), *np.percentile(values, LATENCY_PERCENTILES))
+                for action, values in actions.items() if values}
+
+
+async def run_app_session(client, rng, record):
+    """메인 앱: 첫 화면 → 조건 변경 → 검색 → 지도 방식 전환 → 시각화 탭"""
+    tree = await record('app: 첫 화면', client.run(page=''))
+
+    contract_box = find_widget(tree.radio, '계약 유형')
+    contract_box.set_value(pick_option(contract_box, rng))
+    contract_type = 'monthly' if contract_box.options.index(contract_box.value) == 0 else 'jeonse'
+    districts, sizes, price_range = random_filters(rng, load_metadata(contract_type))
+    find_widget(tree.multiselect, '구 선택').set_value(districts)
+    find_widget(tree.multiselect, '평형 선택').set_value(sizes)
+    find_widget(tree.slider, '가격').set_value(price_range)
+    if rng.random() < 0.3:
+        column = str(rng.choice(LOCATION_INDEX_COLUMNS))
+        tree.slider(key=f'weight_{column}').set_value(round(float(rng.uniform(0, 3)), 1))
+    tree = await record('app: 조건 변경', client.run(tree))
+
+    [b for b in tree.button if '검색' in b.label][0].click()
+    tree = await record('app: 검색', client.run(tree))
+
+    # 지도 설정은 fragment 안 위젯 → fragment만 재실행 (타임랩스 제외)
+    map_box = tree.radio(key='map_type')
+    map_box.set_value(pick_option(map_box, rng, map_box.options[:len(MAP_TYPES)]))
+    tree = await record('app: 지도 전환', client.run(tree))
+
+    find_widget(tree.radio, '보기 모드').set_value('📊 시각화')
+    tree = await record('app: 시각화 탭', client.run(tree))
+    return [str(e.value) for e in tree.exception]
+
+
+async def run_page_session(client, rng, record):
+    """상세 분석 페이지: 첫 화면 → 구 변경 → 그리드 비교"""
+    tree = await record('page: 첫 화면', client.run(page=DETAIL_PAGE_NAME))
+
+    district_box = find_widget(tree.selectbox, '구 선택')
+    district_box.set_value(pick_option(district_box, rng))
+    tree = await record('page: 구 변경', client.run(tree))
+
+    view_box = find_widget(tree.radio, '보기 방식')
+    view_box.set_value(view_box.options[1])
+    tree = await client.run(tree)
+    pairs = [w for w in tree.multiselect if w.label.startswith('비교할')][0]
+    picked = rng.choice(len(pairs.options), min(COMPARE_GRIDS, len(pairs.options)), replace=False)
+    pairs.set_value([pairs.options[i] for i in picked])
+    tree = await record('page: 그리드 비교', client.run(tree))
+    return [str(e.value) for e in tree.exception]
+
+
+async def run_session(session_id, iterations, record, port):
+    """세션 1개: 메인 앱 + 상세 페이지 시나리오를 iterations회 반복 → 오류 목록"""
+    import websockets
+
+    rng = np.random.default_rng(session_id)
+    errors = []
+    async with websockets.connect(f'ws://localhost:{port}/_stcore/stream',
+                                  subprotocols=['streamlit'], max_size=None) as websocket:
+        client = SessionClient(websocket)
+        for _ in range(iterations):
+            try:
+                errors += await run_app_session(client, rng, record)
+                errors += await run_page_session(client, rng, record)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    return errors
+
+
+async def sample_peak_rss(pid, stop, interval=0.1):
+    """측정 구간 동안 서버 RSS 최댓값 (MB)"""
+    peak = 0.0
+    while not stop.is_set():
+        peak = max(peak, read_process_usage(pid)[1])
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+    return peak
+
+
+async def run_sessions(n_sessions, iterations, port, pid):
+    """세션 N개 동시 실행 → (기록기, 오류 목록, 경과 시간, 측정 구간 최대 RSS)"""
+    record = LatencyRecorder()
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_peak_rss(pid, stop))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_session(session_id, iterations, record, port)
+        for session_id in range(n_sessions)
+    ])
+    wall = time.perf_counter() - start
+
+    stop.set()
+    return record, [error for errors in results for error in errors], wall, await sampler
+
+
+def run(n_sessions=10, iterations=1, port=SERVER_PORT, warmup=True):
+    server = start_server(port)
+    try:
+        # 세션 1개를 먼저 실행해 공유 캐시를 채운 뒤 측정 (서버 정상 상태 기준)
+        if warmup:
+            print("🔥 워밍업 세션 실행 중...")
+            asyncio.run(run_session(n_sessions, 1, LatencyRecorder(), port))
+
+        cpu_before, rss_before = read_process_usage(server.pid)
+        record, errors, wall, peak_rss = asyncio.run(
+            run_sessions(n_sessions, iterations, port, server.pid))
+        cpu_after, _ = read_process_usage(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n👥 동시 세션 {n_sessions}개 × {iterations}회 | 전체 {wall:.1f}초 | "
+          f"동작 {len(record.timings):,}건 | 오류 {len(errors)}건")
+    header = ' / '.join(f'p{p}' for p in LATENCY_PERCENTILES)
+    print(f"{'동작':<18} {'건수':>5}  {header} (ms)")
+    for action, (count, *values) in record.summarize().items():
+        print(f"{action:<18} {count:>5}  " + ' / '.join(f"{v:,.0f}" for v in values))
+
+    cpu = cpu_after - cpu_before
+    print(f"🧠 서버 최대 RSS: {peak_rss:,.0f}MB (측정 전 {rss_before:,.0f}MB, "
+          f"세션당 증가 {max(peak_rss - rss_before, 0) / n_sessions:,.1f}MB)")
+    print(f"⚙️ 서버 CPU: 전체 {cpu:.1f}초 (사용률 {cpu / wall * 100:.0f}%), "
+          f"세션당 {cpu / n_sessions:.2f}초")
+    for error in sorted(set(errors))[:5]:
+        print(f"❌ {error}")
+
+
+if __name__ == '__main__':
+    # 앱·데이터 경로는 저장소 루트 기준 상대 경로
+    os.chdir(REPO_ROOT)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1)
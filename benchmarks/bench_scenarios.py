@@ -0,0 +1,91 @@
+"""
+Scenario Benchmark
+전환율 시나리오 재계산 검증 + 소요 시간 측정 (합성 월세 데이터)
+- 데이터 전환율에서 입력 컬럼(가격/예측가/변화율/VFM)이 그대로 재현되는지 확인
+- 데이터 전환율 ± 1눈금에서 값 변화가 눈금 크기 수준인지 확인 (연속성)
+실행: python benchmarks/bench_scenarios.py [행 수] (또는 python -m benchmarks.bench_scenarios)
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# 직접 실행(python benchmarks/bench_scenarios.py)해도 modules를 import할 수 있도록 저장소 루트를 경로에 추가
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from modules.scenarios import (
+    build_conversion_inputs,
+    compute_conversion_scenario,
+    SCENARIO_COLUMNS,
+    CONVERSION_RATE_STEP
+)
+
+
+def make_dataset(n_rows, seed=0):
+    """
+    보증금/월세/전환보증금/예측가/VFM 합성 데이터
+    전환보증금은 보증금·월세 중앙값과 별도로 집계된 값처럼 잡음을 섞고,
+    월세가 없는 행과 예측가가 없는 행을 일부 포함
+    """
+    rng = np.random.default_rng(seed)
+    deposit = rng.lognormal(8.0, 0.8, n_rows).round()
+    rent = rng.lognormal(4.0, 0.5, n_rows).round()
+    rent[rng.random(n_rows) < 0.05] = 0
+    price = (deposit + rent * 1200 / 5.3) * rng.normal(1.0, 0.03, n_rows)
+    future = price * rng.normal(1.04, 0.08, n_rows)
+    future[rng.random(n_rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        'original_deposit': deposit,
+        'monthly_rent': rent,
+        'total_deposit_median': price,
+        'future_price': future,
+        'price_change_pct': ((future - price) / price * 100).round(2),
+        'vfm_index': rng.lognormal(0, 0.4, n_rows)
+    })
+
+
+def check_base_rate_identity(inputs):
+    """데이터 전환율 그대로면 모든 시나리오 컬럼이 입력과 같아야 함"""
+    scenario = compute_conversion_scenario(inputs, inputs['base_rate'])
+    originals = {
+        'total_deposit_median': inputs['price'],
+        'future_price': inputs['future'],
+        'price_change_pct': inputs['change_pct'],
+        'vfm_index': inputs['vfm']
+    }
+    for col in SCENARIO_COLUMNS:
+        assert np.array_equal(scenario[col], originals[col], equal_nan=True), col
+    print(f"✅ 데이터 전환율 {inputs['base_rate']:.3f}%: 입력 컬럼 재현")
+
+
+def check_continuity(inputs):
+    """데이터 전환율 ± 1눈금에서 가격 변화율이 전환율 변화율을 넘지 않아야 함"""
+    for step in [-CONVERSION_RATE_STEP, CONVERSION_RATE_STEP]:
+        rate = inputs['base_rate'] + step
+        scenario = compute_conversion_scenario(inputs, rate)
+        price_change = np.abs(scenario['total_deposit_median'] / inputs['price'] - 1)
+        bound = abs(inputs['base_rate'] / rate - 1)
+        assert np.nanmax(price_change) <= bound + 1e-12, (rate, np.nanmax(price_change))
+        print(f"✅ 전환율 {rate:.3f}%: 최대 가격 변화 {np.nanmax(price_change) * 100:.2f}% "
+              f"(한도 {bound * 100:.2f}%)")
+
+
+def run(n_rows=1_000_000, repeats=3):
+    inputs = build_conversion_inputs(make_dataset(n_rows))
+    check_base_rate_identity(inputs)
+    check_continuity(inputs)
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        compute_conversion_scenario(inputs, 4.0)
+        timings.append(time.perf_counter() - start)
+    print(f"{n_rows:,}행 | 시나리오 재계산 최소 {min(timings) * 1000:.1f}ms / "
+          f"평균 {np.mean(timings) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
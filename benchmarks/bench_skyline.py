@@ -0,0 +1,47 @@
+"""
+Skyline Benchmark
+1M행 합성 데이터로 compute_skyline 소요 시간 측정 (독립/역상관 분포)
+실행: python benchmarks/bench_skyline.py [행 수] (또는 python -m benchmarks.bench_skyline)
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+# 직접 실행(python benchmarks/bench_skyline.py)해도 modules를 import할 수 있도록 저장소 루트를 경로에 추가
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from modules.skyline import compute_skyline
+
+
+def make_dataset(n_rows, distribution, seed=0):
+    """가격/VFM/입지 총점 합성 데이터 (independent: 독립, anti: 가격-품질 역상관)"""
+    rng = np.random.default_rng(seed)
+    price = rng.lognormal(9.5, 0.6, n_rows)
+    if distribution == 'anti':
+        # 비쌀수록 VFM/입지가 좋아지는 최악 조건 → 스카이라인이 커짐
+        quality = np.log(price) + rng.normal(0, 0.3, n_rows)
+        vfm = quality + rng.normal(0, 0.3, n_rows)
+        infra = quality + rng.normal(0, 0.3, n_rows)
+    else:
+        vfm = rng.lognormal(0, 0.5, n_rows)
+        infra = rng.random(n_rows) * 5
+    return price, vfm, infra
+
+
+def run(n_rows=1_000_000, repeats=3):
+    for distribution in ['independent', 'anti']:
+        price, vfm, infra = make_dataset(n_rows, distribution)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            idx = compute_skyline(price, vfm, infra)
+            timings.append(time.perf_counter() - start)
+        print(f"{distribution:>12} | {n_rows:,}행 | 스카이라인 {len(idx):,}개 | "
+              f"최소 {min(timings) * 1000:.1f}ms / 평균 {np.mean(timings) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,93 @@
+"""
+Startup Benchmark
+앱 시작 비용 측정: 모듈 import 시간(python -X importtime) + 첫 화면/첫 탭 렌더링 시간
+실행: python benchmarks/bench_startup.py (또는 python -m benchmarks.bench_startup)
+"""
+
+import os
+import re
+import sys
+import time
+import subprocess
+
+# 직접 실행(python benchmarks/bench_startup.py)해도 modules를 import할 수 있도록 저장소 루트를 경로에 추가
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# 탭별로 처음 사용할 때만 로드되어야 하는 렌더링 라이브러리
+# (plotly / plotly.graph_objects는 streamlit이 테마 설정용으로 항상 import → express로 판단)
+HEAVY_MODULES = ['plotly.express', 'folium', 'streamlit_folium', 'branca']
+
+IMPORTTIME_PATTERN = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure_import_time(target='app'):
+    """별도 프로세스에서 python -X importtime 실행 → (전체 ms, 패키지별 누적 ms, 로드된 무거운 모듈)"""
+    code = (f"import sys; import {target}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=os.getcwd())
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    # importtime 출력은 자식 → 부모 순서 → 역순으로 읽으며 부모 패키지를 추적
+    # 다른 패키지에서 처음 import될 때의 누적 시간만 더해 패키지별 비용 산출
+    package_ms = {}
+    stack = []
+    for line in reversed(proc.stderr.splitlines()):
+        match = IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        indent, name = len(match.group(3)), match.group(4)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        package = name.split('.')[0]
+        if not stack or stack[-1][1] != package:
+            package_ms[package] = package_ms.get(package, 0) + int(match.group(2)) / 1000
+        stack.append((indent, package))
+
+    loaded = [m for m in proc.stdout.strip().splitlines()[-1:] if m]
+    return wall_ms, package_ms, loaded[0].split(',') if loaded else []
+
+
+def measure_first_render(app_path='app.py'):
+    """AppTest로 첫 실행 / 첫 지도 검색 / 첫 시각화 탭 렌더링 시간 측정"""
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    start = time.perf_counter()
+    at = AppTest.from_file(os.path.abspath(app_path), default_timeout=600).run()
+    timings['첫 화면'] = time.perf_counter() - start
+
+    search_btn = [b for b in at.button if '검색' in b.label][0]
+    start = time.perf_counter()
+    at = search_btn.click().run()
+    timings['첫 검색 (지도 탭)'] = time.perf_counter() - start
+
+    [r for r in at.radio if r.label == '보기 모드'][0].set_value('📊 시각화')
+    start = time.perf_counter()
+    at = at.run()
+    timings['첫 시각화 탭'] = time.perf_counter() - start
+
+    errors = [str(e.value) for e in at.exception]
+    return timings, errors
+
+
+def run():
+    wall_ms, package_ms, loaded = measure_import_time()
+    print(f"📦 import app: {wall_ms:,.0f}ms (프로세스 포함)")
+    for name, cumulative_ms in sorted(package_ms.items(), key=lambda x: -x[1])[:10]:
+        print(f"   - {name:<20} {cumulative_ms:8.1f}ms")
+    print(f"   - 시작 시 로드된 렌더링 라이브러리: {', '.join(loaded) or '없음'}")
+
+    timings, errors = measure_first_render()
+    for label, seconds in timings.items():
+        print(f"⏱️ {label}: {seconds * 1000:,.0f}ms")
+    if errors:
+        print(f"❌ 오류: {errors}")
+
+
+if __name__ == "__main__":
+    # 앱·데이터 경로는 저장소 루트 기준 상대 경로
+    os.chdir(REPO_ROOT)
+    run()
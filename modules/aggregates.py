@@ -0,0 +1,98 @@
+"""
+Aggregates Module for Seoul Real Estate VFM Analysis
+히스토리 기반 구×평형×월 벤치마크 테이블 (사전 계산, 월 단위 부분 갱신 가능)
+- 건수 + 가격/VFM/입지 지표별 평균 (건수 가중으로 구 단위 합산 가능)
+- 중앙값·분위수는 병합 가능한 분위수 스케치(modules.sketches)에서 계산
+"""
+
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_history,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh,
+    LOCATION_INDEX_COLUMNS
+)
+
+
+DISTRICT_STATS_KEYS = ['district', 'size_category', 'year_month']
+
+# 구별 벤치마크 대상 값 (가격, VFM, 입지 지표 5개)
+DISTRICT_STATS_VALUES = ['total_deposit_median',
+                         'custom_vfm'] + LOCATION_INDEX_COLUMNS
+
+DISTRICT_STATS_COLUMNS = DISTRICT_STATS_KEYS + ['count'] + \
+    [f'{col}_mean' for col in DISTRICT_STATS_VALUES]
+
+
+def get_district_stats_path(contract_type='monthly'):
+    """구×평형×월 집계 테이블 경로"""
+    return get_precomputed_path(f'district_stats_{contract_type}.parquet')
+
+
+def build_district_stats(df):
+    """
+    히스토리 프레임 → 구×평형×월 벤치마크 테이블
+
+    Returns:
+    --------
+    pd.DataFrame
+        키 컬럼 + count + 값별 {col}_mean
+    """
+    grouped = df.groupby(DISTRICT_STATS_KEYS, sort=True,
+                         observed=True)[DISTRICT_STATS_VALUES]
+
+    stats = grouped.mean().add_suffix('_mean')
+    stats.insert(0, 'count', grouped.size())
+    return stats.reset_index()
+
+
+def merge_district_stats(existing, updated, replaced_months):
+    """기존 집계에서 replaced_months 구간을 제거하고 updated로 교체"""
+    if existing is None or existing.empty:
+        merged = updated
+    else:
+        # 이전 형식 산출물의 추가 컬럼(분위수 등)은 버림
+        kept = existing[~existing['year_month'].isin(replaced_months)].reindex(
+            columns=updated.columns)
+        merged = pd.concat([kept, updated], ignore_index=True)
+    return merged.sort_values(DISTRICT_STATS_KEYS).reset_index(drop=True)
+
+
+def write_district_stats(contract_type='monthly', parts=None):
+    """히스토리 → 구×평형×월 벤치마크 생성/저장 (parts: 월 파티션별로 이미 생성한 집계 목록)"""
+    if parts is not None:
+        stats = merge_district_stats(None, pd.concat(parts, ignore_index=True), [])
+    else:
+        stats = build_district_stats(load_vfm_history(contract_type))
+    path = get_district_stats_path(contract_type)
+    stats.to_parquet(path, index=False)
+    print(f"✅ 구별 집계 저장: {path} ({len(stats):,}행)")
+    return stats
+
+
+@st.cache_data(show_spinner=False)
+def load_district_stats(contract_type='monthly'):
+    """구×평형×월 벤치마크 로드 (디스크 산출물이 원본보다 최신이면 재사용)"""
+    path = get_district_stats_path(contract_type)
+    stats = None
+    if is_artifact_fresh(path, get_data_path(contract_type, 'history')):
+        stats = pd.read_parquet(path)
+        # 컬럼 구성이 다른 이전 형식(분위수 컬럼 포함 등)이면 재생성
+        if list(stats.columns) != DISTRICT_STATS_COLUMNS:
+            stats = None
+    if stats is None:
+        stats = write_district_stats(contract_type)
+
+    # (구, 평형, 월) 정렬 인덱스 → 조회 시 groupby 없이 인덱스 슬라이스
+    return stats.set_index(DISTRICT_STATS_KEYS).sort_index()
+
+
+def get_district_benchmark(stats, district, size_category):
+    """구×평형의 월별 벤치마크 (인덱스 조회, year_month 순)"""
+    try:
+        return stats.loc[(district, size_category)]
+    except KeyError:
+        return pd.DataFrame()
@@ -0,0 +1,129 @@
+"""
+Anomaly Module for Seoul Real Estate VFM Analysis
+구×평형×월 그룹 내 robust z-score 기반 VFM 이상치 표시 (사전 계산)
+- 그룹 코드 + 값 기준 1회 정렬 → 그룹별 중앙값/MAD를 위치 인덱싱으로 계산 (groupby 없음)
+- 점수/플래그는 load_vfm_data 행 순서 배열로 저장 → 검색 시 마스크 AND 1회로 제외
+"""
+
+import numpy as np
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_data,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh
+)
+
+
+ANOMALY_KEYS = ['district', 'size_category', 'year_month']
+ANOMALY_FEATURE = 'vfm_index'
+
+# Iglewicz-Hoaglin 기준: |수정 z| > 3.5 이면 이상치
+ANOMALY_Z_THRESHOLD = 3.5
+ANOMALY_MIN_GROUP_SIZE = 5
+
+# 정규분포에서 MAD → 표준편차 환산 (0.6745), MAD = 0일 때 평균절대편차 환산 (1.253314)
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 1.253314
+
+
+def grouped_median(values, codes, n_groups):
+    """그룹 코드별 중앙값 (코드·값 기준 1회 정렬 후 가운데 위치 평균)"""
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    nonempty = counts > 0
+
+    median = np.full(n_groups, np.nan)
+    lo = starts[nonempty] + (counts[nonempty] - 1) // 2
+    hi = starts[nonempty] + counts[nonempty] // 2
+    median[nonempty] = (sorted_values[lo] + sorted_values[hi]) / 2
+    return median
+
+
+def robust_zscores(values, codes, n_groups):
+    """
+    그룹별 수정 z-score
+
+    z = 0.6745 × (x - median) / MAD
+    - MAD = 0이면 (x - median) / (1.253314 × 평균절대편차)
+    - 그룹 크기가 ANOMALY_MIN_GROUP_SIZE 미만이거나 편차가 모두 0이면 0
+    """
+    median = grouped_median(values, codes, n_groups)
+    deviation = values - median[codes]
+    abs_deviation = np.abs(deviation)
+
+    mad = grouped_median(abs_deviation, codes, n_groups)
+    counts = np.bincount(codes, minlength=n_groups)
+    mean_ad = np.bincount(codes, weights=abs_deviation, minlength=n_groups) / np.maximum(counts, 1)
+
+    scale = np.where(mad > 0, mad / MAD_SCALE, MEAN_AD_SCALE * mean_ad)
+    scale[counts < ANOMALY_MIN_GROUP_SIZE] = 0
+    scale = scale[codes]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(scale > 0, deviation / scale, 0.0)
+
+
+def build_anomaly_scores(df):
+    """
+    데이터프레임 → 행별 이상치 점수/플래그 (입력 행 순서)
+
+    Returns:
+    --------
+    dict
+        score (N,) float32 수정 z-score, flag (N,) bool (|score| > 임계값)
+    """
+    n_rows = len(df)
+    score = np.zeros(n_rows, dtype=np.float32)
+    if n_rows == 0 or ANOMALY_FEATURE not in df.columns:
+        return {'score': score, 'flag': np.zeros(n_rows, dtype=bool)}
+
+    values = df[ANOMALY_FEATURE].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values) & df.reindex(columns=ANOMALY_KEYS).notna().all(axis=1).values
+    if valid.any():
+        codes = df.loc[valid, ANOMALY_KEYS].astype(str).groupby(
+            ANOMALY_KEYS, sort=False).ngroup().values
+        score[valid] = robust_zscores(values[valid], codes, codes.max() + 1)
+
+    return {'score': score, 'flag': np.abs(score) > ANOMALY_Z_THRESHOLD}
+
+
+def attach_anomaly_columns(df, scores):
+    """anomaly_score / is_anomaly 컬럼을 붙인 데이터프레임 반환 (행 수가 다르면 그대로)"""
+    if scores is None or len(df) != len(scores['score']):
+        return df
+
+    df = df.copy(deep=False)
+    df['anomaly_score'] = scores['score']
+    df['is_anomaly'] = scores['flag']
+    return df
+
+
+def get_anomaly_path(contract_type='monthly'):
+    """이상치 점수 경로"""
+    return get_precomputed_path(f'anomalies_{contract_type}.npz')
+
+
+def write_anomaly_scores(contract_type='monthly', df=None):
+    """hybrid 데이터 이상치 점수 생성/저장"""
+    if df is None:
+        df = load_vfm_data(contract_type)
+    scores = build_anomaly_scores(df)
+
+    path = get_anomaly_path(contract_type)
+    np.savez(path, **scores)
+    print(f"✅ 이상치 점수 저장: {path} ({int(scores['flag'].sum()):,}/{len(scores['flag']):,}건 표시)")
+    return scores
+
+
+@st.cache_data(show_spinner=False)
+def load_anomaly_scores(contract_type='monthly'):
+    """이상치 점수 로드 (없거나 원본보다 오래되면 재생성)"""
+    path = get_anomaly_path(contract_type)
+    if is_artifact_fresh(path, get_data_path(contract_type, 'hybrid')):
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+    return write_anomaly_scores(contract_type)
@@ -0,0 +1,437 @@
+"""
+Choropleth Module for Seoul Real Estate VFM Analysis
+500m 격자 셀 / 구 단위 단계구분도
+- 셀 폴리곤은 그리드 중심 좌표에서 벡터 연산으로 1회 생성 → 좌표 양자화 GeoJSON으로 디스크 캐시
+- 요청마다 셀별 값 배열만 계산해 캐시된 도형에 결합
+- 구 경계: 번들 경계 파일(data/) 우선, 없으면 격자 셀을 구별로 합친 외곽선 사용
+- 구별 값은 사전 계산된 구×평형×월 집계/분위수 스케치에서 조회 → 검색 결과 건수와 무관
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    load_grid_coordinates,
+    get_precomputed_path,
+    is_artifact_fresh,
+    VFM_GRADE_CODES,
+    GRID_COORDINATES_PATH
+)
+from modules.aggregates import load_district_stats
+from modules.sketches import load_quantile_sketches, sketch_quantiles_grouped
+from modules.filters import is_all_selected, get_visible_grade_codes
+
+
+# 격자 한 변 (m) / 위도 1도 길이 (m)
+GRID_CELL_METERS = 500
+METERS_PER_DEGREE_LAT = 111_320
+
+# 좌표 양자화 자릿수 (소수 5자리 ≈ 1m)
+GRID_CELL_PRECISION = 5
+
+# 히트맵과 동일한 색상 구간 (VFM 0 ~ 3.0)
+CHOROPLETH_COLORS = ['red', 'orange', 'yellow', 'lime', 'green']
+CHOROPLETH_VFM_RANGE = (0.0, 3.0)
+
+# 단순화된 구 경계 파일 (FeatureCollection, properties.name = 구 이름)
+DISTRICT_BOUNDARY_PATH = 'data/seoul_district_boundaries.geojson'
+
+
+def get_grid_cells_path():
+    """격자 셀 GeoJSON 경로"""
+    return get_precomputed_path('grid_cells.geojson')
+
+
+def build_grid_cell_geojson(grid_df):
+    """
+    그리드 중심 좌표 → 격자 셀 사각형 FeatureCollection (feature id = grid_id)
+
+    위도 간격은 고정, 경도 간격은 cos(위도)로 보정해 500m 정사각형을 근사
+    """
+    lat = grid_df['center_lat'].to_numpy(dtype=np.float64)
+    lon = grid_df['center_lon'].to_numpy(dtype=np.float64)
+    half_lat = GRID_CELL_METERS / 2 / METERS_PER_DEGREE_LAT
+    half_lon = half_lat / np.cos(np.radians(lat))
+
+    # (셀, 꼭짓점 5개 - 닫힌 링, [lon, lat]) 배열을 한 번에 계산
+    corner_lon = np.array([-1, 1, 1, -1, -1])
+    corner_lat = np.array([-1, -1, 1, 1, -1])
+    rings = np.stack([lon[:, None] + corner_lon * half_lon[:, None],
+                      lat[:, None] + corner_lat * half_lat], axis=2)
+    rings = np.round(rings, GRID_CELL_PRECISION).tolist()
+
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'id': grid_id,
+             'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+            for grid_id, ring in zip(grid_df['grid_id'].astype(str), rings)
+        ]
+    }
+
+
+def write_grid_cells():
+    """격자 셀 GeoJSON 생성/저장"""
+    geojson = build_grid_cell_geojson(
+        load_grid_coordinates().dropna(subset=['center_lat', 'center_lon']))
+    path = get_grid_cells_path()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(geojson, f, separators=(',', ':'))
+    print(f"✅ 격자 셀 GeoJSON 저장: {path} ({len(geojson['features']):,}개 셀)")
+    return geojson
+
+
+@st.cache_resource(show_spinner=False)
+def load_grid_cells():
+    """
+    격자 셀 도형 로드 (세션 간 공유, 읽기 전용)
+
+    Returns:
+    --------
+    dict
+        grid_ids (pd.Index), geometries (grid_ids 순 geometry dict 리스트)
+    """
+    path = get_grid_cells_path()
+    if is_artifact_fresh(path, GRID_COORDINATES_PATH):
+        with open(path, encoding='utf-8') as f:
+            geojson = json.load(f)
+    else:
+        geojson = write_grid_cells()
+
+    features = geojson['features']
+    return {
+        'grid_ids': pd.Index([feature['id'] for feature in features]),
+        'geometries': [feature['geometry'] for feature in features]
+    }
+
+
+def aggregate_grid_values(cells, df):
+    """
+    검색 결과 → 셀별 값 배열 (cells['grid_ids'] 순, 결과가 없는 셀은 count 0)
+
+    Returns:
+    --------
+    dict
+        count, vfm_mean, vfm_max, price_median
+    """
+    n_cells = len(cells['grid_ids'])
+    codes = cells['grid_ids'].get_indexer(df['grid_id'].astype(str))
+    valid = codes >= 0
+    codes = codes[valid]
+    vfm = df['custom_vfm'].values[valid]
+
+    count = np.bincount(codes, minlength=n_cells)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vfm_mean = np.bincount(codes, weights=vfm, minlength=n_cells) / count
+    vfm_max = np.full(n_cells, -np.inf)
+    np.maximum.at(vfm_max, codes, vfm)
+
+    price_median = np.full(n_cells, np.nan)
+    if len(codes):
+        price_median[np.unique(codes)] = pd.Series(
+            df['total_deposit_median'].values[valid]).groupby(codes).median().values
+
+    return {'count': count, 'vfm_mean': vfm_mean, 'vfm_max': vfm_max,
+            'price_median': price_median}
+
+
+def create_grid_choropleth_map(df, contract_type='monthly', vfm_grades=None, frontier_df=None):
+    """검색 결과를 격자 셀 단계구분도로 표시 (셀 색상 = 평균 VFM)"""
+    import folium
+    from branca.colormap import LinearColormap
+    from modules.map_builder import add_frontier_layer
+
+    m = folium.Map(location=[37.5665, 126.9780], zoom_start=11, tiles='CartoDB positron')
+    if df is None or len(df) == 0:
+        return m
+
+    # VFM 등급별 필터링 (마커 지도와 동일)
+    if vfm_grades and len(vfm_grades) < len(VFM_GRADE_CODES):
+        df = df[df['vfm_grade'].isin(get_visible_grade_codes(vfm_grades))]
+
+    cells = load_grid_cells()
+    values = aggregate_grid_values(cells, df)
+    colormap = LinearColormap(CHOROPLETH_COLORS, vmin=CHOROPLETH_VFM_RANGE[0],
+                              vmax=CHOROPLETH_VFM_RANGE[1])
+    colormap.caption = 'VFM 평균 (격자 셀)'
+    price_label = '전환보증금' if contract_type == 'monthly' else '전세'
+
+    # 캐시된 도형은 그대로 참조하고 셀별 속성만 새로 결합
+    features = [
+        {'type': 'Feature', 'id': cells['grid_ids'][i],
+         'geometry': cells['geometries'][i],
+         'properties': {
+             'grid_id': cells['grid_ids'][i],
+             'fill': colormap(float(np.clip(values['vfm_mean'][i], *CHOROPLETH_VFM_RANGE))),
+             'vfm': f"{values['vfm_mean'][i]:.3f} (최고 {values['vfm_max'][i]:.3f})",
+             'price': f"{values['price_median'][i]:,.0f}만",
+             'count': int(values['count'][i])
+         }}
+        for i in np.flatnonzero(values['count'])
+    ]
+
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        name='격자 VFM',
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['fill'],
+            'color': '#555555',
+            'weight': 0.3,
+            'fillOpacity': 0.65
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=['grid_id', 'vfm', 'price', 'count'],
+            aliases=['Grid ID', 'VFM 평균', f'{price_label} 중앙값', '건수'])
+    ).add_to(m)
+    colormap.add_to(m)
+
+    if frontier_df is not None and len(frontier_df) > 0:
+        add_frontier_layer(m, frontier_df, contract_type)
+
+    if len(df) > 0 and 'lat' in df.columns:
+        m.location = [df['lat'].mean(), df['lon'].mean()]
+    return m
+
+
+def get_district_boundaries_path():
+    """격자 셀 기반 구 경계 GeoJSON 경로"""
+    return get_precomputed_path('district_boundaries.geojson')
+
+
+def trace_lattice_rings(cells):
+    """
+    격자 인덱스 (행, 열) 셀 집합 → 외곽선 링 목록 (꼭짓점 인덱스, 반시계 = 외곽 / 시계 = 구멍)
+
+    셀마다 반시계 방향 변 4개를 만들고 인접 셀과 방향만 반대인 변(내부 경계)을 상쇄한 뒤
+    남은 변을 이어 링으로 구성, 방향이 그대로인 꼭짓점은 제거
+    """
+    rows, cols = cells[:, 0], cells[:, 1]
+    corners = [(rows, cols), (rows, cols + 1), (rows + 1, cols + 1), (rows + 1, cols)]
+    starts = np.concatenate([np.stack(corners[k], axis=1) for k in range(4)])
+    ends = np.concatenate([np.stack(corners[(k + 1) % 4], axis=1) for k in range(4)])
+
+    width = int(cols.max()) + 2
+    start_codes = starts[:, 0] * width + starts[:, 1]
+    end_codes = ends[:, 0] * width + ends[:, 1]
+    span = width * (int(rows.max()) + 2)
+    kept = ~np.isin(start_codes * span + end_codes, end_codes * span + start_codes)
+
+    outgoing = {}
+    for start, end in zip(start_codes[kept].tolist(), end_codes[kept].tolist()):
+        outgoing.setdefault(start, []).append(end)
+
+    rings = []
+    while outgoing:
+        first = next(iter(outgoing))
+        ring = [first]
+        vertex = first
+        while True:
+            ends_left = outgoing[vertex]
+            nxt = ends_left.pop()
+            if not ends_left:
+                del outgoing[vertex]
+            if nxt == first:
+                break
+            ring.append(nxt)
+            vertex = nxt
+
+        points = np.array([divmod(code, width) for code in ring])
+        prev_dir = points - np.roll(points, 1, axis=0)
+        next_dir = np.roll(points, -1, axis=0) - points
+        corner = (prev_dir != next_dir).any(axis=1)
+        rings.append(points[corner])
+    return rings
+
+
+def ring_area(ring):
+    """링 부호 면적 (열 = x, 행 = y, 반시계 양수)"""
+    x, y = ring[:, 1], ring[:, 0]
+    return (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+
+def ring_contains(ring, point):
+    """점이 링 내부인지 (짝홀 규칙)"""
+    x, y = ring[:, 1], ring[:, 0]
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    crosses = (y > point[0]) != (y2 > point[0])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_cross = x + (point[0] - y) * (x2 - x) / (y2 - y)
+    return bool(np.sum(crosses & (point[1] < x_cross)) % 2)
+
+
+def build_district_boundaries(grid_df):
+    """
+    그리드 중심 좌표 → 구별 격자 외곽선 FeatureCollection (MultiPolygon, properties.name)
+
+    중심 좌표를 500m 위경도 격자 인덱스로 맞춘 뒤 구별로 셀을 합침 (계단형 = 격자 해상도로 단순화)
+    """
+    lat = grid_df['center_lat'].to_numpy(dtype=np.float64)
+    lon = grid_df['center_lon'].to_numpy(dtype=np.float64)
+    step_lat = GRID_CELL_METERS / METERS_PER_DEGREE_LAT
+    step_lon = step_lat / np.cos(np.radians(lat.mean()))
+    lat0, lon0 = lat.min(), lon.min()
+    lattice = np.stack([np.rint((lat - lat0) / step_lat),
+                        np.rint((lon - lon0) / step_lon)], axis=1).astype(np.int64)
+
+    features = []
+    for district, positions in grid_df.groupby('sggnm', sort=True).indices.items():
+        rings = trace_lattice_rings(np.unique(lattice[positions], axis=0))
+        outers = [ring for ring in rings if ring_area(ring) > 0]
+        holes = [ring for ring in rings if ring_area(ring) < 0]
+
+        polygons = [[ring] for ring in outers]
+        for hole in holes:
+            probe = hole[0] + np.array([0.25, 0.25])
+            owner = next((polygon for polygon in polygons
+                          if ring_contains(polygon[0], probe)), None)
+            if owner is not None:
+                owner.append(hole)
+
+        # 꼭짓점 인덱스 → 셀 모서리 위경도 (닫힌 링)
+        coordinates = [
+            [np.round(np.stack([lon0 + (ring[:, 1] - 0.5) * step_lon,
+                                lat0 + (ring[:, 0] - 0.5) * step_lat], axis=1)[
+                np.r_[np.arange(len(ring)), 0]], GRID_CELL_PRECISION).tolist()
+             for ring in polygon]
+            for polygon in polygons
+        ]
+        features.append({
+            'type': 'Feature', 'id': district,
+            'properties': {'name': district},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates}
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def write_district_boundaries():
+    """격자 셀 기반 구 경계 GeoJSON 생성/저장"""
+    geojson = build_district_boundaries(
+        load_grid_coordinates().dropna(subset=['center_lat', 'center_lon', 'sggnm'])
+        .reset_index(drop=True))
+    path = get_district_boundaries_path()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(geojson, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"✅ 구 경계 GeoJSON 저장: {path} ({len(geojson['features'])}개 구)")
+    return geojson
+
+
+@st.cache_resource(show_spinner=False)
+def load_district_boundaries():
+    """
+    구 경계 로드 (세션 간 공유, 읽기 전용)
+    번들 경계 파일이 있으면 사용, 없으면 격자 셀 기반 외곽선 (그리드 좌표보다 최신이면 재사용)
+
+    Returns:
+    --------
+    dict
+        {구 이름: geometry dict}
+    """
+    path = DISTRICT_BOUNDARY_PATH
+    if not os.path.exists(path):
+        path = get_district_boundaries_path()
+        if not is_artifact_fresh(path, GRID_COORDINATES_PATH):
+            write_district_boundaries()
+
+    with open(path, encoding='utf-8') as f:
+        geojson = json.load(f)
+    return {feature['properties']['name']: feature['geometry']
+            for feature in geojson['features']}
+
+
+@st.cache_data(show_spinner=False)
+def get_district_summary(contract_type='monthly', month=None, sizes=None):
+    """
+    사전 계산 집계 → 구별 요약 (month 미지정 시 히스토리 최신 월)
+
+    건수·평균은 구×평형 집계를 건수 가중 합산, 중앙값은 분위수 스케치 병합으로 계산
+
+    Returns:
+    --------
+    tuple
+        (기준 월, DataFrame - index: 구, columns: count, vfm_mean, vfm_median,
+         price_mean, price_median)
+    """
+    stats = load_district_stats(contract_type)
+    months = stats.index.get_level_values('year_month')
+    if month is None or month not in set(months):
+        month = months.max()
+
+    monthly = stats.xs(month, level='year_month').reset_index()
+    if sizes is not None and not is_all_selected(sizes):
+        monthly = monthly[monthly['size_category'].isin(sizes)]
+
+    weighted = monthly[['custom_vfm_mean', 'total_deposit_median_mean']].mul(
+        monthly['count'], axis=0)
+    grouped = weighted.groupby(monthly['district']).sum()
+    counts = monthly.groupby('district')['count'].sum()
+
+    sketches = load_quantile_sketches(contract_type)
+    size_filter = None if sizes is None or is_all_selected(sizes) else list(sizes)
+    medians = {
+        column: sketch_quantiles_grouped(sketches, feature, [0.5], 'district',
+                                         sizes=size_filter, months=[month])[0.5]
+        for column, feature in [('vfm_median', 'custom_vfm'),
+                                ('price_median', 'total_deposit_median')]
+    }
+
+    summary = pd.DataFrame({
+        'count': counts,
+        'vfm_mean': grouped['custom_vfm_mean'] / counts,
+        'price_mean': grouped['total_deposit_median_mean'] / counts,
+    })
+    summary = summary.join(pd.DataFrame(medians))
+    return month, summary[summary['count'] > 0]
+
+
+def create_district_choropleth_map(contract_type='monthly', month=None, sizes=None,
+                                   districts=None, frontier_df=None):
+    """구 단위 단계구분도 (색상 = 평균 VFM, 선택 구는 굵은 테두리)"""
+    import folium
+    from branca.colormap import LinearColormap
+    from modules.map_builder import add_frontier_layer
+
+    m = folium.Map(location=[37.5665, 126.9780], zoom_start=11, tiles='CartoDB positron')
+    boundaries = load_district_boundaries()
+    month, summary = get_district_summary(contract_type, month, sizes)
+
+    colormap = LinearColormap(CHOROPLETH_COLORS, vmin=CHOROPLETH_VFM_RANGE[0],
+                              vmax=CHOROPLETH_VFM_RANGE[1])
+    colormap.caption = f'VFM 평균 (구, {month})'
+    price_label = '전환보증금' if contract_type == 'monthly' else '전세'
+    highlighted = set() if districts is None or is_all_selected(districts) else set(districts)
+
+    features = [
+        {'type': 'Feature', 'id': district,
+         'geometry': boundaries[district],
+         'properties': {
+             'name': district,
+             'fill': colormap(float(np.clip(row.vfm_mean, *CHOROPLETH_VFM_RANGE))),
+             'selected': district in highlighted,
+             'vfm': f"{row.vfm_mean:.3f} (중앙값 {row.vfm_median:.3f})",
+             'price': f"{row.price_median:,.0f}만 (평균 {row.price_mean:,.0f}만)",
+             'count': f"{int(row['count']):,}"
+         }}
+        for district, row in summary.iterrows() if district in boundaries
+    ]
+
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        name='구별 VFM',
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['fill'],
+            'color': '#764ba2' if feature['properties']['selected'] else '#555555',
+            'weight': 3 if feature['properties']['selected'] else 1,
+            'fillOpacity': 0.6
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=['name', 'vfm', 'price', 'count'],
+            aliases=['구', 'VFM 평균', f'{price_label} 중앙값', '건수'])
+    ).add_to(m)
+    colormap.add_to(m)
+
+    if frontier_df is not None and len(frontier_df) > 0:
+        add_frontier_layer(m, frontier_df, contract_type)
+    return m
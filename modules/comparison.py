@@ -0,0 +1,94 @@
+"""
+Comparison Module for Seoul Real Estate VFM Analysis
+그리드×평형 히스토리 인덱스 (상세 분석 페이지 단일 조회 / 최대 20개 비교)
+- (그리드, 평형, 날짜) 순으로 1회 정렬 → 그리드×평형별 연속 행 구간 [start, stop)
+- 여러 그리드 선택 시 인덱스 조회 1회 + 행 위치 take 1회로 히스토리 일괄 추출
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import load_vfm_data
+
+
+COMPARISON_MAX_GRIDS = 20
+
+
+def build_history_index(df):
+    """
+    VFM 데이터 → 그리드×평형 히스토리 인덱스
+
+    Returns:
+    --------
+    dict
+        frame (정렬된 데이터), keys (그리드, 평형 MultiIndex),
+        starts / stops (keys별 frame 행 구간), district (keys별 구)
+    """
+    frame = df.sort_values(['grid_id', 'size_category', 'datetime'],
+                           kind='stable').reset_index(drop=True)
+    grid_ids = frame['grid_id'].astype(str).values
+    sizes = frame['size_category'].astype(str).values
+
+    # 정렬되어 있으므로 키가 바뀌는 위치가 곧 그룹 경계
+    changed = (grid_ids[1:] != grid_ids[:-1]) | (sizes[1:] != sizes[:-1])
+    starts = np.flatnonzero(np.r_[len(frame) > 0, changed])
+    stops = np.append(starts[1:], len(frame))
+
+    return {
+        'frame': frame,
+        'keys': pd.MultiIndex.from_arrays([grid_ids[starts], sizes[starts]],
+                                          names=['grid_id', 'size_category']),
+        'starts': starts,
+        'stops': stops,
+        'district': frame['district'].values[starts]
+    }
+
+
+def get_grid_histories(index, pairs):
+    """
+    (그리드, 평형) 목록의 히스토리 일괄 조회
+
+    Parameters:
+    -----------
+    index : dict
+        build_history_index() 결과
+    pairs : list
+        [(grid_id, size_category), ...] (선택 순서 유지)
+
+    Returns:
+    --------
+    tuple
+        (히스토리 전체 - 선택 순서 × 날짜순, 그리드×평형별 최신 행)
+    """
+    frame = index['frame']
+    if not pairs:
+        return frame.iloc[:0], frame.iloc[:0]
+
+    query = pd.MultiIndex.from_tuples(
+        [(str(grid_id), size) for grid_id, size in pairs])
+    positions = index['keys'].get_indexer(query)
+    positions = positions[positions >= 0]
+
+    starts = index['starts'][positions]
+    lengths = index['stops'][positions] - starts
+
+    # 구간 [start, stop)들을 이어붙인 행 위치 → take 1회
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    rows = offsets + np.arange(lengths.sum())
+
+    return frame.iloc[rows], frame.iloc[starts + lengths - 1]
+
+
+def list_index_grids(index, district=None):
+    """인덱스의 (그리드, 평형) 목록 (district 지정 시 해당 구만)"""
+    keys = index['keys']
+    if district is not None:
+        keys = keys[index['district'] == district]
+    return list(keys)
+
+
+@st.cache_resource(show_spinner=False)
+def load_history_index(contract_type='monthly'):
+    """계약 유형별 그리드×평형 히스토리 인덱스 (세션 간 공유)"""
+    return build_history_index(load_vfm_data(contract_type))
@@ -4,19 +4,85 @@ Data Loader Module for Seoul Real Estate VFM Analysis
 Version 13.0.0 - 입지 지표 5개 + 총점 구조
 """
 
+import os
+import json
+import time
+import threading
 import pandas as pd
 import numpy as np
 import warnings
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow  # noqa: F401 - CSV 파싱 엔진 (GIL 해제, 멀티스레드)
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
 
 warnings.filterwarnings('ignore')
 
+# 사전 계산 산출물 저장 위치
+PRECOMPUTED_DIR = './results/precomputed'
+
+# 500m 그리드 중심 좌표 (grid_id, center_lat, center_lon, sggnm)
+GRID_COORDINATES_PATH = 'data/seoul_500m_grid_with_sggnm.csv'
+
+# 전처리 로직 버전 - 바뀌면 히스토리 파티션 저장소를 최신으로 보지 않음 (modules.ingest가 전체 재생성)
+PREPROCESS_VERSION = 2
+
+# 월세 → 전환보증금 기본 전환율 (%) - hybrid 원본에서 역산할 수 없을 때 사용
+# 전환보증금 = 보증금 + 월세 × 12 / (전환율 / 100)
+CONVERSION_RATE = 5.0
+
+# 좌표 컬럼 (히스토리 원본에는 center_lat / center_lat.1 ... 형태로 이미 포함됨)
+COORDINATE_COLUMN_PREFIXES = ('center_lat', 'center_lon')
+
+# VFM 등급 구간 (np.digitize 경계값)
+# 0: 미달(<0.5), 1: 보통(0.5~1.0), 2: 우수(1.0~2.0), 3: 최우수(2.0+)
+VFM_GRADE_BINS = np.array([0.5, 1.0, 2.0])
+
+# 입지 지표 5개 (치안 제외)
+LOCATION_INDEX_COLUMNS = [
+    'trans_index',
+    'conv_index',
+    'env_index',
+    'hospital_index',
+    'safety_score_scaled'
+]
+
+# 유사 그리드 검색 특성 (입지 지표 5개 + 가격 수준)
+SIMILARITY_FEATURES = LOCATION_INDEX_COLUMNS + ['total_deposit_median']
+
+VFM_GRADE_CODES = {
+    'normal': 1,
+    'good': 2,
+    'excellent': 3
+}
+
+
+def assign_vfm_grade(vfm_values):
+    """VFM 값 배열 → int8 등급 코드 배열 (np.digitize 1회)"""
+    vfm_values = np.asarray(vfm_values, dtype=np.float64)
+    return np.digitize(vfm_values, VFM_GRADE_BINS).astype(np.int8)
+
+
+def count_vfm_grades(grade_codes):
+    """등급 코드 배열 → 등급별 건수 배열 [미달, 보통, 우수, 최우수]"""
+    grade_codes = np.asarray(grade_codes, dtype=np.int64)
+    return np.bincount(grade_codes, minlength=len(VFM_GRADE_BINS) + 1)
+
+
+def read_csv_fast(file_path):
+    """CSV 로드 (pyarrow 설치 시 pyarrow 엔진 사용)"""
+    return pd.read_csv(file_path, engine=CSV_ENGINE)
+
 
 @st.cache_data(show_spinner=False)
 def load_grid_coordinates():
     """그리드 좌표 데이터 로드"""
     try:
-        grid_df = pd.read_csv('data/seoul_500m_grid_with_sggnm.csv')
+        grid_df = read_csv_fast(GRID_COORDINATES_PATH)
         grid_df['grid_id'] = grid_df['grid_id'].astype(str).str.strip()
         print(f"✅ 그리드 좌표 로드 완료: {len(grid_df):,}건")
         return grid_df[['grid_id', 'center_lat', 'center_lon', 'sggnm']]
@@ -25,6 +91,207 @@ def load_grid_coordinates():
         return pd.DataFrame()
 
 
+def get_data_path(contract_type='monthly', kind='hybrid'):
+    """계약 유형/데이터 종류별 결과 파일 경로 (kind: 'hybrid' 또는 'history')"""
+    prefix = 'monthly' if contract_type == 'monthly' else 'jeonse'
+    return f'./results/vfm_{prefix}_{kind}_full.csv'
+
+
+def get_precomputed_path(filename):
+    """사전 계산 산출물 경로 (results/precomputed/ 하위, 디렉터리 자동 생성)"""
+    os.makedirs(PRECOMPUTED_DIR, exist_ok=True)
+    return os.path.join(PRECOMPUTED_DIR, filename)
+
+
+def is_artifact_fresh(artifact_path, source_path):
+    """산출물이 존재하고 원본 파일보다 최신이면 True"""
+    if not os.path.exists(artifact_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(artifact_path) >= os.path.getmtime(source_path)
+
+
+def convert_deposit(original_deposit, monthly_rent, rate=CONVERSION_RATE):
+    """보증금 + 월세 → 전환보증금 (만원, rate: 전환율 %)"""
+    return original_deposit + monthly_rent * 1200 / rate
+
+
+def estimate_conversion_rate(original_deposit, monthly_rent, converted):
+    """원본 보증금/월세/전환보증금 → 적용된 전환율(%) 추정 (행별 역산값의 중앙값)"""
+    original_deposit = np.asarray(original_deposit, dtype=np.float64)
+    monthly_rent = np.asarray(monthly_rent, dtype=np.float64)
+    rent_part = np.asarray(converted, dtype=np.float64) - original_deposit
+    valid = (monthly_rent > 0) & (rent_part > 0)
+    if not valid.any():
+        return CONVERSION_RATE
+    return float(np.median(monthly_rent[valid] * 1200 / rent_part[valid]))
+
+
+@st.cache_data(show_spinner=False)
+def load_conversion_rate(contract_type='monthly'):
+    """hybrid 원본의 전환보증금/보증금/월세로 역산한 전환율 (역산 불가 시 CONVERSION_RATE)"""
+    try:
+        df = pd.read_csv(get_data_path(contract_type, 'hybrid'),
+                         usecols=['total_deposit_median', 'original_deposit', 'monthly_rent'])
+    except (FileNotFoundError, ValueError):
+        return CONVERSION_RATE
+    return estimate_conversion_rate(
+        df['original_deposit'].values, df['monthly_rent'].values, df['total_deposit_median'].values)
+
+
+def preprocess_vfm_frame(df, contract_type='monthly'):
+    """
+    원본 VFM CSV 프레임 전처리 (hybrid/history 공통)
+    좌표 병합, VFM 매핑/등급, 구/날짜/가격/입지 지표 정리
+    """
+    # 1. grid_id 문자열 변환
+    df['grid_id'] = df['grid_id'].astype(str).str.strip()
+
+    # 2. 그리드 좌표 데이터 로드 및 병합
+    grid_coords = load_grid_coordinates()
+    if not grid_coords.empty:
+        # 원본에 이미 있는 좌표 컬럼(center_lat, center_lat.1 ...)은 제거 후 좌표 파일 기준으로 병합
+        # (그대로 병합하면 center_lat_x / _y로 갈라져 아래 컬럼 참조가 실패)
+        df = df.drop(columns=[col for col in df.columns
+                              if col.startswith(COORDINATE_COLUMN_PREFIXES)])
+        df = df.merge(
+            grid_coords[['grid_id', 'center_lat', 'center_lon']],
+            on='grid_id',
+            how='left'
+        )
+        df['lat'] = pd.to_numeric(df['center_lat'], errors='coerce')
+        df['lon'] = pd.to_numeric(df['center_lon'], errors='coerce')
+        print(f"✅ 좌표 데이터 병합 완료")
+        print(f"   - 좌표 있는 데이터: {df['lat'].notna().sum():,}건")
+    elif {'center_lat', 'center_lon'} <= set(df.columns):
+        df['lat'] = pd.to_numeric(df['center_lat'], errors='coerce')
+        df['lon'] = pd.to_numeric(df['center_lon'], errors='coerce')
+        print("⚠️ 좌표 파일 없음 - 원본 좌표 컬럼 사용")
+    else:
+        df['lat'] = None
+        df['lon'] = None
+        print("⚠️ 좌표 데이터 없음")
+
+    # 3. VFM 지수 매핑 (vfm_12m → vfm_index)
+    if 'vfm_12m' in df.columns:
+        df['vfm_index'] = pd.to_numeric(
+            df['vfm_12m'], errors='coerce').fillna(1.0)
+        df['custom_vfm'] = df['vfm_index']
+        df['vfm_grade'] = assign_vfm_grade(df['custom_vfm'].values)
+        print(f"✅ VFM 지수 매핑: vfm_12m → vfm_index")
+    else:
+        st.error("❌ vfm_12m 컬럼이 CSV에 없습니다!")
+        return pd.DataFrame()
+
+    # 4. 구 정보 처리 (sggnm → district)
+    if 'sggnm' in df.columns:
+        df['district'] = df['sggnm'].astype(str)
+        df['district'] = df['district'].replace(
+            ['nan', 'NaN', 'None', ''], '정보없음')
+        df.loc[df['district'].isna(), 'district'] = '정보없음'
+        print(f"✅ 구 정보 매핑: sggnm → district")
+    else:
+        df['district'] = '정보없음'
+
+    # 5. 날짜 처리
+    if 'datetime' in df.columns:
+        df['datetime'] = pd.to_datetime(df['datetime'], errors='coerce')
+        df['year_month'] = df['datetime'].dt.strftime('%Y-%m')
+    elif 'ym' in df.columns:
+        df['datetime'] = pd.to_datetime(
+            df['ym'], format='%Y-%m', errors='coerce')
+        df['year_month'] = df['ym']
+
+    # 6. 가격 정보 처리 (월세/전세 동일하게 total_deposit_median 사용)
+    # 히스토리 원본처럼 컬럼이 없으면 hybrid와 같은 전환율로 보증금/월세에서 전환보증금 산출
+    # (월세가 없으면 보증금 = 전세가, 보증금이 없는 행은 NaN으로 남겨 가격 필터에서 제외)
+    if 'total_deposit_median' in df.columns:
+        df['total_deposit_median'] = pd.to_numeric(
+            df['total_deposit_median'], errors='coerce'
+        ).fillna(0)
+    elif 'original_deposit' in df.columns:
+        deposit = pd.to_numeric(df['original_deposit'], errors='coerce')
+        if 'monthly_rent' in df.columns:
+            rent = pd.to_numeric(df['monthly_rent'], errors='coerce').fillna(0)
+        else:
+            rent = 0
+        rate = load_conversion_rate(contract_type)
+        df['total_deposit_median'] = convert_deposit(deposit, rent, rate)
+        print(f"✅ 전환보증금 산출: original_deposit + monthly_rent (전환율 {rate:.2f}%)"
+              f" - 가격 없는 행 {int(deposit.isna().sum()):,}건")
+    else:
+        raise ValueError(
+            "가격 컬럼이 없습니다: total_deposit_median 또는 original_deposit(+monthly_rent) 필요")
+
+    # 7. 평균 보증금 (avg_deposit)
+    if 'avg_deposit' in df.columns:
+        df['avg_deposit'] = pd.to_numeric(
+            df['avg_deposit'], errors='coerce').fillna(0)
+
+    # 8. ㎡당 임대료
+    if 'rent_per_m2' in df.columns:
+        df['rent_per_m2'] = pd.to_numeric(
+            df['rent_per_m2'], errors='coerce').fillna(0)
+    else:
+        df['rent_per_m2'] = 0
+
+    # 9. 평균 면적
+    if 'avg_area' in df.columns:
+        df['avg_area'] = pd.to_numeric(
+            df['avg_area'], errors='coerce').fillna(0)
+    else:
+        df['avg_area'] = 0
+
+    # 10. 예측 가격 처리 (3m, 6m, 9m, 12m)
+    pred_cols = ['pred_3m', 'pred_6m', 'pred_9m', 'pred_12m']
+    for col in pred_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        else:
+            df[col] = 0
+
+    # future_price = pred_12m
+    df['future_price'] = df['pred_12m']
+
+    # 11. 가격 변화율 계산
+    df['price_change_pct'] = 0.0
+    mask = (df['total_deposit_median'] > 0) & (df['future_price'] > 0)
+    if mask.sum() > 0:
+        df.loc[mask, 'price_change_pct'] = (
+            (df.loc[mask, 'future_price'] - df.loc[mask, 'total_deposit_median']) /
+            df.loc[mask, 'total_deposit_median'] * 100
+        ).round(2)
+
+    # 12. 평형 정보 처리
+    if 'size_category' in df.columns:
+        df['size_category'] = df['size_category'].fillna('미분류')
+    else:
+        df['size_category'] = '미분류'
+
+    # 13. 입지 지표 처리 (5개 + 총점) - 치안(grid_crime_index) 제외
+    infra_cols = [
+        'trans_index',           # 교통
+        'conv_index',            # 편의
+        'env_index',             # 환경
+        'hospital_index',        # 의료
+        'safety_score_scaled',   # 안전
+        'total_infra_score',     # 총점
+        'infra_score'            # 총점 (대체)
+    ]
+
+    for col in infra_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        else:
+            df[col] = 0
+
+    # 14. 계약 유형 표시
+    df['contract_type'] = contract_type
+
+    return df
+
+
 @st.cache_data(show_spinner=False)
 def load_vfm_data(contract_type='monthly'):
     """
@@ -33,139 +300,18 @@ def load_vfm_data(contract_type='monthly'):
     """
     try:
         # 파일 경로 설정
-        if contract_type == 'monthly':
-            file_path = './results/vfm_monthly_hybrid_full.csv'
-        else:
-            file_path = './results/vfm_jeonse_hybrid_full.csv'
+        file_path = get_data_path(contract_type, 'hybrid')
 
         print(f"\n{'='*80}")
         print(f"📂 파일 로딩: {file_path}")
 
         # CSV 파일 로드
-        df = pd.read_csv(file_path)
+        df = read_csv_fast(file_path)
         print(f"✅ 원본 데이터 로드 완료: {len(df):,}건")
 
-        # 1. grid_id 문자열 변환
-        df['grid_id'] = df['grid_id'].astype(str).str.strip()
-
-        # 2. 그리드 좌표 데이터 로드 및 병합
-        grid_coords = load_grid_coordinates()
-        if not grid_coords.empty:
-            df = df.merge(
-                grid_coords[['grid_id', 'center_lat', 'center_lon']],
-                on='grid_id',
-                how='left'
-            )
-            df['lat'] = pd.to_numeric(df['center_lat'], errors='coerce')
-            df['lon'] = pd.to_numeric(df['center_lon'], errors='coerce')
-            print(f"✅ 좌표 데이터 병합 완료")
-            print(f"   - 좌표 있는 데이터: {df['lat'].notna().sum():,}건")
-        else:
-            df['lat'] = None
-            df['lon'] = None
-            print("⚠️ 좌표 데이터 없음")
-
-        # 3. VFM 지수 매핑 (vfm_12m → vfm_index)
-        if 'vfm_12m' in df.columns:
-            df['vfm_index'] = pd.to_numeric(
-                df['vfm_12m'], errors='coerce').fillna(1.0)
-            df['custom_vfm'] = df['vfm_index']
-            print(f"✅ VFM 지수 매핑: vfm_12m → vfm_index")
-        else:
-            st.error("❌ vfm_12m 컬럼이 CSV에 없습니다!")
-            return pd.DataFrame()
-
-        # 4. 구 정보 처리 (sggnm → district)
-        if 'sggnm' in df.columns:
-            df['district'] = df['sggnm'].astype(str)
-            df['district'] = df['district'].replace(
-                ['nan', 'NaN', 'None', ''], '정보없음')
-            df.loc[df['district'].isna(), 'district'] = '정보없음'
-            print(f"✅ 구 정보 매핑: sggnm → district")
-        else:
-            df['district'] = '정보없음'
-
-        # 5. 날짜 처리
-        if 'datetime' in df.columns:
-            df['datetime'] = pd.to_datetime(df['datetime'], errors='coerce')
-            df['year_month'] = df['datetime'].dt.strftime('%Y-%m')
-        elif 'ym' in df.columns:
-            df['datetime'] = pd.to_datetime(
-                df['ym'], format='%Y-%m', errors='coerce')
-            df['year_month'] = df['ym']
-
-        # 6. 가격 정보 처리 (월세/전세 동일하게 total_deposit_median 사용)
-        if 'total_deposit_median' in df.columns:
-            df['total_deposit_median'] = pd.to_numeric(
-                df['total_deposit_median'], errors='coerce'
-            ).fillna(0)
-        else:
-            df['total_deposit_median'] = 0
-
-        # 7. 평균 보증금 (avg_deposit)
-        if 'avg_deposit' in df.columns:
-            df['avg_deposit'] = pd.to_numeric(
-                df['avg_deposit'], errors='coerce').fillna(0)
-
-        # 8. ㎡당 임대료
-        if 'rent_per_m2' in df.columns:
-            df['rent_per_m2'] = pd.to_numeric(
-                df['rent_per_m2'], errors='coerce').fillna(0)
-        else:
-            df['rent_per_m2'] = 0
-
-        # 9. 평균 면적
-        if 'avg_area' in df.columns:
-            df['avg_area'] = pd.to_numeric(
-                df['avg_area'], errors='coerce').fillna(0)
-        else:
-            df['avg_area'] = 0
-
-        # 10. 예측 가격 처리 (3m, 6m, 9m, 12m)
-        pred_cols = ['pred_3m', 'pred_6m', 'pred_9m', 'pred_12m']
-        for col in pred_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            else:
-                df[col] = 0
-
-        # future_price = pred_12m
-        df['future_price'] = df['pred_12m']
-
-        # 11. 가격 변화율 계산
-        df['price_change_pct'] = 0.0
-        mask = (df['total_deposit_median'] > 0) & (df['future_price'] > 0)
-        if mask.sum() > 0:
-            df.loc[mask, 'price_change_pct'] = (
-                (df.loc[mask, 'future_price'] - df.loc[mask, 'total_deposit_median']) /
-                df.loc[mask, 'total_deposit_median'] * 100
-            ).round(2)
-
-        # 12. 평형 정보 처리
-        if 'size_category' in df.columns:
-            df['size_category'] = df['size_category'].fillna('미분류')
-        else:
-            df['size_category'] = '미분류'
-
-        # 13. 입지 지표 처리 (5개 + 총점) - 치안(grid_crime_index) 제외
-        infra_cols = [
-            'trans_index',           # 교통
-            'conv_index',            # 편의
-            'env_index',             # 환경
-            'hospital_index',        # 의료
-            'safety_score_scaled',   # 안전
-            'total_infra_score',     # 총점
-            'infra_score'            # 총점 (대체)
-        ]
-
-        for col in infra_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            else:
-                df[col] = 0
-
-        # 14. 계약 유형 표시
-        df['contract_type'] = contract_type
+        df = preprocess_vfm_frame(df, contract_type)
+        if df.empty:
+            return df
 
         print(f"✅ 데이터 전처리 완료")
         print(f"📊 최종 데이터: {len(df):,}건")
@@ -186,6 +332,247 @@ def load_vfm_data(contract_type='monthly'):
         return pd.DataFrame()
 
 
+def get_history_store_dir(contract_type='monthly'):
+    """월 단위 파티션 히스토리 저장소 디렉터리 (modules.ingest가 생성/갱신)"""
+    return get_precomputed_path(os.path.join('history', contract_type))
+
+
+def is_history_store_fresh(contract_type='monthly'):
+    """파티션 저장소가 원본보다 최신이고 현재 전처리 버전으로 만들어졌으면 True"""
+    manifest_path = os.path.join(get_history_store_dir(contract_type), 'manifest.json')
+    if not is_artifact_fresh(manifest_path, get_data_path(contract_type, 'history')):
+        return False
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f).get('preprocess_version') == PREPROCESS_VERSION
+
+
+def load_vfm_history(contract_type='monthly'):
+    """
+    VFM 히스토리 데이터 로드 및 전처리 (vfm_*_history_full.csv)
+    월별 파티션 저장소가 원본보다 최신이면 전처리 완료된 파티션을 읽음
+    대용량 파일이므로 캐시하지 않음 - 호출 측에서 파생 구조로 만들어 캐시
+    """
+    file_path = get_data_path(contract_type, 'history')
+
+    store_dir = get_history_store_dir(contract_type)
+    if is_history_store_fresh(contract_type):
+        df = pd.read_parquet(os.path.join(store_dir, 'partitions'))
+        print(f"✅ 히스토리 파티션 로드 완료: {len(df):,}건")
+        return df.drop(columns=['_row_hash'], errors='ignore')
+    print(f"📂 히스토리 파일 로딩: {file_path}")
+
+    df = read_csv_fast(file_path)
+    print(f"✅ 히스토리 원본 로드 완료: {len(df):,}건")
+
+    return preprocess_vfm_frame(df, contract_type)
+
+
+def iter_history_partitions(contract_type='monthly', columns=None):
+    """
+    히스토리를 월 파티션 단위로 순회 (전체를 한 번에 메모리에 올리지 않는 집계용)
+    파티션 저장소가 원본보다 오래되면 전처리된 전체 히스토리 1개를 반환
+    """
+    store_dir = get_history_store_dir(contract_type)
+    if not is_history_store_fresh(contract_type):
+        df = load_vfm_history(contract_type)
+        yield df if columns is None else df.reindex(columns=columns)
+        return
+
+    partition_dir = os.path.join(store_dir, 'partitions')
+    for name in sorted(os.listdir(partition_dir)):
+        if name.endswith('.parquet'):
+            yield pd.read_parquet(os.path.join(partition_dir, name), columns=columns)
+
+
+@st.cache_resource(show_spinner=False)
+def preload_all_data(contract_type='monthly'):
+    """
+    현재 계약 유형 hybrid 데이터와 그리드 좌표를 병렬 로딩 (계약 유형별 1회)
+    각 로더의 캐시를 채워 이후 검색 시 재파싱이 없도록 함
+    나머지 계약 유형은 prefetch_contract_type()으로 백그라운드 로딩
+
+    Returns:
+    --------
+    dict
+        {'elapsed': 소요 시간(초), 'rows': {데이터명: 건수}}
+    """
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            'grid': executor.submit(load_grid_coordinates),
+            contract_type: executor.submit(load_vfm_data, contract_type)
+        }
+        rows = {name: len(future.result())
+                for name, future in futures.items()}
+
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ 시작 데이터 병렬 로딩 완료: {elapsed:.2f}초 "
+          f"(엔진: {CSV_ENGINE}, {contract_type} {rows[contract_type]:,}건)")
+    return {'elapsed': elapsed, 'rows': rows}
+
+
+@st.cache_resource(show_spinner=False)
+def get_prefetch_state():
+    """
+    백그라운드 사전 로딩 상태 (프로세스 공유, 세션 간 1회만 실행)
+
+    Returns:
+    --------
+    dict
+        lock, executor (작업 스레드 1개), jobs {계약 유형: 작업 상태 dict}
+    """
+    return {
+        'lock': threading.Lock(),
+        'executor': ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch'),
+        'jobs': {}
+    }
+
+
+def prefetch_contract_type(contract_type, loaders):
+    """
+    계약 유형 1개의 로더들을 작업 스레드에서 순서대로 실행해 공유 캐시를 채움 (즉시 반환)
+    이미 요청된 계약 유형이면 기존 작업 상태를 그대로 반환 (실패한 작업은 버리고 다시 제출)
+
+    Parameters:
+    -----------
+    loaders : list
+        contract_type 하나를 인자로 받는 캐시 로더 (예: load_vfm_data)
+
+    Returns:
+    --------
+    dict
+        state ('loading' / 'ready' / 'failed'), elapsed (초), error
+    """
+    prefetch = get_prefetch_state()
+    with prefetch['lock']:
+        job = prefetch['jobs'].get(contract_type)
+        if job is not None and job['state'] != 'failed':
+            return job
+        job = {'state': 'loading', 'elapsed': None, 'error': None}
+        prefetch['jobs'][contract_type] = job
+
+    def run():
+        start = time.perf_counter()
+        try:
+            for loader in loaders:
+                loader(contract_type)
+            job['state'] = 'ready'
+        except Exception as e:
+            job['error'] = str(e)
+            job['state'] = 'failed'
+        job['elapsed'] = time.perf_counter() - start
+
+    prefetch['executor'].submit(run)
+    return job
+
+
+def build_similarity_index(df):
+    """
+    그리드×평형 최신 행 기준 유사도 검색 인덱스 구성
+
+    - 특성: 입지 지표 5개 + log 가격, 열별 표준화(z-score)
+    - float32 연속 행렬 + 행 제곱 노름을 미리 계산해
+      질의당 BLAS 행렬-벡터 곱 1회로 전체 거리 계산
+
+    Returns:
+    --------
+    dict
+        features, sq_norms, grid_codes, size_codes, positions,
+        grid_id, size_category, district, vfm, price
+    """
+    latest = df.sort_values('datetime').drop_duplicates(
+        ['grid_id', 'size_category'], keep='last').reset_index(drop=True)
+
+    values = latest[SIMILARITY_FEATURES].to_numpy(dtype=np.float64)
+    values[:, -1] = np.log1p(np.clip(values[:, -1], 0, None))
+    mean = values.mean(axis=0)
+    std = values.std(axis=0)
+    std[std == 0] = 1.0
+    features = np.ascontiguousarray((values - mean) / std, dtype=np.float32)
+
+    # 질의 시 문자열 비교를 피하도록 정수 코드 + (그리드, 평형) → 행 위치 사전
+    grid_codes, _ = pd.factorize(latest['grid_id'])
+    size_codes, _ = pd.factorize(latest['size_category'])
+    positions = {key: pos for pos, key in enumerate(
+        zip(latest['grid_id'], latest['size_category']))}
+
+    return {
+        'features': features,
+        'sq_norms': np.einsum('ij,ij->i', features, features),
+        'grid_codes': grid_codes,
+        'size_codes': size_codes,
+        'positions': positions,
+        'grid_id': latest['grid_id'].values,
+        'size_category': latest['size_category'].values,
+        'district': latest['district'].values,
+        'vfm': latest['custom_vfm'].values,
+        'price': latest['total_deposit_median'].values
+    }
+
+
+def find_similar_grids(index, grid_id, size_category, k=10, higher_vfm_only=True, same_size=True):
+    """
+    입지 프로필이 비슷한 그리드 k개 검색 (자기 자신 제외)
+
+    Parameters:
+    -----------
+    index : dict
+        build_similarity_index() 결과
+    grid_id, size_category : str
+        기준 그리드와 평형
+    k : int
+        반환 개수
+    higher_vfm_only : bool
+        기준보다 VFM이 높은 그리드만
+    same_size : bool
+        같은 평형만
+
+    Returns:
+    --------
+    pd.DataFrame
+        grid_id, district, size_category, custom_vfm, total_deposit_median, distance (가까운 순)
+    """
+    query_pos = index['positions'].get((str(grid_id), size_category))
+    if query_pos is None:
+        return pd.DataFrame()
+
+    query = index['features'][query_pos]
+
+    # ||x - q||² = ||x||² - 2 x·q + ||q||²
+    sq_dist = index['sq_norms'] - 2.0 * \
+        (index['features'] @ query) + index['sq_norms'][query_pos]
+
+    candidate = index['grid_codes'] != index['grid_codes'][query_pos]
+    if higher_vfm_only:
+        candidate &= index['vfm'] > index['vfm'][query_pos]
+    if same_size:
+        candidate &= index['size_codes'] == index['size_codes'][query_pos]
+
+    candidate_pos = np.flatnonzero(candidate)
+    if len(candidate_pos) == 0:
+        return pd.DataFrame()
+
+    k = min(k, len(candidate_pos))
+    top = np.argpartition(sq_dist[candidate_pos], k - 1)[:k]
+    top = candidate_pos[top[np.argsort(sq_dist[candidate_pos][top])]]
+
+    return pd.DataFrame({
+        'grid_id': index['grid_id'][top],
+        'district': index['district'][top],
+        'size_category': index['size_category'][top],
+        'custom_vfm': index['vfm'][top],
+        'total_deposit_median': index['price'][top],
+        'distance': np.sqrt(np.clip(sq_dist[top], 0, None))
+    })
+
+
+@st.cache_resource(show_spinner=False)
+def load_similarity_index(contract_type='monthly'):
+    """계약 유형별 유사 그리드 검색 인덱스 (세션 간 공유)"""
+    return build_similarity_index(load_vfm_data(contract_type))
+
+
 def load_grid_mapping():
     """그리드-구 매핑 데이터 로드 (하위 호환성)"""
     return load_grid_coordinates()
@@ -0,0 +1,116 @@
+"""
+Export Module for Seoul Real Estate VFM Analysis
+검색 결과 / 해당 그리드 히스토리를 청크 단위로 CSV·Parquet 직렬화
+- 원본 배열에서 행 인덱스 청크만 잘라 순차 기록 → 내보내기용 전체 복사본 데이터프레임을 만들지 않음
+- 히스토리는 디스크 원본이 아니라 메모리에 올라와 있는 스냅샷 저장소(세션 간 공유 캐시)에서 잘라냄
+  → 저장소 자체는 전체 히스토리를 메모리에 유지 (과거 시점 검색과 공용)
+- 일치하는 행이 없어도 컬럼만 있는 빈 파일(헤더/스키마)을 생성
+"""
+
+import io
+import numpy as np
+import pandas as pd
+
+from modules.snapshots import load_snapshot_store
+
+
+EXPORT_COLUMNS = [
+    'year_month', 'grid_id', 'district', 'size_category', 'lat', 'lon',
+    'total_deposit_median', 'vfm_index', 'custom_vfm', 'vfm_grade',
+    'future_price', 'price_change_pct',
+    'pred_3m', 'pred_6m', 'pred_9m', 'pred_12m',
+    'trans_index', 'conv_index', 'env_index', 'hospital_index',
+    'safety_score_scaled', 'total_infra_score',
+    'anomaly_score', 'is_anomaly',
+    'vfm_slope_12m', 'vfm_change_12m', 'vfm_volatility_12m'
+]
+EXPORT_CHUNK_ROWS = 50_000
+
+EXPORT_MIME_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+
+def iter_frame_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """데이터프레임을 행 위치 구간별 청크로 순회 (내보내기 컬럼만, 빈 결과면 빈 청크 1개)"""
+    columns = [col for col in EXPORT_COLUMNS if col in df.columns]
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows][columns]
+
+
+def iter_history_chunks(contract_type, grid_ids, size_categories):
+    """
+    스냅샷 저장소의 월별 배열 블록에서 (그리드, 평형) 쌍이 일치하는 행만 월 단위로 순회
+    저장소는 메모리에 올라온 전체 히스토리 (load_snapshot_store 캐시) - 디스크 원본을 읽지 않으며,
+    내보내기가 추가로 만드는 것은 월별 일치 행 청크뿐
+    일치하는 행이 없으면 컬럼 타입만 가진 빈 청크 1개
+    """
+    store = load_snapshot_store(contract_type)
+    pairs = pd.MultiIndex.from_arrays(
+        [np.asarray(grid_ids), np.asarray(size_categories)]).unique()
+
+    block, matched_any = {}, False
+    for month in store['months']:
+        block = store['blocks'][month]
+        matched = pd.MultiIndex.from_arrays(
+            [block['grid_id'], block['size_category']]).isin(pairs)
+        rows = np.flatnonzero(matched)
+        if len(rows) == 0:
+            continue
+        matched_any = True
+        yield pd.DataFrame({col: block[col][rows]
+                            for col in EXPORT_COLUMNS if col in block})
+
+    if not matched_any:
+        yield pd.DataFrame({col: block[col][:0] for col in EXPORT_COLUMNS if col in block})
+
+
+def write_csv(chunks):
+    """청크 → CSV 바이트 (헤더 1회, 엑셀 호환 UTF-8 BOM)"""
+    buffer = io.BytesIO()
+    buffer.write('\ufeff'.encode('utf-8'))
+    header = True
+    for chunk in chunks:
+        # 청크별로 바로 인코딩해 누적 → 문자열 버퍼 전체를 다시 복사하지 않음
+        buffer.write(chunk.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+    return buffer.getvalue()
+
+
+def write_parquet(chunks):
+    """청크 → Parquet 바이트 (청크마다 row group 1개)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, table.schema)
+        writer.write_table(table.cast(writer.schema))
+    if writer is None:
+        # 청크가 하나도 없으면 내보내기 컬럼만 있는 빈 테이블 (유효한 Parquet 파일)
+        pq.write_table(pa.table({col: pa.array([], pa.null()) for col in EXPORT_COLUMNS}), buffer)
+    else:
+        writer.close()
+    return buffer.getvalue()
+
+
+def export_bytes(chunks, file_format='csv'):
+    """청크 이터레이터 → 요청 포맷 바이트"""
+    if file_format == 'parquet':
+        return write_parquet(chunks)
+    return write_csv(chunks)
+
+
+def export_search_result(df, file_format='csv'):
+    """현재 검색 결과 내보내기"""
+    return export_bytes(iter_frame_chunks(df), file_format)
+
+
+def export_matching_history(contract_type, grid_ids, size_categories, file_format='csv'):
+    """검색 결과의 (그리드, 평형) 쌍에 해당하는 전체 히스토리 내보내기"""
+    return export_bytes(
+        iter_history_chunks(contract_type, grid_ids, size_categories), file_format)
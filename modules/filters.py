@@ -0,0 +1,82 @@
+"""
+Filter Module for Seoul Real Estate VFM Analysis
+검색 조건(구/평형/가격/이상치 제외/VFM 추세) 필터링 - 조건별 불리언 마스크를 합쳐 1회만 추출
+"""
+
+import numpy as np
+
+from modules.data_loader import VFM_GRADE_CODES, VFM_GRADE_BINS
+from modules.anomalies import load_anomaly_scores, attach_anomaly_columns
+from modules.trends import load_trend_metrics, attach_trend_columns
+
+
+# 가격 슬라이더 범위/간격 (만원)
+PRICE_SLIDER_RANGE = (0, 100000)
+PRICE_SLIDER_STEP = 1000
+
+
+def attach_precomputed_columns(df, contract_type='monthly'):
+    """
+    hybrid 프레임에 사전 계산 컬럼 부착 (이상치 점수/플래그, 추세 지표)
+    앱 검색과 기본 지도 사전 렌더링이 같은 프레임을 쓰도록 공용으로 사용
+    """
+    df = attach_anomaly_columns(df, load_anomaly_scores(contract_type))
+    return attach_trend_columns(df, load_trend_metrics(contract_type))
+
+
+def is_all_selected(selected):
+    """멀티셀렉트 선택값이 '전체'(또는 미선택)이면 True"""
+    return not selected or '전체' in selected
+
+
+def get_visible_grade_codes(vfm_grades):
+    """
+    선택 등급 → 검색 결과/지도에 표시되는 vfm_grade 코드
+    전체 선택(또는 미선택)이면 등급 필터를 걸지 않으므로 미달(0) 포함 전체 코드
+    """
+    if not vfm_grades or len(vfm_grades) >= len(VFM_GRADE_CODES):
+        return list(range(len(VFM_GRADE_BINS) + 1))
+    return [VFM_GRADE_CODES[g] for g in vfm_grades]
+
+
+def build_filter_mask(df, districts, sizes, price_range, exclude_anomalies=False, trend='all'):
+    """
+    검색 조건 → 행 단위 불리언 마스크
+    이상치 제외는 사전 계산된 is_anomaly 플래그, 추세(rising/falling)는 vfm_slope_12m 부호 사용
+    """
+    mask = np.ones(len(df), dtype=bool)
+
+    if not is_all_selected(districts):
+        mask &= df['district'].isin(districts).values
+
+    if not is_all_selected(sizes):
+        mask &= df['size_category'].isin(sizes).values
+
+    if 'total_deposit_median' in df.columns:
+        price = df['total_deposit_median'].values
+        mask &= (price >= price_range[0]) & (price <= price_range[1])
+
+    if exclude_anomalies and 'is_anomaly' in df.columns:
+        mask &= ~df['is_anomaly'].values
+
+    if trend != 'all' and 'vfm_slope_12m' in df.columns:
+        slope = df['vfm_slope_12m'].values
+        mask &= (slope > 0) if trend == 'rising' else (slope < 0)
+
+    return mask
+
+
+def apply_search_filters(df, districts, sizes, price_range, exclude_anomalies=False, trend='all'):
+    """검색 조건을 적용한 결과 데이터프레임"""
+    mask = build_filter_mask(df, districts, sizes, price_range, exclude_anomalies, trend)
+    return df[mask].reset_index(drop=True)
+
+
+def is_default_search(districts, sizes, price_range, vfm_grades):
+    """기본 검색 조건(전체 구/평형, 전체 가격, 전체 등급) 여부"""
+    return (
+        is_all_selected(districts) and
+        is_all_selected(sizes) and
+        tuple(price_range) == PRICE_SLIDER_RANGE and
+        len(vfm_grades) == len(VFM_GRADE_CODES)
+    )
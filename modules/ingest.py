@@ -0,0 +1,270 @@
+"""
+Incremental Ingest for Seoul Real Estate VFM Analysis
+재생성된 vfm_*_history_full.csv / vfm_*_hybrid_full.csv에서 변경된 월만 반영
+- 원본 파일 크기/수정 시각이 매니페스트와 같으면 읽지 않고 건너뜀
+- 월별 행 해시로 변경 월 탐지 → 해당 월 파티션만 전처리/교체 (갱신 단위는 월 -
+  파티션 파일과 의존 집계가 모두 월 단위라 그리드 단위 부분 교체는 하지 않음)
+- 의존 집계(타임랩스 프레임, 구별 집계, 모멘트 누적값, 분위수 스케치)도 변경 월만 갱신
+- hybrid 파일이 바뀐 경우에만 메타데이터/이상치 점수 재생성,
+  월 또는 hybrid가 바뀐 경우에만 추세 지표/기본 지도 재생성
+실행: python -m modules.ingest [monthly] [jeonse]
+"""
+
+import os
+import sys
+import shutil
+import json
+import time
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import (
+    read_csv_fast,
+    preprocess_vfm_frame,
+    get_data_path,
+    get_history_store_dir,
+    PREPROCESS_VERSION
+)
+from modules.aggregates import (
+    build_district_stats,
+    merge_district_stats,
+    get_district_stats_path
+)
+from modules.timelapse import (
+    build_timelapse_frames,
+    merge_timelapse_frames,
+    get_timelapse_path,
+    read_timelapse_frames,
+    save_timelapse_frames
+)
+from modules.map_builder import list_prerendered_map_paths
+from modules.metadata import write_metadata, get_metadata_path, get_count_cube_path
+from modules.moments import (
+    build_moments,
+    merge_moments,
+    read_moments,
+    save_moments,
+    write_moments,
+    get_moments_path
+)
+from modules.sketches import (
+    build_quantile_sketches,
+    merge_sketches,
+    read_sketches,
+    save_sketches,
+    get_sketch_path
+)
+from modules.anomalies import write_anomaly_scores, get_anomaly_path
+from modules.trends import write_trend_metrics, get_trend_path
+from modules.precompute import prerender_default_maps, CONTRACT_TYPES
+
+
+def raw_year_month(raw):
+    """원본(전처리 전) 프레임의 월 키 (datetime 또는 ym 컬럼)"""
+    if 'datetime' in raw.columns:
+        return pd.to_datetime(raw['datetime'], errors='coerce').dt.strftime('%Y-%m')
+    return raw['ym'].astype(str)
+
+
+def group_hash(keys, row_hashes):
+    """
+    키별 행 해시 합 (uint64 오버플로 허용, 행 순서 무관)
+
+    Returns:
+    --------
+    dict
+        {키: 16진수 해시 문자열}
+    """
+    if len(keys) == 0:
+        return {}
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    unique_keys, starts = np.unique(sorted_keys, return_index=True)
+    sums = np.add.reduceat(row_hashes[order], starts)
+    return {key: format(int(value), '016x') for key, value in zip(unique_keys, sums)}
+
+
+def load_manifest(store_dir):
+    """저장소 매니페스트 로드 (없으면 빈 매니페스트)"""
+    path = os.path.join(store_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {'months': {}, 'hybrid_hash': None}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(store_dir, manifest):
+    """저장소 매니페스트 저장 (마지막에 기록 - 저장소 최신 여부 판단 기준)"""
+    with open(os.path.join(store_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def file_signature(path):
+    """원본 파일 크기/수정 시각 (같으면 내용 비교 없이 변경 없음으로 판단)"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def ingest_history(contract_type, store_dir, manifest):
+    """
+    히스토리 변경 월 파티션 교체 + 의존 집계 갱신
+
+    Returns:
+    --------
+    tuple
+        (변경 월 리스트, 삭제 월 리스트)
+    """
+    history_path = get_data_path(contract_type, 'history')
+    signature = file_signature(history_path)
+    if manifest.get('history_signature') == signature:
+        print("📊 히스토리 원본 변경 없음 (크기/수정 시각 동일)")
+        return [], []
+
+    raw = read_csv_fast(history_path)
+    raw['_row_hash'] = pd.util.hash_pandas_object(raw, index=False).values
+    year_months = raw_year_month(raw).fillna('').values.astype(str)
+
+    month_hashes = group_hash(year_months, raw['_row_hash'].values)
+    month_hashes.pop('', None)
+
+    old_months = manifest['months']
+    changed = sorted(m for m, h in month_hashes.items()
+                     if old_months.get(m, {}).get('hash') != h)
+    removed = sorted(set(old_months) - set(month_hashes))
+
+    print(f"📊 히스토리 {len(raw):,}건, {len(month_hashes)}개월 "
+          f"→ 변경 {len(changed)}개월, 삭제 {len(removed)}개월")
+    manifest['history_signature'] = signature
+    if not changed and not removed:
+        return changed, removed
+
+    partition_dir = os.path.join(store_dir, 'partitions')
+    os.makedirs(partition_dir, exist_ok=True)
+
+    # 변경 월만 전처리 후 파티션 교체 (행 해시는 월 비교에만 쓰므로 저장하지 않음)
+    changed_rows = raw[np.isin(year_months, changed)].drop(columns=['_row_hash'])
+    processed = preprocess_vfm_frame(changed_rows.reset_index(drop=True), contract_type)
+
+    for month in changed:
+        path = os.path.join(partition_dir, f'{month}.parquet')
+        part = processed[processed['year_month'] == month]
+        part.to_parquet(path, index=False)
+        old_months[month] = {'hash': month_hashes[month], 'rows': len(part)}
+        print(f"   - {month}: {len(part):,}건")
+
+    for month in removed:
+        path = os.path.join(partition_dir, f'{month}.parquet')
+        if os.path.exists(path):
+            os.remove(path)
+        old_months.pop(month, None)
+
+    update_dependent_aggregates(contract_type, processed, changed + removed)
+    return changed, removed
+
+
+def update_dependent_aggregates(contract_type, processed, replaced_months):
+    """변경 월 데이터로 타임랩스 프레임/구별 집계/모멘트 누적값/분위수 스케치 부분 갱신"""
+    timelapse_path = get_timelapse_path(contract_type)
+    existing = read_timelapse_frames(timelapse_path) if os.path.exists(timelapse_path) else None
+    frames = merge_timelapse_frames(
+        existing, build_timelapse_frames(processed), set(replaced_months))
+    save_timelapse_frames(timelapse_path, frames)
+
+    stats_path = get_district_stats_path(contract_type)
+    existing = pd.read_parquet(stats_path) if os.path.exists(stats_path) else None
+    stats = merge_district_stats(
+        existing, build_district_stats(processed), replaced_months)
+    stats.to_parquet(stats_path, index=False)
+    print(f"✅ 구별 집계 갱신: {stats_path} ({len(stats):,}행)")
+
+    moments_path = get_moments_path(contract_type, 'history')
+    existing = read_moments(moments_path) if os.path.exists(moments_path) else None
+    moments = merge_moments(existing, build_moments(processed), replaced_months)
+    save_moments(moments_path, moments)
+    print(f"✅ 모멘트 누적값 갱신: {moments_path} ({len(moments['count']):,}개 그룹)")
+
+    sketch_path = get_sketch_path(contract_type)
+    existing = read_sketches(sketch_path) if os.path.exists(sketch_path) else None
+    sketches = merge_sketches(existing, build_quantile_sketches(processed), replaced_months)
+    save_sketches(sketch_path, sketches)
+    print(f"✅ 분위수 스케치 갱신: {sketch_path} ({len(sketches['keys']):,}개 그룹)")
+
+
+def touch_artifacts(paths):
+    """존재하는 산출물의 수정 시각을 현재로 갱신"""
+    for path in paths:
+        if os.path.exists(path):
+            os.utime(path)
+
+
+def ingest_contract_type(contract_type):
+    """계약 유형 1개 증분 반영"""
+    start = time.perf_counter()
+    print(f"\n{'='*80}")
+    print(f"📥 증분 반영 시작: {contract_type}")
+
+    store_dir = get_history_store_dir(contract_type)
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = load_manifest(store_dir)
+
+    # 전처리 로직이 바뀌었으면 파티션과 히스토리 기반 집계를 모두 버리고 전체 월을 다시 반영
+    if manifest.get('preprocess_version') != PREPROCESS_VERSION:
+        print(f"♻️ 전처리 버전 변경 ({manifest.get('preprocess_version')} → {PREPROCESS_VERSION})"
+              " → 히스토리 저장소 전체 재생성")
+        shutil.rmtree(os.path.join(store_dir, 'partitions'), ignore_errors=True)
+        for path in [get_timelapse_path(contract_type),
+                     get_district_stats_path(contract_type),
+                     get_moments_path(contract_type, 'history'),
+                     get_sketch_path(contract_type)]:
+            if os.path.exists(path):
+                os.remove(path)
+        manifest = {'months': {}, 'hybrid_hash': None,
+                    'preprocess_version': PREPROCESS_VERSION}
+
+    changed, removed = ingest_history(contract_type, store_dir, manifest)
+
+    # hybrid 파일은 작으므로 전체 해시로 비교 (크기/수정 시각이 같으면 읽지 않음)
+    hybrid_path = get_data_path(contract_type, 'hybrid')
+    hybrid_signature = file_signature(hybrid_path)
+    hybrid_changed = False
+    if manifest.get('hybrid_signature') != hybrid_signature:
+        hybrid = read_csv_fast(hybrid_path)
+        hybrid_hash = format(
+            int(pd.util.hash_pandas_object(hybrid, index=False).values.sum()), '016x')
+        hybrid_changed = manifest.get('hybrid_hash') != hybrid_hash
+        manifest['hybrid_hash'] = hybrid_hash
+        manifest['hybrid_signature'] = hybrid_signature
+    if hybrid_changed:
+        print("📊 hybrid 데이터 변경 → 메타데이터/이상치 점수 재생성")
+        write_metadata(contract_type)
+        write_anomaly_scores(contract_type)
+        write_moments(contract_type, 'hybrid')
+    else:
+        print("📊 hybrid 데이터 변경 없음")
+
+    # 추세 지표는 최근 12개월 윈도라 과거 월 갱신도 반영 → 월 또는 hybrid가 바뀐 경우만 재계산
+    # 기본 지도 팝업에 추세가 표시되므로 추세 지표 다음에 재렌더링
+    if hybrid_changed or changed or removed:
+        write_trend_metrics(contract_type)
+        prerender_default_maps(contract_type)
+
+    # 내용이 확인된 산출물은 원본보다 최신으로 표시 (앱의 재빌드 방지)
+    touch_artifacts([get_timelapse_path(contract_type),
+                     get_district_stats_path(contract_type),
+                     get_metadata_path(contract_type),
+                     get_count_cube_path(contract_type),
+                     get_anomaly_path(contract_type),
+                     get_moments_path(contract_type, 'hybrid'),
+                     get_moments_path(contract_type, 'history'),
+                     get_sketch_path(contract_type),
+                     get_trend_path(contract_type)] +
+                    list_prerendered_map_paths(contract_type))
+
+    save_manifest(store_dir, manifest)
+    print(f"⏱️ 증분 반영 완료: {contract_type} ({time.perf_counter() - start:.1f}초)")
+    print(f"{'='*80}\n")
+
+
+if __name__ == '__main__':
+    for contract_type in sys.argv[1:] or CONTRACT_TYPES:
+        ingest_contract_type(contract_type)
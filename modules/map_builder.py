@@ -0,0 +1,381 @@
+"""
+Map Builder Module for Seoul Real Estate VFM Analysis
+검색 결과 folium 지도 생성 (마커/히트맵) 및 기본 지도 사전 렌더링 HTML 조회
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    VFM_GRADE_CODES,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh
+)
+from modules.filters import get_visible_grade_codes
+from modules.scoring import top_k_positions
+
+
+# 사전 렌더링 대상 (기본 검색 조건 + 마커 개수 / 히트맵)
+PRERENDER_MARKER_LIMITS = [100, 500, 1000]
+
+
+def get_prerendered_map_path(contract_type, map_type, marker_limit=100):
+    """기본 지도 사전 렌더링 HTML 경로"""
+    if map_type == 'heatmap':
+        return get_precomputed_path(f'map_{contract_type}_heatmap.html')
+    return get_precomputed_path(f'map_{contract_type}_marker_{marker_limit}.html')
+
+
+def list_prerendered_map_paths(contract_type):
+    """계약 유형별 사전 렌더링 지도 전체 경로"""
+    paths = [get_prerendered_map_path(contract_type, 'marker', limit)
+             for limit in PRERENDER_MARKER_LIMITS]
+    return paths + [get_prerendered_map_path(contract_type, 'heatmap')]
+
+
+@st.cache_data(show_spinner=False)
+def _read_prerendered_html(path, mtime):
+    """사전 렌더링 HTML 읽기 (파일 수정 시각별 캐시)"""
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def load_prerendered_map_html(contract_type, map_type, marker_limit=100, sort_order='desc'):
+    """
+    기본 검색 조건의 사전 렌더링 지도 HTML 반환
+    대상이 아니거나 산출물이 없거나 원본보다 오래되면 None (→ create_map 사용)
+    """
+    if map_type == 'marker' and (sort_order != 'desc' or marker_limit not in PRERENDER_MARKER_LIMITS):
+        return None
+    if map_type not in ('marker', 'heatmap'):
+        return None
+
+    path = get_prerendered_map_path(contract_type, map_type, marker_limit)
+    if not is_artifact_fresh(path, get_data_path(contract_type, 'hybrid')):
+        return None
+    return _read_prerendered_html(path, os.path.getmtime(path))
+
+
+# 등급 코드별 마커 스타일 (색상, 아이콘, 등급 라벨) - 미달(0)은 보통과 동일하게 표시
+MARKER_STYLE_BY_GRADE = {
+    0: ('orange', 'home', '보통 (0.5~1.0)'),
+    1: ('orange', 'home', '보통 (0.5~1.0)'),
+    2: ('blue', 'home', '우수 (1.0~2.0)'),
+    3: ('green', 'star', '최우수 (2.0+)')
+}
+
+
+def add_frontier_layer(m, frontier_df, contract_type="monthly"):
+    """파레토 최적(스카이라인) 매물을 별도 레이어로 추가"""
+    import folium
+    price_label = '전환보증금' if contract_type == 'monthly' else '전세'
+    layer = folium.FeatureGroup(
+        name=f'🏆 파레토 최적 ({len(frontier_df):,}건)', show=True)
+
+    for row in frontier_df.itertuples(index=False):
+        tooltip_text = (
+            f"🏆 VFM: {row.custom_vfm:.3f} | {row.size_category} | "
+            f"{price_label}: {row.total_deposit_median:,.0f}만 | "
+            f"입지 총점: {row.total_infra_score:.3f}"
+        )
+        folium.CircleMarker(
+            location=[row.lat, row.lon],
+            radius=9,
+            color='#764ba2',
+            weight=3,
+            fill=True,
+            fill_color='#667eea',
+            fill_opacity=0.6,
+            tooltip=tooltip_text
+        ).add_to(layer)
+
+    layer.add_to(m)
+    folium.LayerControl(collapsed=False).add_to(m)
+
+
+def create_map(df, map_type="marker", contract_type="monthly", marker_limit=100, sort_order="desc", vfm_grades=None,
+               frontier_df=None, sort_column='custom_vfm'):
+    """지도 생성 - 입지 지표 5개 (frontier_df: 파레토 최적 레이어, sort_column: 마커 정렬 기준 컬럼)"""
+    # folium은 지도를 처음 그릴 때 로드 (앱 시작 시 import 비용 제외)
+    import folium
+    from folium.plugins import HeatMap
+
+
+    m = folium.Map(
+        location=[37.5665, 126.9780],
+        zoom_start=11,
+        tiles='CartoDB positron'
+    )
+
+    if df is None or len(df) == 0:
+        folium.Marker(
+            [37.5665, 126.9780],
+            popup="검색 결과가 없습니다",
+            icon=folium.Icon(color='red', icon='info-sign')
+        ).add_to(m)
+        return m
+
+    df_valid = df.dropna(subset=['lat', 'lon']).copy()
+    df_valid = df_valid.reset_index(drop=True)
+
+    if len(df_valid) == 0:
+        return m
+
+    # VFM 등급별 필터링 (사전 계산된 vfm_grade 컬럼 사용)
+    if vfm_grades and len(vfm_grades) < len(VFM_GRADE_CODES):
+        df_valid = df_valid[df_valid['vfm_grade'].isin(get_visible_grade_codes(vfm_grades))]
+        df_valid = df_valid.reset_index(drop=True)
+
+    data_count = len(df_valid)
+    display_count = min(
+        marker_limit, data_count) if map_type == "marker" else data_count
+
+    # 계약 타입 라벨
+    contract_label = '월세 (전환보증금)' if contract_type == 'monthly' else '전세'
+
+    # 범례 HTML
+    legend_html = f"""
+    <div style="position: fixed; top: 10px; left: 50px; width: 280px; background-color: white; 
+                border: 2px solid #667eea; border-radius: 10px; padding: 12px; font-size: 13px;
+                box-shadow: 0 4px 6px rgba(0,0,0,0.1); z-index: 9999;">
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;
+                    padding: 8px; margin: -12px -12px 10px -12px; border-radius: 8px 8px 0 0;
+                    font-weight: 600; text-align: center; font-size: 14px;">
+            📊 VFM 지수 범례 ({contract_label})
+        </div>
+        <div style="margin-bottom: 6px;">
+            <span style="color: green; font-size: 16px;">●</span>
+            <strong style="color: green; margin-left: 5px; font-size: 12px;">2.0 이상</strong>
+            <span style="font-size: 10px; color: #666; margin-left: 5px;">최우수</span>
+        </div>
+        <div style="margin-bottom: 6px;">
+            <span style="color: blue; font-size: 16px;">●</span>
+            <strong style="color: blue; margin-left: 5px; font-size: 12px;">1.0 ~ 2.0</strong>
+            <span style="font-size: 10px; color: #666; margin-left: 5px;">우수</span>
+        </div>
+        <div style="margin-bottom: 6px;">
+            <span style="color: orange; font-size: 16px;">●</span>
+            <strong style="color: orange; margin-left: 5px; font-size: 12px;">0.5 ~ 1.0</strong>
+            <span style="font-size: 10px; color: #666; margin-left: 5px;">보통</span>
+        </div>
+        <div style="margin-top: 8px; padding-top: 8px; border-top: 1px solid #e9ecef; font-size: 11px; color: #495057;">
+            <strong>📍 전체:</strong> {data_count:,}건<br>
+            <strong>🗺️ 표시:</strong> {display_count:,}건
+        </div>
+    </div>
+    """
+
+    m.get_root().html.add_child(folium.Element(legend_html))
+
+    # 히트맵
+    if map_type == "heatmap":
+        heat_data = []
+        for idx, row in df_valid.iterrows():
+            vfm = row.get('custom_vfm', 1.0)
+            normalized = min(vfm / 3.0, 1.0)
+            heat_data.append([row['lat'], row['lon'], float(normalized)])
+
+        if heat_data:
+            HeatMap(
+                heat_data,
+                min_opacity=0.3,
+                max_opacity=0.8,
+                radius=15,
+                blur=20,
+                gradient={0.0: 'red', 0.3: 'orange',
+                          0.5: 'yellow', 0.7: 'lime', 1.0: 'green'}
+            ).add_to(m)
+
+    # 마커
+    else:
+        total_count = len(df_valid)
+        if sort_column not in df_valid.columns:
+            sort_column = 'custom_vfm'
+
+        if total_count <= marker_limit:
+            if sort_order == "desc":
+                df_display = df_valid.sort_values(
+                    sort_column, ascending=False).copy()
+            else:
+                df_display = df_valid.sort_values(
+                    sort_column, ascending=True).copy()
+            df_display = df_display.reset_index(drop=True)
+        else:
+            # 상위 K개만 선택 (argpartition → K개 정렬, 전체 정렬 없음)
+            positions = top_k_positions(
+                df_valid[sort_column].values, marker_limit, sort_order == "desc")
+            df_display = df_valid.iloc[positions].reset_index(drop=True)
+
+        # 등급 코드별 마커 리스트 (낮은 등급부터 추가해 높은 등급이 위에 표시)
+        grade_markers = {code: [] for code in MARKER_STYLE_BY_GRADE}
+
+        for idx, row in df_display.iterrows():
+            vfm = float(row.get('custom_vfm', 1.0))
+            grade_code = int(row.get('vfm_grade', 0))
+            color, icon, grade = MARKER_STYLE_BY_GRADE[grade_code]
+            marker_list = grade_markers[grade_code]
+
+            size_cat = row.get('size_category', '미분류')
+
+            # 가격 정보
+            current_price = row.get('total_deposit_median', 0)
+            future_price = row.get('future_price', 0)
+            price_change_pct = row.get('price_change_pct', 0)
+
+            # NameError 해결을 위해 price_label을 여기서 정의합니다.
+            if contract_type == 'monthly':
+                price_label = '전환보증금'
+                price_note = '<div style="font-size: 0.6rem; color: #888; margin-top: 2px;">※ 월세를 보증금으로 전환한 금액</div>'
+            else:
+                price_label = '전세가'
+                price_note = ''
+
+            price_html = f"""
+                <div style='margin-bottom: 8px;'>
+                    <div style='font-size: 0.75rem; color: #666; margin-bottom: 4px; font-weight: 600;'>
+                        💵 {contract_label} 정보
+                    </div>
+                    <div style='background: #e8f5e9; padding: 8px; border-radius: 4px;'>
+                        <div style='font-size: 0.7rem; color: #388e3c;'>💰 현재 {price_label}</div>
+                        <div style='font-size: 1.1rem; font-weight: 700; color: #1b5e20;'>{current_price:,.0f}만원</div>
+                        {price_note}
+                    </div>
+                    
+                </div>
+            """
+
+            # 예측 정보 HTML
+            if future_price > 0:
+                if price_change_pct > 0:
+                    trend_color = '#d32f2f'
+                    trend_icon = '📈'
+                    trend_text = '상승'
+                elif price_change_pct < 0:
+                    trend_color = '#1976d2'
+                    trend_icon = '📉'
+                    trend_text = '하락'
+                else:
+                    trend_color = '#757575'
+                    trend_icon = '➡️'
+                    trend_text = '보합'
+
+                price_diff = abs(future_price - current_price)
+
+                prediction_html = f"""
+                    <div style='background: #f5f5f5; padding: 8px; border-radius: 4px; margin-bottom: 8px; 
+                                border-left: 3px solid {trend_color};'>
+                        <div style='font-size: 0.7rem; color: #666; margin-bottom: 3px;'>
+                            {trend_icon} <strong>12개월 후 AI 예측</strong>
+                        </div>
+                        <div style='display: flex; justify-content: space-between; align-items: center;'>
+                            <div>
+                                <div style='font-size: 0.8rem; color: {trend_color}; font-weight: 600;'>
+                                    {future_price:,.0f}만원
+                                </div>
+                            </div>
+                            <div style='background: {trend_color}; color: white; 
+                                        padding: 2px 6px; border-radius: 3px; font-size: 0.7rem; font-weight: 600;'>
+                                {price_change_pct:+.1f}%
+                            </div>
+                        </div>
+                        <div style='font-size: 0.65rem; color: #999; margin-top: 2px;'>
+                            예상 {trend_text}: {price_diff:,.0f}만원
+                        </div>
+                    </div>
+                """
+            else:
+                prediction_html = ""
+
+            # VFM 추세 (최근 12개월, 히스토리 기반 사전 계산)
+            vfm_slope = row.get('vfm_slope_12m', np.nan)
+            if pd.notna(vfm_slope):
+                vfm_change = row.get('vfm_change_12m', np.nan)
+                change_text = f" · 12개월 {vfm_change:+.1f}%" if pd.notna(vfm_change) else ""
+                trend_html = f"""
+                        <div style='font-size: 0.65rem; color: #495057; margin-top: 4px;'>
+                            {'📈' if vfm_slope > 0 else '📉'} 추세 {vfm_slope:+.3f}/월{change_text}
+                        </div>"""
+            else:
+                trend_html = ""
+
+            # ✅ 입지 지표 5개
+            trans_val = row.get('trans_index', 0)
+            conv_val = row.get('conv_index', 0)
+            env_val = row.get('env_index', 0)
+            hospital_val = row.get('hospital_index', 0)
+            safety_val = row.get('safety_score_scaled', 0)
+
+            popup_html = f"""
+            <div style='width: 300px; font-family: "Segoe UI", Arial, sans-serif; position: relative;'>
+                <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                            color: white; padding: 12px; border-radius: 8px 8px 0 0; 
+                            margin: -10px -10px 8px -10px; position: relative;'>
+                    <h4 style='margin: 0; font-size: 0.95rem; font-weight: 600; padding-right: 20px;'>
+                        📍 {row.get('district', '알 수 없음')} | 📏 {size_cat}
+                    </h4>
+                    <p style='margin: 3px 0 0 0; font-size: 0.7rem; opacity: 0.9;'>
+                        Grid ID: {row.get('grid_id', 'N/A')}
+                    </p>
+                </div>
+                <div style='padding: 8px;'>
+                    <div style='background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); 
+                                padding: 10px; border-radius: 6px; margin-bottom: 8px; text-align: center;
+                                border: 2px solid {color};'>
+                        <div style='font-size: 0.75rem; color: #6c757d; margin-bottom: 2px;'>VFM 지수</div>
+                        <div style='font-size: 1.6rem; font-weight: 700; color: {color};'>{vfm:.3f}</div>
+                        <div style='font-size: 0.65rem; color: #999; margin-top: 2px;'>{grade}</div>{trend_html}
+                    </div>
+                    {price_html}
+                    {prediction_html}
+                    <div style='font-size: 0.7rem; color: #495057; padding-top: 6px; border-top: 1px solid #e9ecef;'>
+                        <div style='font-size: 0.75rem; color: #666; margin-bottom: 4px; font-weight: 600;'>📊 입지 지표</div>
+                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
+                            <span>🚇 교통</span><strong style='color: #667eea;'>{trans_val:.4f}</strong>
+                        </div>
+                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
+                            <span>🏪 편의</span><strong style='color: #667eea;'>{conv_val:.4f}</strong>
+                        </div>
+                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
+                            <span>🌳 환경</span><strong style='color: #667eea;'>{env_val:.4f}</strong>
+                        </div>
+                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
+                            <span>🏥 의료</span><strong style='color: #667eea;'>{hospital_val:.4f}</strong>
+                        </div>
+                        <div style='display: flex; justify-content: space-between; padding: 2px 0;'>
+                            <span>🛡️ 안전</span><strong style='color: #667eea;'>{safety_val:.4f}</strong>
+                        </div>
+                       
+                    </div>
+                </div>
+            </div>
+            """
+
+            # 툴팁
+            if contract_type == 'monthly':
+                tooltip_text = f"VFM: {vfm:.3f} | {size_cat} | 전환보증금: {current_price:,.0f}만"
+            else:
+                tooltip_text = f"VFM: {vfm:.3f} | {size_cat} | 전세: {current_price:,.0f}만"
+
+            marker = folium.Marker(
+                location=[row['lat'], row['lon']],
+                popup=folium.Popup(popup_html, max_width=320),
+                icon=folium.Icon(color=color, icon=icon, prefix='fa'),
+                tooltip=tooltip_text
+            )
+            marker_list.append(marker)
+
+        for grade_code in sorted(grade_markers):
+            for marker in grade_markers[grade_code]:
+                marker.add_to(m)
+
+    if frontier_df is not None and len(frontier_df) > 0:
+        add_frontier_layer(m, frontier_df, contract_type)
+
+    if len(df_valid) > 0:
+        m.location = [df_valid['lat'].mean(), df_valid['lon'].mean()]
+        m.zoom_start = 12
+
+    return m
@@ -0,0 +1,179 @@
+"""
+Metadata Module for Seoul Real Estate VFM Analysis
+필터 위젯용 메타데이터 사이드카 (구 목록, 평형, 가격 범위/히스토그램, 구×평형 건수)
+- 사전 계산 시 JSON으로 저장 → 왼쪽 패널은 전체 데이터 로딩 없이 렌더링
+- 건수 큐브: 구×평형×등급×가격 경계 누적 건수 (npz) → 필터 변경 시 검색 없이 결과 건수 미리보기
+"""
+
+import json
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_data,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh,
+    VFM_GRADE_BINS
+)
+from modules.filters import is_all_selected, PRICE_SLIDER_RANGE, PRICE_SLIDER_STEP
+from modules.scenarios import build_conversion_inputs
+
+
+SIZE_ORDER = ['초소형', '소형', '중형', '대형']
+
+
+def get_metadata_path(contract_type='monthly'):
+    """메타데이터 사이드카 경로"""
+    return get_precomputed_path(f'metadata_{contract_type}.json')
+
+
+def get_count_cube_path(contract_type='monthly'):
+    """건수 큐브 경로"""
+    return get_precomputed_path(f'count_cube_{contract_type}.npz')
+
+
+def get_price_edges():
+    """가격 슬라이더 눈금 (히스토그램 구간 / 건수 큐브 경계 공용)"""
+    return np.arange(PRICE_SLIDER_RANGE[0],
+                     PRICE_SLIDER_RANGE[1] + PRICE_SLIDER_STEP, PRICE_SLIDER_STEP)
+
+
+def build_metadata(df):
+    """
+    전처리된 hybrid 프레임 → 필터 위젯용 메타데이터
+
+    Returns:
+    --------
+    dict
+        districts, size_categories, row_count, price_min, price_max,
+        price_histogram {'edges', 'counts', 'overflow'}, counts {구: {평형: 건수}},
+        conversion_rate (월세 전환율 %, 보증금·월세 컬럼이 없으면 None)
+    """
+    prices = df['total_deposit_median'].values
+    edges = get_price_edges()
+    hist_counts, _ = np.histogram(prices, bins=edges)
+
+    sizes = set(df['size_category'].dropna().unique())
+    counts = df.groupby(['district', 'size_category'], observed=True).size()
+
+    district_counts = {}
+    for (district, size), count in counts.items():
+        district_counts.setdefault(district, {})[size] = int(count)
+
+    conversion_rate = None
+    if 'monthly_rent' in df.columns:
+        conversion_rate = build_conversion_inputs(df)['base_rate']
+
+    return {
+        'districts': sorted(df['district'].dropna().unique().tolist()),
+        'size_categories': [s for s in SIZE_ORDER if s in sizes],
+        'row_count': int(len(df)),
+        'price_min': float(prices.min()) if len(prices) else 0.0,
+        'price_max': float(prices.max()) if len(prices) else 0.0,
+        'price_histogram': {
+            'edges': edges.tolist(),
+            'counts': hist_counts.tolist(),
+            'overflow': int((prices > PRICE_SLIDER_RANGE[1]).sum())
+        },
+        'counts': district_counts,
+        'conversion_rate': conversion_rate
+    }
+
+
+def build_count_cube(df, districts, sizes):
+    """
+    구×평형×등급별 가격 경계 누적 건수
+
+    below[d, s, g, k] = 가격 < edges[k] 건수, at_or_below[d, s, g, k] = 가격 <= edges[k] 건수
+    → [lo, hi] 구간 건수 = at_or_below[..., hi] - below[..., lo] (경계값 포함 필터와 동일)
+
+    Returns:
+    --------
+    dict
+        districts, size_categories, edges, below / at_or_below (D, S, G, E)
+    """
+    edges = get_price_edges()
+    shape = (len(districts), len(sizes), len(VFM_GRADE_BINS) + 1, len(edges) + 1)
+
+    district_codes = pd.Categorical(df['district'], categories=districts).codes
+    size_codes = pd.Categorical(df['size_category'], categories=sizes).codes
+    valid = (district_codes >= 0) & (size_codes >= 0)
+    prices = df['total_deposit_median'].values[valid]
+    cell = np.ravel_multi_index(
+        (district_codes[valid], size_codes[valid], df['vfm_grade'].values[valid]), shape[:3])
+
+    def cumulative(first_edge):
+        # 행마다 조건을 처음 만족하는 경계 위치 히스토그램 → 경계 축 누적합
+        counts = np.bincount(cell * shape[3] + first_edge, minlength=np.prod(shape))
+        return counts.reshape(shape).cumsum(axis=3)[..., :len(edges)].astype(np.int32)
+
+    # NaN 가격은 어느 경계에서도 집계되지 않음 (필터와 동일)
+    return {
+        'districts': np.asarray(districts, dtype=str),
+        'size_categories': np.asarray(sizes, dtype=str),
+        'edges': edges,
+        'below': cumulative(np.searchsorted(edges, prices, side='right')),
+        'at_or_below': cumulative(np.searchsorted(edges, prices, side='left'))
+    }
+
+
+def query_count_cube(cube, districts, sizes, price_range):
+    """
+    검색 조건 → 등급별 예상 결과 건수 (등급 코드 순, 원본 스캔 없이 O(구×평형×등급))
+
+    가격 경계는 슬라이더 눈금에 맞춰 반올림 (슬라이더 값은 항상 눈금 위)
+    """
+    district_mask = np.ones(len(cube['districts']), dtype=bool)
+    if not is_all_selected(districts):
+        district_mask = np.isin(cube['districts'], districts)
+    size_mask = np.ones(len(cube['size_categories']), dtype=bool)
+    if not is_all_selected(sizes):
+        size_mask = np.isin(cube['size_categories'], sizes)
+
+    edges = cube['edges']
+    lo = min(np.searchsorted(edges, price_range[0], side='left'), len(edges) - 1)
+    hi = max(np.searchsorted(edges, price_range[1], side='right') - 1, 0)
+
+    selected = np.ix_(district_mask, size_mask)
+    counts = (cube['at_or_below'][selected][..., hi].astype(np.int64) -
+              cube['below'][selected][..., lo]).sum(axis=(0, 1))
+    return np.maximum(counts, 0)
+
+
+def write_metadata(contract_type='monthly', df=None):
+    """메타데이터 사이드카 + 건수 큐브 생성/저장"""
+    if df is None:
+        df = load_vfm_data(contract_type)
+    metadata = build_metadata(df)
+
+    path = get_metadata_path(contract_type)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False)
+    print(f"✅ 메타데이터 저장: {path} (구 {len(metadata['districts'])}개)")
+
+    cube = build_count_cube(df, metadata['districts'], metadata['size_categories'])
+    np.savez(get_count_cube_path(contract_type), **cube)
+    print(f"✅ 건수 큐브 저장: {get_count_cube_path(contract_type)} {cube['below'].shape}")
+    return metadata
+
+
+@st.cache_data(show_spinner=False)
+def load_metadata(contract_type='monthly'):
+    """메타데이터 로드 (사이드카가 없거나 원본보다 오래되면 생성)"""
+    path = get_metadata_path(contract_type)
+    if is_artifact_fresh(path, get_data_path(contract_type, 'hybrid')):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return write_metadata(contract_type)
+
+
+@st.cache_data(show_spinner=False)
+def load_count_cube(contract_type='monthly'):
+    """건수 큐브 로드 (없거나 원본보다 오래되면 메타데이터와 함께 재생성)"""
+    path = get_count_cube_path(contract_type)
+    if not is_artifact_fresh(path, get_data_path(contract_type, 'hybrid')):
+        write_metadata(contract_type)
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
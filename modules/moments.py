@@ -0,0 +1,240 @@
+"""
+Moments Module for Seoul Real Estate VFM Analysis
+구×평형×월 단위 모멘트 누적값 (건수, 평균 벡터, 중심화 교차곱 행렬)
+- 그룹 누적값은 Chan/Welford 병합식으로 합산 → 임의 필터 조합의 공분산/상관계수를 원본 재스캔 없이 계산
+- 히스토리는 월 파티션을 하나씩 읽어 누적 (전체 로딩 불필요)
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_data,
+    iter_history_partitions,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh,
+    LOCATION_INDEX_COLUMNS
+)
+from modules.filters import is_all_selected
+
+
+MOMENT_KEYS = ['district', 'size_category', 'year_month']
+
+# 상관관계 대상 지표 (사용자 가중치 미반영 기본 VFM 기준)
+MOMENT_FEATURES = ['vfm_index', 'total_deposit_median', 'price_change_pct'] + \
+    LOCATION_INDEX_COLUMNS + ['total_infra_score']
+
+MOMENT_FEATURE_LABELS = {
+    'vfm_index': 'VFM',
+    'total_deposit_median': '가격',
+    'price_change_pct': '예측 변화율',
+    'trans_index': '교통',
+    'conv_index': '편의',
+    'env_index': '환경',
+    'hospital_index': '의료',
+    'safety_score_scaled': '안전',
+    'total_infra_score': '인프라 총점'
+}
+
+
+def get_moments_path(contract_type='monthly', source='hybrid'):
+    """모멘트 누적값 경로 (source: hybrid / history)"""
+    return get_precomputed_path(f'moments_{contract_type}_{source}.npz')
+
+
+def empty_moments():
+    """빈 모멘트 누적값"""
+    n_features = len(MOMENT_FEATURES)
+    return {
+        'keys': pd.DataFrame(columns=MOMENT_KEYS),
+        'count': np.zeros(0),
+        'mean': np.zeros((0, n_features)),
+        'm2': np.zeros((0, n_features, n_features))
+    }
+
+
+def factorize_keys(keys):
+    """그룹 키 DataFrame → (행별 그룹 코드, 고유 키 DataFrame - 첫 등장 순)"""
+    codes = keys.groupby(MOMENT_KEYS, sort=False).ngroup().values
+    return codes, keys.drop_duplicates().reset_index(drop=True)
+
+
+def combine_moments(count, mean, m2, codes, n_groups):
+    """
+    그룹 코드가 같은 누적값끼리 병합
+
+    n = Σ n_k
+    mean = Σ n_k · mean_k / n
+    M2 = Σ [M2_k + n_k · (mean_k - mean)(mean_k - mean)ᵀ]
+    """
+    total = np.bincount(codes, weights=count, minlength=n_groups)
+    weighted = np.zeros((n_groups, mean.shape[1]))
+    np.add.at(weighted, codes, mean * count[:, None])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        merged_mean = np.where(total[:, None] > 0, weighted / total[:, None], 0.0)
+
+    delta = mean - merged_mean[codes]
+    merged_m2 = np.zeros((n_groups, mean.shape[1], mean.shape[1]))
+    np.add.at(merged_m2, codes,
+              m2 + count[:, None, None] * delta[:, :, None] * delta[:, None, :])
+    return total, merged_mean, merged_m2
+
+
+def build_moments(df):
+    """
+    데이터프레임 → 구×평형×월 모멘트 누적값 (지표 결측 행 제외)
+
+    Returns:
+    --------
+    dict
+        keys (그룹 키 DataFrame), count (G,), mean (G, F), m2 (G, F, F)
+    """
+    if df is None or df.empty:
+        return empty_moments()
+
+    values = df.reindex(columns=MOMENT_FEATURES).to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values).any(axis=1) & df[MOMENT_KEYS].notna().all(axis=1).values
+    values = values[valid]
+    keys = df.loc[valid, MOMENT_KEYS].astype(str)
+    if len(keys) == 0:
+        return empty_moments()
+
+    codes, uniques = factorize_keys(keys)
+    n_groups = len(uniques)
+
+    # 그룹별 평균 → 중심화 후 교차곱 (2-pass, 큰 값의 제곱합 상쇄 오차 방지)
+    n_features = values.shape[1]
+    count = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    mean = np.column_stack([
+        np.bincount(codes, weights=values[:, i], minlength=n_groups)
+        for i in range(n_features)]) / count[:, None]
+
+    # 지표 쌍(상삼각)별 bincount 합산 → 행 수 × F × F 임시 배열 없이 O(N) 메모리
+    centered = values - mean[codes]
+    m2 = np.zeros((n_groups, n_features, n_features))
+    for i, j in zip(*np.triu_indices(n_features)):
+        m2[:, i, j] = np.bincount(
+            codes, weights=centered[:, i] * centered[:, j], minlength=n_groups)
+        m2[:, j, i] = m2[:, i, j]
+
+    return {
+        'keys': uniques,
+        'count': count,
+        'mean': mean,
+        'm2': m2
+    }
+
+
+def concat_moments(parts):
+    """여러 누적값을 이어붙이고 같은 키는 병합"""
+    parts = [part for part in parts if len(part['count'])]
+    if not parts:
+        return empty_moments()
+
+    keys = pd.concat([part['keys'] for part in parts], ignore_index=True)
+    codes, uniques = factorize_keys(keys)
+    count, mean, m2 = combine_moments(
+        np.concatenate([part['count'] for part in parts]),
+        np.concatenate([part['mean'] for part in parts]),
+        np.concatenate([part['m2'] for part in parts]),
+        codes, len(uniques))
+    return {'keys': uniques, 'count': count, 'mean': mean, 'm2': m2}
+
+
+def select_moments(moments, mask):
+    """행 마스크로 누적값 부분 선택"""
+    return {
+        'keys': moments['keys'][mask].reset_index(drop=True),
+        'count': moments['count'][mask],
+        'mean': moments['mean'][mask],
+        'm2': moments['m2'][mask]
+    }
+
+
+def merge_moments(existing, updated, replaced_months):
+    """기존 누적값에서 replaced_months 구간을 제거하고 updated로 교체"""
+    if existing is None:
+        return updated
+    kept = select_moments(
+        existing, ~existing['keys']['year_month'].isin(replaced_months).values)
+    return concat_moments([kept, updated])
+
+
+def build_history_moments(contract_type='monthly'):
+    """히스토리 모멘트 누적값 (월 파티션을 하나씩 읽어 누적)"""
+    return concat_moments([
+        build_moments(part) for part in
+        iter_history_partitions(contract_type, MOMENT_KEYS + MOMENT_FEATURES)
+    ])
+
+
+def read_moments(path):
+    """디스크(npz) → 누적값"""
+    with np.load(path, allow_pickle=False) as data:
+        keys = pd.DataFrame({key: data[f'key_{key}'] for key in MOMENT_KEYS})
+        return {'keys': keys, 'count': data['count'], 'mean': data['mean'], 'm2': data['m2']}
+
+
+def save_moments(path, moments):
+    """누적값 → 디스크(npz)"""
+    keys = {f'key_{key}': moments['keys'][key].to_numpy(dtype=str) for key in MOMENT_KEYS}
+    np.savez(path, count=moments['count'], mean=moments['mean'], m2=moments['m2'], **keys)
+
+
+def write_moments(contract_type='monthly', source='hybrid', parts=None):
+    """원본에서 누적값을 생성해 저장 (parts: 히스토리 월 파티션별로 이미 생성한 누적값 목록)"""
+    if source == 'history':
+        moments = (concat_moments(parts) if parts is not None
+                   else build_history_moments(contract_type))
+    else:
+        moments = build_moments(load_vfm_data(contract_type))
+
+    path = get_moments_path(contract_type, source)
+    save_moments(path, moments)
+    print(f"✅ 모멘트 누적값 저장: {path} ({len(moments['count']):,}개 그룹)")
+    return moments
+
+
+@st.cache_data(show_spinner=False)
+def load_moments(contract_type='monthly', source='hybrid'):
+    """모멘트 누적값 로드 (디스크 산출물이 원본보다 최신이면 재사용)"""
+    path = get_moments_path(contract_type, source)
+    if is_artifact_fresh(path, get_data_path(contract_type, source)):
+        return read_moments(path)
+    return write_moments(contract_type, source)
+
+
+def correlation_from_moments(moments, districts=None, sizes=None, months=None, features=None):
+    """
+    필터 조합(구/평형/월)에 해당하는 그룹 누적값을 합산해 상관계수 행렬 계산
+
+    Returns:
+    --------
+    pd.DataFrame
+        features × features 상관계수 (해당 건수 2건 미만이면 빈 프레임)
+    """
+    keys = moments['keys']
+    mask = np.ones(len(keys), dtype=bool)
+    if districts is not None and not is_all_selected(districts):
+        mask &= keys['district'].isin(districts).values
+    if sizes is not None and not is_all_selected(sizes):
+        mask &= keys['size_category'].isin(sizes).values
+    if months is not None:
+        mask &= keys['year_month'].isin(months).values
+
+    selected = select_moments(moments, mask)
+    count, _, m2 = combine_moments(
+        selected['count'], selected['mean'], selected['m2'],
+        np.zeros(mask.sum(), dtype=np.int64), 1)
+    if count[0] < 2:
+        return pd.DataFrame()
+
+    features = features or MOMENT_FEATURES
+    idx = [MOMENT_FEATURES.index(feature) for feature in features]
+    cov = m2[0][np.ix_(idx, idx)] / (count[0] - 1)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.outer(std, std)
+    return pd.DataFrame(corr, index=features, columns=features)
@@ -0,0 +1,126 @@
+"""
+Precompute Pipeline for Seoul Real Estate VFM Analysis
+배포 전 사전 계산 산출물 전체 생성 (results/precomputed/)
+실행: python -m modules.precompute [monthly] [jeonse]
+월별 데이터 갱신 시에는 변경분만 반영하는 python -m modules.ingest 사용
+"""
+
+import sys
+import time
+
+from modules.data_loader import (
+    load_vfm_data,
+    iter_history_partitions,
+    get_data_path,
+    is_artifact_fresh,
+    VFM_GRADE_CODES
+)
+from modules.filters import apply_search_filters, attach_precomputed_columns, PRICE_SLIDER_RANGE
+from modules.map_builder import (
+    create_map,
+    get_prerendered_map_path,
+    PRERENDER_MARKER_LIMITS
+)
+from modules.timelapse import (
+    get_timelapse_path,
+    build_timelapse_frames,
+    write_timelapse_frames
+)
+from modules.aggregates import get_district_stats_path, build_district_stats, write_district_stats
+from modules.metadata import write_metadata
+from modules.moments import get_moments_path, build_moments, write_moments, load_moments
+from modules.sketches import get_sketch_path, build_quantile_sketches, write_sketches
+from modules.choropleth import write_grid_cells, write_district_boundaries
+from modules.anomalies import load_anomaly_scores
+from modules.trends import get_trend_path, write_trend_metrics, TREND_HISTORY_COLUMNS
+
+
+CONTRACT_TYPES = ['monthly', 'jeonse']
+
+
+def prerender_default_maps(contract_type):
+    """
+    기본 검색 조건(전체 구/평형/가격/등급, 높은 순)의 지도를 HTML로 저장
+    앱 검색과 같은 프레임(이상치/추세 컬럼 포함)으로 렌더링 → 팝업 내용 동일
+    """
+    df = load_vfm_data(contract_type)
+    if df.empty:
+        print(f"⚠️ 데이터 없음 - 지도 사전 렌더링 건너뜀: {contract_type}")
+        return
+    df = attach_precomputed_columns(df, contract_type)
+
+    df_default = apply_search_filters(df, ['전체'], ['전체'], PRICE_SLIDER_RANGE)
+    all_grades = list(VFM_GRADE_CODES)
+
+    for marker_limit in PRERENDER_MARKER_LIMITS:
+        path = get_prerendered_map_path(contract_type, 'marker', marker_limit)
+        create_map(df_default, 'marker', contract_type,
+                   marker_limit, 'desc', all_grades).save(path)
+        print(f"✅ 마커 지도 저장: {path}")
+
+    path = get_prerendered_map_path(contract_type, 'heatmap')
+    create_map(df_default, 'heatmap', contract_type,
+               vfm_grades=all_grades).save(path)
+    print(f"✅ 히트맵 지도 저장: {path}")
+
+
+def write_history_artifacts(contract_type):
+    """
+    히스토리 기반 산출물 중 원본보다 오래된 것만 생성
+    히스토리 월 파티션을 1회만 순회하며 같은 파티션으로 산출물별 월 단위 결과를 만든 뒤 병합
+    - 타임랩스/구별 집계/모멘트/스케치: 그룹 키에 월 포함 → 월별 결과 병합 = 전체 생성 결과
+    - 추세 지표: 12개월 윈도라 필요 컬럼만 모아 1회 계산
+    → 전체 히스토리를 메모리에 올리지 않음 (파티션 저장소가 오래되면 전처리된 전체 1개)
+    """
+    history_sources = [get_data_path(contract_type, 'history')]
+    builders = [
+        (get_timelapse_path(contract_type), history_sources,
+         build_timelapse_frames, write_timelapse_frames),
+        (get_district_stats_path(contract_type), history_sources,
+         build_district_stats, write_district_stats),
+        (get_moments_path(contract_type, 'history'), history_sources,
+         build_moments, lambda ct, parts: write_moments(ct, 'history', parts=parts)),
+        (get_sketch_path(contract_type), history_sources,
+         build_quantile_sketches, write_sketches),
+        # 추세 지표는 hybrid 행 순서로 저장 → hybrid 변경도 반영
+        (get_trend_path(contract_type),
+         history_sources + [get_data_path(contract_type, 'hybrid')],
+         lambda part: part.reindex(columns=TREND_HISTORY_COLUMNS), write_trend_metrics)
+    ]
+    stale = [(build, write) for path, sources, build, write in builders
+             if not all(is_artifact_fresh(path, source) for source in sources)]
+    if not stale:
+        print(f"📊 히스토리 산출물 최신 - 건너뜀: {contract_type}")
+        return
+
+    parts = [[] for _ in stale]
+    for partition in iter_history_partitions(contract_type):
+        for (build, _), built in zip(stale, parts):
+            built.append(build(partition))
+    for (_, write), built in zip(stale, parts):
+        write(contract_type, parts=built)
+
+
+def run_precompute(contract_types=None):
+    """계약 유형별 전체 사전 계산 실행"""
+    # 격자 셀 / 구 경계 도형은 계약 유형과 무관 → 1회만 생성
+    write_grid_cells()
+    write_district_boundaries()
+
+    for contract_type in contract_types or CONTRACT_TYPES:
+        start = time.perf_counter()
+        print(f"\n{'='*80}")
+        print(f"⚙️ 사전 계산 시작: {contract_type}")
+
+        write_metadata(contract_type)
+        write_history_artifacts(contract_type)
+        prerender_default_maps(contract_type)
+        load_moments(contract_type, 'hybrid')
+        load_anomaly_scores(contract_type)
+
+        print(f"⏱️ 사전 계산 완료: {contract_type} ({time.perf_counter() - start:.1f}초)")
+        print(f"{'='*80}\n")
+
+
+if __name__ == '__main__':
+    run_precompute(sys.argv[1:])
@@ -0,0 +1,124 @@
+"""
+Scenario Module for Seoul Real Estate VFM Analysis
+월세 전환율(전월세 전환율) 시나리오 - 전환보증금/예측 변화율/VFM 재계산
+- 원본 보증금·전환보증금·예측가를 float64 연속 배열로 1회 구성 (계약 유형별)
+- 전환율 변경 시 전체 데이터를 벡터 연산 1회로 재계산, 결과는 전환율별 캐시
+"""
+
+import numpy as np
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_data,
+    assign_vfm_grade,
+    estimate_conversion_rate,
+    CONVERSION_RATE
+)
+
+
+CONVERSION_RATE_RANGE = (2.0, 10.0)
+CONVERSION_RATE_STEP = 0.1
+DEFAULT_CONVERSION_RATE = CONVERSION_RATE
+
+# 전환율 시나리오로 교체되는 컬럼
+SCENARIO_COLUMNS = ['total_deposit_median', 'future_price', 'price_change_pct', 'vfm_index']
+
+
+def build_conversion_inputs(df):
+    """
+    월세 hybrid 프레임 → 전환율 시나리오 입력 배열 (load_vfm_data 행 순서와 동일)
+
+    Returns:
+    --------
+    dict
+        deposit / rent / price / future / change_pct / vfm (N,) float64,
+        valid (보증금·월세가 있는 행), base_rate (데이터 전환율 %)
+    """
+    columns = df.reindex(columns=['original_deposit', 'monthly_rent'])
+    deposit = columns['original_deposit'].to_numpy(dtype=np.float64)
+    rent = columns['monthly_rent'].to_numpy(dtype=np.float64)
+    price = df['total_deposit_median'].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(deposit) & ~np.isnan(rent) & (rent > 0) & (price > 0)
+
+    return {
+        'deposit': np.where(valid, deposit, 0.0),
+        'rent': np.where(valid, rent, 0.0),
+        'price': price,
+        'future': df['future_price'].to_numpy(dtype=np.float64),
+        'change_pct': df['price_change_pct'].to_numpy(dtype=np.float64),
+        'vfm': df['vfm_index'].to_numpy(dtype=np.float64),
+        'valid': valid,
+        'base_rate': estimate_conversion_rate(deposit[valid], rent[valid], price[valid])
+    }
+
+
+def compute_conversion_scenario(inputs, rate):
+    """
+    전환율 rate(%) 기준 전환보증금 / 12개월 예측가 / 예측 변화율 / VFM 재계산
+
+    - 전환보증금·예측가: 보증금은 유지하고 월세 환산분(값 - 보증금)만
+      (데이터 전환율 / rate) 배율로 환산 → 두 값이 같은 식, rate = 데이터 전환율이면 원래 값
+    - 예측 변화율: 원래 값 + (환산 후 변화율 - 환산 전 변화율)
+    - VFM: 가격 대비 가치이므로 전환보증금 변화에 반비례 (vfm × 기존 가격 / 새 가격)
+    - 보증금·월세가 없거나 예측가가 없는 행은 원래 값 유지 (예측 변화율 포함)
+
+    Returns:
+    --------
+    dict
+        SCENARIO_COLUMNS별 (N,) 배열
+    """
+    valid = inputs['valid']
+    deposit = inputs['deposit']
+    # 값 + 월세 환산분 × (배율 - 1) 형태 → 데이터 전환율에서 증분이 정확히 0
+    scale = inputs['base_rate'] / rate - 1.0
+    price = np.where(
+        valid, inputs['price'] + (inputs['price'] - deposit) * scale, inputs['price'])
+
+    has_future = valid & (inputs['future'] > 0)
+    future = np.where(
+        has_future, inputs['future'] + (inputs['future'] - deposit) * scale, inputs['future'])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        base_change = (inputs['future'] - inputs['price']) / inputs['price'] * 100
+        change_delta = ((future - price) / price * 100 - base_change).round(2)
+        change_pct = np.where(
+            has_future, inputs['change_pct'] + change_delta, inputs['change_pct'])
+        vfm = np.where(valid, inputs['vfm'] * (inputs['price'] / price), inputs['vfm'])
+
+    return {
+        'total_deposit_median': price,
+        'future_price': future,
+        'price_change_pct': change_pct,
+        'vfm_index': vfm
+    }
+
+
+def apply_conversion_scenario(df, scenario):
+    """전환율 시나리오 컬럼을 교체한 데이터프레임 반환 (custom_vfm / vfm_grade 포함)"""
+    if scenario is None or len(df) != len(scenario['vfm_index']):
+        return df
+
+    df = df.copy(deep=False)
+    for col in SCENARIO_COLUMNS:
+        df[col] = scenario[col]
+    df['custom_vfm'] = df['vfm_index']
+    df['vfm_grade'] = assign_vfm_grade(df['custom_vfm'].values)
+    return df
+
+
+@st.cache_resource(show_spinner=False)
+def load_conversion_inputs(contract_type='monthly'):
+    """계약 유형별 전환율 시나리오 입력 배열 (세션 간 공유)"""
+    return build_conversion_inputs(load_vfm_data(contract_type))
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def load_conversion_scenario(contract_type, rate):
+    """
+    전환율별 시나리오 결과 (슬라이더 눈금 단위로 캐시)
+    전환 대상 행이 없으면 None (원본 그대로 사용)
+    """
+    inputs = load_conversion_inputs(contract_type)
+    if not inputs['valid'].any():
+        return None
+    return compute_conversion_scenario(inputs, round(rate, 1))
@@ -0,0 +1,115 @@
+"""
+Scoring Module for Seoul Real Estate VFM Analysis
+입지 지표 5개 사용자 가중치 기반 VFM 재계산
+- 로딩 시 입지 지표를 0~1로 정규화한 float32 연속 행렬을 1회 구성
+- 가중치 변경 시 행렬-벡터 곱 1회로 전체 데이터 재계산, 상위 K개는 argpartition으로 선택
+"""
+
+import numpy as np
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_data,
+    assign_vfm_grade,
+    LOCATION_INDEX_COLUMNS
+)
+
+
+LOCATION_INDEX_LABELS = {
+    'trans_index': '🚇 교통',
+    'conv_index': '🏪 편의',
+    'env_index': '🌳 환경',
+    'hospital_index': '🏥 의료',
+    'safety_score_scaled': '🛡️ 안전'
+}
+DEFAULT_WEIGHT = 1.0
+
+
+def build_location_matrix(df):
+    """입지 지표 5개 → 열별 min-max 정규화된 (N, 5) float32 연속 행렬"""
+    values = df[LOCATION_INDEX_COLUMNS].to_numpy(dtype=np.float32)
+    if len(values) == 0:
+        return np.zeros((0, len(LOCATION_INDEX_COLUMNS)), dtype=np.float32)
+
+    col_min = values.min(axis=0)
+    col_span = values.max(axis=0) - col_min
+    col_span[col_span == 0] = 1.0
+    return np.ascontiguousarray((values - col_min) / col_span, dtype=np.float32)
+
+
+def is_default_weights(weights):
+    """모든 가중치가 동일하면 True (기본 VFM과 동일한 결과)"""
+    weights = np.asarray(weights, dtype=np.float32)
+    return weights.sum() <= 0 or bool(np.all(weights == weights[0]))
+
+
+def compute_weighted_vfm(vfm_index, location_matrix, weights):
+    """
+    사용자 가중치 VFM 계산
+
+    custom_vfm = vfm_index × (1 + 가중 입지 점수 - 균등 가중 입지 점수)
+    - 가중치는 합이 1이 되도록 정규화, 균등 가중치면 vfm_index 그대로
+    - 보정 계수 범위: 0 ~ 2 (정규화 지표가 0~1이므로)
+
+    Parameters:
+    -----------
+    vfm_index : np.ndarray
+        기본 VFM 지수 (N,)
+    location_matrix : np.ndarray
+        build_location_matrix() 결과 (N, 5)
+    weights : list
+        입지 지표별 가중치 (LOCATION_INDEX_COLUMNS 순서)
+
+    Returns:
+    --------
+    np.ndarray
+        사용자 가중치 VFM (N,)
+    """
+    vfm_index = np.asarray(vfm_index, dtype=np.float64)
+    if is_default_weights(weights):
+        return vfm_index
+
+    weights = np.asarray(weights, dtype=np.float32)
+    delta = weights / weights.sum() - np.float32(1.0 / len(weights))
+    adjustment = location_matrix @ delta
+    return vfm_index * (1.0 + adjustment)
+
+
+def apply_location_weights(df, location_matrix, weights):
+    """
+    custom_vfm / vfm_grade 컬럼을 가중치 기준으로 갱신한 데이터프레임 반환
+    (이미 다른 가중치가 반영된 결과도 vfm_index 기준으로 다시 계산)
+    """
+    if len(df) != len(location_matrix):
+        raise ValueError(
+            f"입지 지표 행렬 행 수({len(location_matrix):,})가 데이터 행 수({len(df):,})와 다릅니다")
+
+    df = df.copy(deep=False)
+    df['custom_vfm'] = compute_weighted_vfm(
+        df['vfm_index'].values, location_matrix, weights)
+    df['vfm_grade'] = assign_vfm_grade(df['custom_vfm'].values)
+    return df
+
+
+def top_k_positions(scores, k, descending=True):
+    """
+    점수 상위(또는 하위) k개 위치를 순서대로 반환 (결측 제외)
+    argpartition으로 k개를 O(N) 선택한 뒤 k개만 정렬
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    positions = np.flatnonzero(~np.isnan(scores))
+    keys = -scores[positions] if descending else scores[positions]
+    k = min(k, len(keys))
+    if k == 0:
+        return positions[:0]
+    if k < len(keys):
+        selected = np.argpartition(keys, k - 1)[:k]
+    else:
+        selected = np.arange(len(keys))
+    return positions[selected[np.argsort(keys[selected], kind='stable')]]
+
+
+@st.cache_resource(show_spinner=False)
+def load_location_matrix(contract_type='monthly'):
+    """계약 유형별 정규화 입지 지표 행렬 (load_vfm_data 행 순서와 동일)"""
+    return build_location_matrix(load_vfm_data(contract_type))
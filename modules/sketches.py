@@ -0,0 +1,316 @@
+"""
+Quantile Sketch Module for Seoul Real Estate VFM Analysis
+구×평형×월 단위 병합 가능한 분위수 스케치 (가격 / VFM / 예측 변화율)
+
+- 그룹별 값이 SKETCH_POINTS개 이하이면 정렬된 원값 그대로 보관 (오차 0)
+- 초과하면 정렬 후 동일 순위 간격 SKETCH_POINTS개 구간의 중앙 순위 값을 대표점으로,
+  가중치 n / SKETCH_POINTS로 보관 (KLL 최상위 compactor 1단계와 같은 요약)
+- 임의 그룹 합집합의 분위수 = 선택 그룹 대표점을 이어붙여 가중 순위로 보간
+
+오차 한계 (순위 기준):
+    그룹 k의 추정 순위 오차 ≤ n_k / SKETCH_POINTS (대표점 1개가 걸치는 구간 크기)
+    합집합 N = Σ n_k 의 추정 순위 오차 ≤ Σ n_k / SKETCH_POINTS = N / SKETCH_POINTS
+    → SKETCH_POINTS = 32 이면 최악 ±3.1%p 순위 (예: p50 요청 시 실제 p46.9 ~ p53.1 사이 값)
+    스케치는 월 단위로 항상 원본 행에서 생성되고 질의 시 1회만 병합하므로 오차가 누적되지 않음
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    iter_history_partitions,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh
+)
+from modules.filters import is_all_selected
+
+
+SKETCH_KEYS = ['district', 'size_category', 'year_month']
+SKETCH_FEATURES = ['total_deposit_median', 'custom_vfm', 'price_change_pct']
+SKETCH_POINTS = 32
+
+
+def get_sketch_path(contract_type='monthly'):
+    """히스토리 분위수 스케치 경로"""
+    return get_precomputed_path(f'sketches_{contract_type}.npz')
+
+
+def empty_sketches():
+    """빈 스케치"""
+    return {
+        'keys': pd.DataFrame(columns=SKETCH_KEYS),
+        'features': {
+            col: {'offsets': np.zeros(1, dtype=np.int64),
+                  'values': np.zeros(0), 'weights': np.zeros(0)}
+            for col in SKETCH_FEATURES
+        }
+    }
+
+
+def summarize_sorted_groups(values, codes, n_groups, points=SKETCH_POINTS):
+    """
+    (그룹 코드, 값) 순으로 정렬된 배열 → 그룹별 대표점
+
+    Returns:
+    --------
+    dict
+        offsets (G + 1,), values, weights (그룹 g의 대표점은 offsets[g]:offsets[g+1])
+    """
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    kept = np.minimum(counts, points)
+    offsets = np.concatenate([[0], np.cumsum(kept)]).astype(np.int64)
+
+    # 그룹 내 대표점 번호 j → 원본 순위 (n ≤ points면 j 그대로, 아니면 구간 중앙 순위)
+    group_of_point = np.repeat(np.arange(n_groups), kept)
+    j = np.arange(offsets[-1]) - offsets[group_of_point]
+    n = counts[group_of_point]
+    compacted = n > points
+    rank = np.where(compacted, ((j + 0.5) * n / points).astype(np.int64), j)
+
+    return {
+        'offsets': offsets,
+        'values': values[starts[group_of_point] + rank],
+        'weights': np.where(compacted, n / points, 1.0)
+    }
+
+
+def build_quantile_sketches(df, points=SKETCH_POINTS):
+    """
+    데이터프레임 → 구×평형×월 스케치 (지표별 결측 제외)
+
+    Returns:
+    --------
+    dict
+        keys (그룹 키 DataFrame), features {지표: {offsets, values, weights}}
+    """
+    if df is None or df.empty:
+        return empty_sketches()
+
+    keys = df[SKETCH_KEYS]
+    valid_keys = keys.notna().all(axis=1).values
+    keys = keys[valid_keys].astype(str)
+    if keys.empty:
+        return empty_sketches()
+
+    codes = keys.groupby(SKETCH_KEYS, sort=False).ngroup().values
+    uniques = keys.drop_duplicates().reset_index(drop=True)
+
+    features = {}
+    for col in SKETCH_FEATURES:
+        values = df[col].to_numpy(dtype=np.float64)[valid_keys] if col in df.columns \
+            else np.full(len(codes), np.nan)
+        valid = ~np.isnan(values)
+        col_values, col_codes = values[valid], codes[valid]
+        order = np.lexsort((col_values, col_codes))
+        features[col] = summarize_sorted_groups(
+            col_values[order], col_codes[order], len(uniques), points)
+
+    return {'keys': uniques, 'features': features}
+
+
+def concat_sketches(parts):
+    """스케치 이어붙이기 (키 중복 허용 - 질의 시 합집합으로 병합)"""
+    parts = [part for part in parts if len(part['keys'])]
+    if not parts:
+        return empty_sketches()
+
+    features = {}
+    for col in SKETCH_FEATURES:
+        offsets, base = [np.zeros(1, dtype=np.int64)], 0
+        for part in parts:
+            offsets.append(part['features'][col]['offsets'][1:] + base)
+            base += part['features'][col]['offsets'][-1]
+        features[col] = {
+            'offsets': np.concatenate(offsets),
+            'values': np.concatenate([part['features'][col]['values'] for part in parts]),
+            'weights': np.concatenate([part['features'][col]['weights'] for part in parts])
+        }
+
+    keys = pd.concat([part['keys'] for part in parts], ignore_index=True)
+    return {'keys': keys, 'features': features}
+
+
+def gather_points(sketch, groups):
+    """선택 그룹의 대표점 값/가중치 (그룹 구간을 이어붙여 take 1회)"""
+    offsets = sketch['offsets']
+    starts = offsets[groups]
+    lengths = offsets[groups + 1] - starts
+    rows = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return sketch['values'][rows], sketch['weights'][rows]
+
+
+def select_sketches(sketches, mask):
+    """그룹 마스크로 스케치 부분 선택"""
+    groups = np.flatnonzero(mask)
+    features = {}
+    for col, sketch in sketches['features'].items():
+        lengths = np.diff(sketch['offsets'])[groups]
+        values, weights = gather_points(sketch, groups)
+        features[col] = {
+            'offsets': np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            'values': values,
+            'weights': weights
+        }
+    return {'keys': sketches['keys'][mask].reset_index(drop=True), 'features': features}
+
+
+def merge_sketches(existing, updated, replaced_months):
+    """기존 스케치에서 replaced_months 구간을 제거하고 updated로 교체"""
+    if existing is None:
+        return updated
+    kept = select_sketches(
+        existing, ~existing['keys']['year_month'].isin(replaced_months).values)
+    return concat_sketches([kept, updated])
+
+
+def weighted_quantiles(values, weights, quantiles):
+    """대표점 → 분위수 (가중 순위 중앙 기준 선형 보간)"""
+    if len(values) == 0:
+        return np.full(len(quantiles), np.nan)
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    cumulative = np.cumsum(weights)
+    centers = cumulative - weights / 2
+    return np.interp(np.asarray(quantiles) * cumulative[-1], centers, values)
+
+
+def index_sketches(sketches):
+    """
+    질의용 보조 인덱스 추가 (로드 시 1회)
+    - 키 컬럼별 정수 코드 → 문자열 비교 없이 그룹 마스크 계산
+    - 지표별 전체 대표점 값 정렬 순서 + 점별 그룹 → 큰 합집합은 재정렬 없이 마스크 후 누적
+    """
+    key_codes = {}
+    for key in SKETCH_KEYS:
+        codes, categories = pd.factorize(sketches['keys'][key])
+        key_codes[key] = (codes, {value: code for code, value in enumerate(categories)})
+
+    for sketch in sketches['features'].values():
+        order = np.argsort(sketch['values'], kind='stable')
+        point_groups = np.repeat(np.arange(len(sketch['offsets']) - 1),
+                                 np.diff(sketch['offsets']))
+        sketch['sorted_values'] = sketch['values'][order]
+        sketch['sorted_weights'] = sketch['weights'][order]
+        sketch['sorted_groups'] = point_groups[order]
+
+    sketches['key_codes'] = key_codes
+    return sketches
+
+
+def get_group_mask(sketches, districts=None, sizes=None, months=None):
+    """구/평형/월 조건 → 그룹 마스크 ('전체' 또는 None은 조건 없음)"""
+    mask = np.ones(len(sketches['keys']), dtype=bool)
+    conditions = [('district', None if districts is None or is_all_selected(districts) else districts),
+                  ('size_category', None if sizes is None or is_all_selected(sizes) else sizes),
+                  ('year_month', months)]
+    for key, selected in conditions:
+        if selected is None:
+            continue
+        if 'key_codes' in sketches:
+            codes, lookup = sketches['key_codes'][key]
+            mask &= np.isin(codes, [lookup[v] for v in selected if v in lookup])
+        else:
+            mask &= sketches['keys'][key].isin(selected).values
+    return mask
+
+
+def sketch_quantiles(sketches, feature, quantiles, districts=None, sizes=None, months=None):
+    """구/평형/월 조건 합집합의 근사 분위수 (오차 한계는 모듈 설명 참고)"""
+    mask = get_group_mask(sketches, districts, sizes, months)
+    sketch = sketches['features'][feature]
+
+    # 선택 대표점이 많으면 미리 정렬된 전체 점에서 마스크만 적용 (정렬 생략)
+    lengths = np.diff(sketch['offsets'])
+    if 'sorted_values' in sketch and lengths[mask].sum() * 8 > len(sketch['values']):
+        selected = mask[sketch['sorted_groups']]
+        values, weights = sketch['sorted_values'][selected], sketch['sorted_weights'][selected]
+        if len(values) == 0:
+            return np.full(len(quantiles), np.nan)
+        cumulative = np.cumsum(weights)
+        return np.interp(np.asarray(quantiles) * cumulative[-1],
+                         cumulative - weights / 2, values)
+
+    values, weights = gather_points(sketch, np.flatnonzero(mask))
+    return weighted_quantiles(values, weights, quantiles)
+
+
+def sketch_quantiles_grouped(sketches, feature, quantiles, by='year_month',
+                             districts=None, sizes=None, months=None):
+    """
+    키 컬럼(by) 값별 근사 분위수 (나머지 조건은 합집합)
+
+    Returns:
+    --------
+    pd.DataFrame
+        index: by 값, columns: 분위수
+    """
+    mask = get_group_mask(sketches, districts, sizes, months)
+    labels = sketches['keys'][by].values[mask]
+    groups = np.flatnonzero(mask)
+    sketch = sketches['features'][feature]
+
+    # by 기준 정렬 → 값별 그룹 구간
+    order = np.argsort(labels, kind='stable')
+    labels, groups = labels[order], groups[order]
+    unique_labels, starts = np.unique(labels, return_index=True)
+    bounds = np.append(starts, len(groups))
+
+    rows = [
+        weighted_quantiles(*gather_points(sketch, groups[bounds[i]:bounds[i + 1]]), quantiles)
+        for i in range(len(unique_labels))
+    ]
+    return pd.DataFrame(np.array(rows).reshape(len(unique_labels), len(quantiles)),
+                        index=unique_labels, columns=list(quantiles))
+
+
+def sketch_quantiles_by_month(sketches, feature, quantiles, districts=None, sizes=None):
+    """월별 근사 분위수 (구/평형 조건 합집합, index: year_month)"""
+    return sketch_quantiles_grouped(sketches, feature, quantiles, 'year_month',
+                                    districts, sizes)
+
+
+def read_sketches(path):
+    """디스크(npz) → 스케치"""
+    with np.load(path, allow_pickle=False) as data:
+        keys = pd.DataFrame({key: data[f'key_{key}'] for key in SKETCH_KEYS})
+        features = {
+            col: {part: data[f'{col}__{part}'] for part in ['offsets', 'values', 'weights']}
+            for col in SKETCH_FEATURES
+        }
+    return {'keys': keys, 'features': features}
+
+
+def save_sketches(path, sketches):
+    """스케치 → 디스크(npz)"""
+    arrays = {f'key_{key}': sketches['keys'][key].to_numpy(dtype=str) for key in SKETCH_KEYS}
+    for col, sketch in sketches['features'].items():
+        for part in ['offsets', 'values', 'weights']:
+            arrays[f'{col}__{part}'] = sketch[part]
+    np.savez(path, **arrays)
+
+
+def write_sketches(contract_type='monthly', parts=None):
+    """
+    히스토리 월 파티션을 하나씩 읽어 스케치 생성/저장
+    parts: 월 파티션별로 이미 생성한 스케치 목록
+    """
+    if parts is None:
+        parts = [build_quantile_sketches(part) for part in
+                 iter_history_partitions(contract_type, SKETCH_KEYS + SKETCH_FEATURES)]
+    sketches = concat_sketches(parts)
+    path = get_sketch_path(contract_type)
+    save_sketches(path, sketches)
+    print(f"✅ 분위수 스케치 저장: {path} ({len(sketches['keys']):,}개 그룹)")
+    return sketches
+
+
+@st.cache_data(show_spinner=False)
+def load_quantile_sketches(contract_type='monthly'):
+    """히스토리 분위수 스케치 로드 (디스크 산출물이 원본보다 최신이면 재사용)"""
+    path = get_sketch_path(contract_type)
+    if is_artifact_fresh(path, get_data_path(contract_type, 'history')):
+        return index_sketches(read_sketches(path))
+    return index_sketches(write_sketches(contract_type))
@@ -0,0 +1,81 @@
+"""
+Skyline Module for Seoul Real Estate VFM Analysis
+가격↓ · VFM↑ · 입지 총점↑ 기준 파레토 최적(지배되지 않는) 매물 탐색
+- Sort-Filter-Skyline: 단조 점수 순 정렬 후 스카이라인 점이 지배하는 점을 벡터 연산으로 일괄 제거
+"""
+
+import numpy as np
+
+
+SKYLINE_INFRA_COLUMN = 'total_infra_score'
+
+
+def _minmax(values):
+    """0~1 min-max 정규화 (범위 0이면 0)"""
+    span = values.max() - values.min()
+    if span == 0:
+        return np.zeros_like(values)
+    return (values - values.min()) / span
+
+
+def compute_skyline(price, vfm, infra):
+    """
+    3차원 스카이라인 인덱스 계산
+
+    점 a가 b를 지배: price_a <= price_b, vfm_a >= vfm_b, infra_a >= infra_b
+    이고 셋 중 하나 이상은 엄격히 더 좋음
+
+    Parameters:
+    -----------
+    price : array-like
+        가격 (낮을수록 좋음)
+    vfm : array-like
+        VFM 지수 (높을수록 좋음)
+    infra : array-like
+        입지 총점 (높을수록 좋음)
+
+    Returns:
+    --------
+    np.ndarray
+        스카이라인에 속하는 행의 원래 위치 인덱스 (단조 점수 내림차순)
+    """
+    price = np.asarray(price, dtype=np.float64)
+    vfm = np.asarray(vfm, dtype=np.float64)
+    infra = np.asarray(infra, dtype=np.float64)
+    if len(price) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # 지배하는 점이 항상 먼저 오도록 엄격 단조 점수로 정렬
+    score = _minmax(vfm) + _minmax(infra) - _minmax(price)
+    idx = np.argsort(-score, kind='stable')
+    price, vfm, infra = price[idx], vfm[idx], infra[idx]
+
+    # 남은 후보의 맨 앞은 항상 스카이라인 → 그 점에 지배되지 않는 후보만 압축해 유지
+    skyline = []
+    while idx.size:
+        skyline.append(idx[0])
+        head_p, head_v, head_i = price[0], vfm[0], infra[0]
+        price, vfm, infra, idx = price[1:], vfm[1:], infra[1:], idx[1:]
+
+        keep = (
+            (price < head_p) | (vfm > head_v) | (infra > head_i) |
+            ((price == head_p) & (vfm == head_v) & (infra == head_i))
+        )
+        price, vfm, infra, idx = price[keep], vfm[keep], infra[keep], idx[keep]
+
+    return np.asarray(skyline, dtype=np.int64)
+
+
+def get_skyline_frame(df):
+    """필터링된 검색 결과 → 스카이라인 행만 담은 데이터프레임 (VFM 내림차순)"""
+    if df is None or df.empty:
+        return df
+
+    df_valid = df.dropna(subset=['lat', 'lon'])
+    idx = compute_skyline(
+        df_valid['total_deposit_median'].values,
+        df_valid['custom_vfm'].values,
+        df_valid[SKYLINE_INFRA_COLUMN].values
+    )
+    frontier = df_valid.iloc[idx]
+    return frontier.sort_values('custom_vfm', ascending=False).reset_index(drop=True)
@@ -0,0 +1,98 @@
+"""
+Snapshot Store Module for Seoul Real Estate VFM Analysis
+히스토리 데이터를 기준 월(year_month)별 배열 블록으로 분할한 스냅샷 저장소
+- 월 전환 시 재로딩 없이 해당 월의 배열 블록만 교체
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import load_vfm_history
+from modules.scoring import build_location_matrix
+from modules.anomalies import build_anomaly_scores
+from modules.trends import build_trend_metrics
+
+
+# 메인 검색/지도/시각화에 필요한 컬럼만 스냅샷에 보관
+SNAPSHOT_COLUMNS = [
+    'grid_id', 'district', 'size_category', 'lat', 'lon',
+    'datetime', 'year_month', 'contract_type',
+    'vfm_index', 'custom_vfm', 'vfm_grade',
+    'total_deposit_median', 'future_price', 'price_change_pct',
+    'pred_3m', 'pred_6m', 'pred_9m', 'pred_12m',
+    'trans_index', 'conv_index', 'env_index', 'hospital_index',
+    'safety_score_scaled', 'total_infra_score', 'infra_score',
+    'anomaly_score', 'is_anomaly',
+    'vfm_slope_12m', 'vfm_change_12m', 'vfm_volatility_12m'
+]
+
+
+def build_snapshot_store(df):
+    """
+    전처리된 히스토리 프레임 → 월별 스냅샷 저장소
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        preprocess_vfm_frame()을 거친 히스토리 데이터
+
+    Returns:
+    --------
+    dict
+        {'months': [year_month, ...], 'blocks': {year_month: {컬럼: ndarray}},
+         'matrices': {year_month: 정규화 입지 지표 행렬}}
+        각 블록의 배열은 월 단위로 연속된 메모리 구간(view)
+    """
+    if df is None or df.empty or 'year_month' not in df.columns:
+        return {'months': [], 'blocks': {}, 'matrices': {}}
+
+    df = df[df['year_month'].notna()]
+
+    # 이상치 점수/추세 지표는 월을 넘나드는 그룹 기준이므로 월 블록 분할 전에 1회 계산
+    anomalies = build_anomaly_scores(df)
+    df = df.assign(anomaly_score=anomalies['score'], is_anomaly=anomalies['flag'],
+                   **build_trend_metrics(df))
+    year_months = df['year_month'].values.astype(str)
+
+    # 월 기준 1회 정렬 후 월별 경계 계산
+    order = np.argsort(year_months, kind='stable')
+    months, starts = np.unique(year_months[order], return_index=True)
+    bounds = np.append(starts, len(order))
+
+    columns = {
+        col: np.ascontiguousarray(df[col].values[order])
+        for col in SNAPSHOT_COLUMNS if col in df.columns
+    }
+
+    # 입지 지표 정규화는 전체 기간 기준으로 1회 (월 간 비교 가능)
+    location_matrix = build_location_matrix(df.iloc[order])
+
+    blocks = {}
+    matrices = {}
+    for i, month in enumerate(months):
+        start, end = bounds[i], bounds[i + 1]
+        blocks[month] = {col: values[start:end]
+                         for col, values in columns.items()}
+        matrices[month] = location_matrix[start:end]
+
+    print(f"✅ 스냅샷 저장소 구성 완료: {len(months)}개월, {len(order):,}건")
+    return {'months': months.tolist(), 'blocks': blocks, 'matrices': matrices}
+
+
+def get_snapshot(store, year_month):
+    """기준 월의 배열 블록을 데이터프레임으로 감싸 반환 (재로딩/재계산 없음)"""
+    block = store['blocks'].get(year_month)
+    if block is None:
+        return pd.DataFrame()
+    return pd.DataFrame(block, copy=False)
+
+
+@st.cache_resource(show_spinner=False)
+def load_snapshot_store(contract_type='monthly'):
+    """계약 유형별 스냅샷 저장소 (세션 간 공유, 최초 1회만 구성)"""
+    try:
+        return build_snapshot_store(load_vfm_history(contract_type))
+    except FileNotFoundError:
+        st.error(f"❌ 히스토리 파일을 찾을 수 없습니다: {contract_type}")
+        return {'months': [], 'blocks': {}, 'matrices': {}}
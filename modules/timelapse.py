@@ -0,0 +1,181 @@
+"""
+Time-lapse Module for Seoul Real Estate VFM Analysis
+히스토리 데이터 기반 월별 VFM 타임랩스 지도
+- 월×그리드 집계를 1회 계산해 디스크(npz)에 캐시
+- HeatMapWithTime 레이어 1개로 전체 애니메이션 구성
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_history,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh
+)
+
+
+# 타임랩스 시작 월
+TIMELAPSE_START = '2015-01'
+
+
+def build_timelapse_frames(df, start_month=TIMELAPSE_START):
+    """
+    히스토리 프레임 → 월별 그리드 평균 VFM 프레임 (평형 통합)
+
+    Returns:
+    --------
+    dict
+        months : 월 라벨 배열 (F,)
+        offsets : 프레임 경계 (F+1,) - 프레임 i = [offsets[i], offsets[i+1])
+        lat, lon, weight : 프레임 순으로 이어 붙인 포인트 배열
+    """
+    df = df[(df['year_month'] >= start_month) &
+            df['lat'].notna() & df['lon'].notna()]
+
+    month_codes, months = pd.factorize(df['year_month'], sort=True)
+    grid_codes, grids = pd.factorize(df['grid_id'], sort=True)
+    n_grids = len(grids)
+
+    # (월, 그리드) 키 1개로 묶어 bincount로 그룹 평균 계산
+    keys = month_codes.astype(np.int64) * n_grids + grid_codes
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    vfm_sum = np.bincount(inverse, weights=df['custom_vfm'].values)
+    vfm_count = np.bincount(inverse)
+    vfm_mean = vfm_sum / vfm_count
+
+    grid_lat = np.zeros(n_grids)
+    grid_lon = np.zeros(n_grids)
+    grid_lat[grid_codes] = df['lat'].values
+    grid_lon[grid_codes] = df['lon'].values
+
+    frame_month = unique_keys // n_grids
+    frame_grid = unique_keys % n_grids
+
+    return {
+        'months': np.asarray(months, dtype=str),
+        'offsets': np.searchsorted(frame_month, np.arange(len(months) + 1)),
+        'lat': grid_lat[frame_grid].astype(np.float32),
+        'lon': grid_lon[frame_grid].astype(np.float32),
+        # 히트맵과 동일한 정규화 (VFM 3.0 이상 = 1.0)
+        'weight': np.minimum(vfm_mean / 3.0, 1.0).astype(np.float32)
+    }
+
+
+def collect_month_frames(frames, parts, skipped_months=()):
+    """프레임 dict → 월별 (lat, lon, weight) 조각을 parts에 추가 (skipped_months 제외)"""
+    if not frames:
+        return
+    offsets = frames['offsets']
+    for i, month in enumerate(frames['months']):
+        if month in skipped_months:
+            continue
+        start, end = offsets[i], offsets[i + 1]
+        parts[month] = tuple(frames[key][start:end]
+                             for key in ('lat', 'lon', 'weight'))
+
+
+def merge_timelapse_frames(existing, updated, replaced_months):
+    """기존 프레임에서 replaced_months를 제거하고 updated 프레임으로 교체 (월 순 재조립)"""
+    parts = {}
+    collect_month_frames(existing, parts, replaced_months)
+    collect_month_frames(updated, parts)
+    return assemble_month_frames(parts)
+
+
+def concat_timelapse_frames(frames_list):
+    """월 파티션별로 생성한 프레임들을 월 순으로 이어붙이기"""
+    parts = {}
+    for frames in frames_list:
+        collect_month_frames(frames, parts)
+    return assemble_month_frames(parts)
+
+
+def assemble_month_frames(parts):
+    """월별 조각 dict → 프레임 dict (월 순)"""
+    months = sorted(parts)
+    lengths = [len(parts[month][0]) for month in months]
+    return {
+        'months': np.asarray(months, dtype=str),
+        'offsets': np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        'lat': np.concatenate([parts[m][0] for m in months] or [np.zeros(0, np.float32)]),
+        'lon': np.concatenate([parts[m][1] for m in months] or [np.zeros(0, np.float32)]),
+        'weight': np.concatenate([parts[m][2] for m in months] or [np.zeros(0, np.float32)])
+    }
+
+
+def get_timelapse_path(contract_type='monthly'):
+    """타임랩스 프레임 디스크 캐시 경로"""
+    return get_precomputed_path(f'timelapse_{contract_type}.npz')
+
+
+def read_timelapse_frames(path):
+    """디스크 캐시(npz) → 프레임 dict"""
+    with np.load(path) as cached:
+        return {key: cached[key] for key in cached.files}
+
+
+def save_timelapse_frames(path, frames):
+    """프레임 dict → 디스크 캐시(npz)"""
+    np.savez_compressed(path, **frames)
+    print(f"✅ 타임랩스 프레임 저장: {path} ({len(frames['months'])}개월)")
+
+
+def write_timelapse_frames(contract_type='monthly', parts=None):
+    """히스토리 → 타임랩스 프레임 생성/저장 (parts: 월 파티션별로 이미 생성한 프레임 목록)"""
+    if parts is not None:
+        frames = concat_timelapse_frames(parts)
+    else:
+        frames = build_timelapse_frames(load_vfm_history(contract_type))
+    save_timelapse_frames(get_timelapse_path(contract_type), frames)
+    return frames
+
+
+@st.cache_data(show_spinner=False)
+def load_timelapse_frames(contract_type='monthly'):
+    """타임랩스 프레임 로드 (디스크 캐시가 원본보다 최신이면 재사용)"""
+    cache_path = get_timelapse_path(contract_type)
+    source_path = get_data_path(contract_type, 'history')
+
+    if is_artifact_fresh(cache_path, source_path):
+        return read_timelapse_frames(cache_path)
+    return write_timelapse_frames(contract_type)
+
+
+def create_timelapse_map(frames):
+    """타임랩스 프레임 → HeatMapWithTime 지도"""
+    import folium
+    from folium.plugins import HeatMapWithTime
+
+    m = folium.Map(
+        location=[37.5665, 126.9780],
+        zoom_start=11,
+        tiles='CartoDB positron'
+    )
+
+    points = np.column_stack(
+        [frames['lat'], frames['lon'], frames['weight']]).round(5).tolist()
+    offsets = frames['offsets']
+    data = [points[offsets[i]:offsets[i + 1]]
+            for i in range(len(frames['months']))]
+
+    HeatMapWithTime(
+        data,
+        index=frames['months'].tolist(),
+        auto_play=False,
+        min_opacity=0.3,
+        max_opacity=0.8,
+        radius=15,
+        gradient={0.0: 'red', 0.3: 'orange',
+                  0.5: 'yellow', 0.7: 'lime', 1.0: 'green'}
+    ).add_to(m)
+
+    return m
+
+
+@st.cache_resource(show_spinner=False)
+def get_timelapse_map(contract_type='monthly'):
+    """계약 유형별 타임랩스 지도 (1회 구성 후 세션 간 공유)"""
+    return create_timelapse_map(load_timelapse_frames(contract_type))
@@ -0,0 +1,189 @@
+"""
+Trends Module for Seoul Real Estate VFM Analysis
+그리드×평형별 VFM 추세 지표 (최근 12개월 기울기, 12개월 변화율, 변동성)
+- (그리드×평형, 월) 1회 정렬 → 구간 코드 × 월 합성 키로 윈도 시작 위치를 searchsorted로 일괄 조회
+- 윈도 합계는 전체 누적합의 차이 (구간별 Python 루프 없음)
+- 히스토리 기준으로 계산해 load_vfm_data 행 순서 배열로 저장 → 메인 검색에서 컬럼으로 필터/정렬
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.data_loader import (
+    load_vfm_data,
+    iter_history_partitions,
+    get_data_path,
+    get_precomputed_path,
+    is_artifact_fresh
+)
+
+
+TREND_WINDOW_MONTHS = 12
+TREND_MIN_POINTS = 3
+
+TREND_KEYS = ['grid_id', 'size_category', 'year_month']
+TREND_HISTORY_COLUMNS = TREND_KEYS + ['datetime', 'vfm_index']
+TREND_COLUMNS = ['vfm_slope_12m', 'vfm_change_12m', 'vfm_volatility_12m']
+
+TREND_COLUMN_LABELS = {
+    'vfm_slope_12m': 'VFM 추세 기울기 (/월)',
+    'vfm_change_12m': '12개월 VFM 변화율 (%)',
+    'vfm_volatility_12m': 'VFM 변동성 (월간 변화 표준편차)'
+}
+
+# 검색 필터 (추세 기울기 부호 기준)
+TREND_FILTER_LABELS = {
+    'all': '전체',
+    'rising': '📈 상승',
+    'falling': '📉 하락'
+}
+
+
+def window_sums(values, start, stop):
+    """누적합 차이로 [start, stop) 구간 합계 일괄 계산"""
+    cumsum = np.concatenate([[0.0], np.cumsum(values)])
+    return cumsum[stop] - cumsum[start]
+
+
+def build_trend_metrics(df):
+    """
+    VFM 프레임 → 행별 추세 지표 (입력 행 순서, 해당 월 기준 최근 12개월)
+
+    - vfm_slope_12m: 최근 12개월 (월, VFM) 최소제곱 기울기 (VFM/월)
+    - vfm_change_12m: 12개월 전 같은 그리드×평형 대비 VFM 변화율 (%)
+    - vfm_volatility_12m: 최근 12개월 연속 월간 VFM 변화의 표준편차
+    - 관측치가 TREND_MIN_POINTS 미만이거나 12개월 전 값이 없으면 NaN
+
+    Returns:
+    --------
+    dict
+        TREND_COLUMNS별 (N,) float32 배열
+    """
+    n_rows = len(df)
+    metrics = {col: np.full(n_rows, np.nan, dtype=np.float32) for col in TREND_COLUMNS}
+    if n_rows == 0:
+        return metrics
+
+    dates = pd.to_datetime(df['datetime'], errors='coerce')
+    valid = dates.notna().values & df['vfm_index'].notna().values
+    if not valid.any():
+        return metrics
+
+    rows = np.flatnonzero(valid)
+    month = (dates.dt.year.values[valid] * 12 + dates.dt.month.values[valid]).astype(np.int64)
+    month -= month.min()
+    segment = df.loc[valid, ['grid_id', 'size_category']].astype(str).groupby(
+        ['grid_id', 'size_category'], sort=False).ngroup().values.astype(np.int64)
+
+    # 구간 코드 × 월 합성 키 (월 간격이 stride보다 작으므로 윈도가 다른 구간을 넘지 않음)
+    order = np.lexsort((month, segment))
+    stride = month.max() + TREND_WINDOW_MONTHS + 1
+    key = segment[order] * stride + month[order]
+    t = month[order].astype(np.float64)
+    y = df['vfm_index'].to_numpy(dtype=np.float64)[rows[order]]
+
+    n = len(key)
+    stop = np.arange(1, n + 1)
+    start = np.searchsorted(key, key - (TREND_WINDOW_MONTHS - 1), side='left')
+
+    # 최소제곱 기울기: (nΣty - ΣtΣy) / (nΣt² - (Σt)²)
+    count = (stop - start).astype(np.float64)
+    sum_t = window_sums(t, start, stop)
+    sum_y = window_sums(y, start, stop)
+    denom = count * window_sums(t * t, start, stop) - sum_t ** 2
+    enough = (count >= TREND_MIN_POINTS) & (denom > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = np.where(
+            enough, (count * window_sums(t * y, start, stop) - sum_t * sum_y) / denom, np.nan)
+
+    # 12개월 변화율: 합성 키 - 12 위치에 같은 구간의 12개월 전 행이 있으면 비교
+    lag = np.searchsorted(key, key - 12, side='left')
+    lag_found = (lag < n) & (key[np.minimum(lag, n - 1)] == key - 12)
+    lag_value = y[np.minimum(lag, n - 1)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = np.where(lag_found & (lag_value > 0), (y - lag_value) / lag_value * 100, np.nan)
+
+    # 변동성: 직전 월 행과의 변화량 (월 연속일 때만) → 윈도 내 표본 표준편차
+    step = np.zeros(n)
+    step_valid = np.zeros(n, dtype=bool)
+    step_valid[1:] = key[1:] - key[:-1] == 1
+    step[1:] = np.where(step_valid[1:], y[1:] - y[:-1], 0.0)
+    # 윈도 첫 행의 변화량은 윈도 밖 월과의 차이이므로 제외
+    step_start = np.minimum(start + 1, stop)
+    step_count = window_sums(step_valid.astype(np.float64), step_start, stop)
+    step_sum = window_sums(step, step_start, stop)
+    step_sq = window_sums(step * step, step_start, stop)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (step_sq - step_sum ** 2 / step_count) / (step_count - 1)
+    volatility = np.where(step_count >= TREND_MIN_POINTS - 1,
+                          np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+    target = rows[order]
+    metrics['vfm_slope_12m'][target] = slope
+    metrics['vfm_change_12m'][target] = change
+    metrics['vfm_volatility_12m'][target] = volatility
+    return metrics
+
+
+def build_hybrid_trend_metrics(hybrid, history):
+    """
+    히스토리 기준 추세 지표를 hybrid 행 순서로 정렬
+    (그리드, 평형, 월)이 히스토리에 없는 hybrid 행은 히스토리 뒤에 이어붙여 함께 계산
+    """
+    history_keys = pd.MultiIndex.from_frame(history[TREND_KEYS].astype(str))
+    positions = history_keys.get_indexer(
+        pd.MultiIndex.from_frame(hybrid[TREND_KEYS].astype(str)))
+    missing = positions < 0
+
+    combined = pd.concat([history[TREND_HISTORY_COLUMNS],
+                          hybrid.loc[missing, TREND_HISTORY_COLUMNS]], ignore_index=True)
+    positions[missing] = len(history) + np.arange(missing.sum())
+
+    metrics = build_trend_metrics(combined)
+    return {col: values[positions] for col, values in metrics.items()}
+
+
+def attach_trend_columns(df, metrics):
+    """추세 지표 컬럼을 붙인 데이터프레임 반환 (행 수가 다르면 그대로)"""
+    if metrics is None or len(df) != len(metrics[TREND_COLUMNS[0]]):
+        return df
+
+    df = df.copy(deep=False)
+    for col in TREND_COLUMNS:
+        df[col] = metrics[col]
+    return df
+
+
+def get_trend_path(contract_type='monthly'):
+    """추세 지표 경로"""
+    return get_precomputed_path(f'trends_{contract_type}.npz')
+
+
+def write_trend_metrics(contract_type='monthly', parts=None):
+    """
+    히스토리(월 파티션 필요 컬럼만) + hybrid → 추세 지표 생성/저장
+    parts: 이미 읽은 월 파티션 목록 (TREND_HISTORY_COLUMNS만 사용)
+    """
+    if parts is None:
+        parts = iter_history_partitions(contract_type, TREND_HISTORY_COLUMNS)
+    history = pd.concat([part.reindex(columns=TREND_HISTORY_COLUMNS) for part in parts],
+                        ignore_index=True)
+    metrics = build_hybrid_trend_metrics(load_vfm_data(contract_type), history)
+
+    path = get_trend_path(contract_type)
+    np.savez(path, **metrics)
+    rising = int((metrics['vfm_slope_12m'] > 0).sum())
+    print(f"✅ 추세 지표 저장: {path} (상승 {rising:,}/{len(metrics['vfm_slope_12m']):,}건)")
+    return metrics
+
+
+@st.cache_data(show_spinner=False)
+def load_trend_metrics(contract_type='monthly'):
+    """추세 지표 로드 (없거나 hybrid/히스토리 원본보다 오래되면 재생성)"""
+    path = get_trend_path(contract_type)
+    sources = [get_data_path(contract_type, kind) for kind in ('hybrid', 'history')]
+    if all(is_artifact_fresh(path, source) for source in sources):
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+    return write_trend_metrics(contract_type)
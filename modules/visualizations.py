@@ -1,7 +1,6 @@
 
 
 import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import numpy as np
 
@@ -362,7 +361,7 @@ def create_scatter_vfm_price(df, contract_type='monthly'):
     return fig
 
 
-def create_heatmap_correlation(df, features):
+def create_heatmap_correlation(df, features, corr_matrix=None):
     """
     지표 간 상관관계 히트맵
 
@@ -372,6 +371,8 @@ def create_heatmap_correlation(df, features):
         VFM 데이터프레임
     features : list
         상관관계를 볼 지표 리스트
+    corr_matrix : pd.DataFrame, optional
+        사전 계산된 상관계수 행렬 (모멘트 누적값 합산 결과) - 지정 시 df 재계산 생략
 
     Returns:
     --------
@@ -379,7 +380,8 @@ def create_heatmap_correlation(df, features):
         상관관계 히트맵
     """
     # 상관관계 계산
-    corr_matrix = df[features].corr()
+    if corr_matrix is None:
+        corr_matrix = df[features].corr()
 
     fig = go.Figure(data=go.Heatmap(
         z=corr_matrix.values,
@@ -401,3 +403,152 @@ def create_heatmap_correlation(df, features):
     )
 
     return fig
+
+
+def _grid_series_label(grid_id, size_category):
+    """비교 차트 범례 라벨"""
+    return f'{grid_id} ({size_category})'
+
+
+def create_history_overlay_chart(histories, value_col, title, yaxis_title):
+    """
+    여러 그리드의 시계열 겹쳐 그리기 (그리드×평형당 trace 1개)
+
+    Parameters:
+    -----------
+    histories : pd.DataFrame
+        get_grid_histories() 히스토리 (그리드×평형별 연속, 날짜순)
+    value_col : str
+        y축 컬럼
+    title, yaxis_title : str
+        차트 제목 / y축 제목
+
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+        겹침 선 차트
+    """
+    from plotly.colors import qualitative
+
+    palette = qualitative.Dark24
+    fig = go.Figure()
+
+    # 선택 순서대로 1회 순회
+    groups = histories.groupby(['grid_id', 'size_category'], sort=False)
+    for i, ((grid_id, size_category), group) in enumerate(groups):
+        fig.add_trace(go.Scatter(
+            x=group['datetime'],
+            y=group[value_col],
+            mode='lines+markers',
+            name=_grid_series_label(grid_id, size_category),
+            line=dict(color=palette[i % len(palette)], width=2),
+            marker=dict(size=5)
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='날짜',
+        yaxis_title=yaxis_title,
+        hovermode='x unified',
+        template='plotly_white',
+        height=450
+    )
+
+    return fig
+
+
+def create_forecast_overlay_chart(latest_rows, price_label='전환보증금'):
+    """
+    여러 그리드의 AI 예측 경로 (현재 → 3/6/9/12개월) 겹쳐 그리기
+
+    Parameters:
+    -----------
+    latest_rows : pd.DataFrame
+        그리드×평형별 최신 행
+    price_label : str
+        가격 라벨
+
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+        예측 경로 차트
+    """
+    from plotly.colors import qualitative
+
+    palette = qualitative.Dark24
+    horizons = [0, 3, 6, 9, 12]
+    value_cols = ['total_deposit_median', 'pred_3m',
+                  'pred_6m', 'pred_9m', 'pred_12m']
+    values = latest_rows.reindex(columns=value_cols).to_numpy(dtype=float)
+
+    fig = go.Figure()
+    for i, (row, path) in enumerate(zip(latest_rows.itertuples(index=False), values)):
+        if not path[0] > 0:
+            continue
+        # 예측값이 없는 구간은 현재 가격으로 대체 (단일 그리드 화면과 동일)
+        path = np.where(np.isnan(path), path[0], path)
+        fig.add_trace(go.Scatter(
+            x=[row.datetime + pd.DateOffset(months=m) for m in horizons],
+            y=path,
+            mode='lines+markers',
+            name=_grid_series_label(row.grid_id, row.size_category),
+            line=dict(color=palette[i % len(palette)], width=2),
+            marker=dict(size=7)
+        ))
+
+    fig.update_layout(
+        title='AI 예측 경로 비교 (3/6/9/12개월)',
+        xaxis_title='날짜',
+        yaxis_title=f'예측 {price_label} (만원)',
+        template='plotly_white',
+        height=450
+    )
+
+    return fig
+
+
+def create_grouped_radar_chart(latest_rows, labels, keys):
+    """
+    여러 그리드의 입지 지표 레이더 겹쳐 그리기
+
+    Parameters:
+    -----------
+    latest_rows : pd.DataFrame
+        그리드×평형별 최신 행
+    labels : list
+        축 라벨
+    keys : list
+        입지 지표 컬럼 (labels 순서)
+
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+        그룹 레이더 차트
+    """
+    from plotly.colors import qualitative
+
+    palette = qualitative.Dark24
+    values = latest_rows.reindex(columns=keys).fillna(0).to_numpy(dtype=float)
+    theta = labels + [labels[0]]
+
+    fig = go.Figure()
+    for i, (grid_id, size_category, scores) in enumerate(
+            zip(latest_rows['grid_id'], latest_rows['size_category'], values)):
+        fig.add_trace(go.Scatterpolar(
+            r=np.append(scores, scores[0]),  # 닫힌 도형
+            theta=theta,
+            name=_grid_series_label(grid_id, size_category),
+            line=dict(color=palette[i % len(palette)], width=2),
+            opacity=0.8
+        ))
+
+    max_value = values.max() if values.size else 0
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[
+                   0, max_value * 1.2 if max_value > 0 else 0.1])),
+        title='입지 지표 비교',
+        template='plotly_white',
+        height=500
+    )
+
+    return fig
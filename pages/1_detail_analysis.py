@@ -3,11 +3,34 @@ Detail Analysis Page
 Version 13.0.0 - 입지 지표 5개 + 총점, 월세 전환보증금 표시
 """
 
+import time
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from modules.data_loader import load_vfm_data
+from modules.data_loader import (
+    load_vfm_data,
+    load_similarity_index,
+    find_similar_grids
+)
+from modules.aggregates import load_district_stats, get_district_benchmark
+from modules.sketches import (
+    load_quantile_sketches,
+    sketch_quantiles_by_month,
+    SKETCH_POINTS
+)
+from modules.comparison import (
+    load_history_index,
+    get_grid_histories,
+    list_index_grids,
+    COMPARISON_MAX_GRIDS
+)
+from modules.visualizations import (
+    create_comparison_bar_chart,
+    create_history_overlay_chart,
+    create_forecast_overlay_chart,
+    create_grouped_radar_chart
+)
 
 st.set_page_config(page_title="상세 분석", page_icon="📊", layout="wide")
 
@@ -19,6 +42,11 @@ with st.sidebar:
         ['monthly', 'jeonse'],
         format_func=lambda x: '월세 (전환보증금)' if x == 'monthly' else '전세'
     )
+    view_mode = st.radio(
+        "보기 방식",
+        ['single', 'compare'],
+        format_func=lambda x: '단일 그리드' if x == 'single' else f'그리드 비교 (최대 {COMPARISON_MAX_GRIDS}개)'
+    )
 
 # 데이터 로드
 
@@ -34,28 +62,114 @@ if df.empty:
     st.error("데이터가 없습니다.")
     st.stop()
 
+# 그리드×평형 히스토리 인덱스 (선택 시 전체 데이터 재스캔 없이 구간 조회)
+history_index = load_history_index(contract_type)
+
+# 가격 라벨 설정
+if contract_type == 'monthly':
+    price_label = '전환보증금'
+    price_note = '※ 월세를 보증금으로 전환한 금액'
+else:
+    price_label = '전세가'
+    price_note = ''
+
+infra_labels = ['교통', '편의', '환경', '의료', '안전']
+infra_keys = ['trans_index', 'conv_index', 'env_index',
+              'hospital_index', 'safety_score_scaled']
+districts = sorted(df['district'].unique())
+
+# 그리드 비교 모드
+if view_mode == 'compare':
+    st.title("📊 그리드 비교 분석")
+
+    compare_districts = st.multiselect(
+        "구 선택 (비우면 전체)", districts)
+    compare_options = [
+        pair for district in (compare_districts or [None])
+        for pair in list_index_grids(history_index, district)
+    ]
+    selected_pairs = st.multiselect(
+        f"비교할 그리드 × 평형 (최대 {COMPARISON_MAX_GRIDS}개)",
+        compare_options,
+        format_func=lambda pair: f"{pair[0]} ({pair[1]})",
+        max_selections=COMPARISON_MAX_GRIDS
+    )
+
+    if not selected_pairs:
+        st.info("비교할 그리드를 선택해주세요.")
+        st.stop()
+
+    # 선택한 전체 그리드 히스토리를 인덱스 조회 1회로 일괄 추출
+    lookup_start = time.perf_counter()
+    compare_df, compare_latest = get_grid_histories(
+        history_index, selected_pairs)
+    lookup_ms = (time.perf_counter() - lookup_start) * 1000
+    st.caption(
+        f"그리드 {len(compare_latest)}개 히스토리 {len(compare_df):,}건 일괄 조회 ({lookup_ms:.1f}ms)")
+
+    st.dataframe(
+        compare_latest[['grid_id', 'district', 'size_category', 'year_month',
+                        'custom_vfm', 'total_deposit_median', 'price_change_pct']].rename(columns={
+            'grid_id': '그리드 ID',
+            'district': '구',
+            'size_category': '평형',
+            'year_month': '최신 월',
+            'custom_vfm': 'VFM 지수',
+            'total_deposit_median': f'{price_label} (만원)',
+            'price_change_pct': '12개월 예측 변화율 (%)'
+        }).style.format({
+            'VFM 지수': '{:.3f}',
+            f'{price_label} (만원)': '{:,.0f}',
+            '12개월 예측 변화율 (%)': '{:+.1f}'
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+    if contract_type == 'monthly':
+        st.caption(price_note)
+
+    tab1, tab2, tab3, tab4 = st.tabs(["가격 추이", "VFM 추이", "예측 경로", "입지 레이더"])
+    with tab1:
+        st.plotly_chart(create_history_overlay_chart(
+            compare_df, 'total_deposit_median', f"{price_label} 변동 추이 비교", f"{price_label} (만원)"),
+            use_container_width=True)
+    with tab2:
+        fig_vfm = create_history_overlay_chart(
+            compare_df, 'custom_vfm', "VFM 지수 변화 비교", "VFM 지수")
+        fig_vfm.add_hline(y=1.0, line_dash="dash",
+                          line_color="red", annotation_text="기준점 (1.0)")
+        st.plotly_chart(fig_vfm, use_container_width=True)
+    with tab3:
+        st.plotly_chart(create_forecast_overlay_chart(
+            compare_latest, price_label), use_container_width=True)
+    with tab4:
+        st.plotly_chart(create_grouped_radar_chart(
+            compare_latest, infra_labels, infra_keys), use_container_width=True)
+    st.stop()
+
 # 메인 화면
 st.title("📊 상세 시계열 분석")
 
 # 1. 필터링
 col1, col2, col3 = st.columns(3)
 with col1:
-    districts = sorted(df['district'].unique())
     selected_district = st.selectbox("구 선택", districts)
 
-# 구 선택 후 그리드 필터링
-grid_options = df[df['district'] == selected_district]['grid_id'].unique()
+# 구 선택 후 그리드 필터링 (인덱스 키 기준)
+district_pairs = list_index_grids(history_index, selected_district)
+grid_options = list(dict.fromkeys(grid_id for grid_id, _ in district_pairs))
 with col2:
     selected_grid = st.selectbox("그리드 ID 선택", grid_options)
 
 # 평형 필터링
 with col3:
-    size_options = df[df['grid_id'] == selected_grid]['size_category'].unique()
+    size_options = [size for grid_id,
+                    size in district_pairs if grid_id == selected_grid]
     selected_size = st.selectbox("평형 선택", size_options)
 
 # 2. 선택된 그리드의 히스토리 데이터 추출
-history_df = df[(df['grid_id'] == selected_grid) & (
-    df['size_category'] == selected_size)].sort_values('datetime')
+history_df, _ = get_grid_histories(
+    history_index, [(selected_grid, selected_size)])
 
 if history_df.empty:
     st.warning("선택한 그리드의 데이터가 없습니다.")
@@ -64,14 +178,6 @@ if history_df.empty:
 # 최신 데이터 가져오기
 latest_row = history_df.iloc[-1]
 
-# 가격 라벨 설정
-if contract_type == 'monthly':
-    price_label = '전환보증금'
-    price_note = '※ 월세를 보증금으로 전환한 금액'
-else:
-    price_label = '전세가'
-    price_note = ''
-
 # 3. 상세 정보 카드
 st.markdown("### 📍 현재 상태 (Latest)")
 c1, c2, c3, c4 = st.columns(4)
@@ -93,7 +199,6 @@ infra_col1, infra_col2 = st.columns([1, 1])
 
 with infra_col1:
     # 레이더 차트용 데이터
-    infra_labels = ['교통', '편의', '환경', '의료', '안전']
     infra_values = [
         latest_row.get('trans_index', 0),
         latest_row.get('conv_index', 0),
@@ -134,6 +239,61 @@ with infra_col2:
     | 🛡️ 안전 | {latest_row.get('safety_score_scaled', 0):.4f} |
     """)
 
+# 구 평균 대비 입지 지표 (사전 계산 벤치마크, 최신 월 기준)
+district_stats = load_district_stats(contract_type)
+district_benchmark = get_district_benchmark(
+    district_stats, selected_district, selected_size)
+
+if not district_benchmark.empty:
+    latest_month = latest_row.get('year_month')
+    if latest_month in district_benchmark.index:
+        benchmark_row = district_benchmark.loc[latest_month]
+    else:
+        benchmark_row = district_benchmark.iloc[-1]
+
+    fig_compare = create_comparison_bar_chart(
+        {label: latest_row.get(key, 0)
+         for label, key in zip(infra_labels, infra_keys)},
+        {label: benchmark_row[f'{key}_mean']
+         for label, key in zip(infra_labels, infra_keys)}
+    )
+    fig_compare.update_layout(
+        title=f'입지 지표: 선택 그리드 vs {selected_district} {selected_size} 평균 ({benchmark_row.name})')
+    st.plotly_chart(fig_compare, use_container_width=True)
+
+st.markdown("---")
+
+# 4-1. 비슷한 입지의 더 높은 VFM 그리드 (k-NN)
+st.subheader("🔍 비슷한 입지, 더 높은 VFM")
+
+similarity_index = load_similarity_index(contract_type)
+search_start = time.perf_counter()
+similar_df = find_similar_grids(
+    similarity_index, selected_grid, selected_size, k=10)
+search_ms = (time.perf_counter() - search_start) * 1000
+
+if similar_df.empty:
+    st.info("이 그리드보다 VFM이 높은 유사 그리드가 없습니다.")
+else:
+    st.caption(
+        f"입지 지표 5개 + {price_label} 수준이 가까운 같은 평형 그리드 {len(similar_df)}개 (검색 {search_ms:.1f}ms)")
+    st.dataframe(
+        similar_df.rename(columns={
+            'grid_id': '그리드 ID',
+            'district': '구',
+            'size_category': '평형',
+            'custom_vfm': 'VFM 지수',
+            'total_deposit_median': f'{price_label} (만원)',
+            'distance': '거리 (작을수록 유사)'
+        }).style.format({
+            'VFM 지수': '{:.3f}',
+            f'{price_label} (만원)': '{:,.0f}',
+            '거리 (작을수록 유사)': '{:.3f}'
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
 st.markdown("---")
 
 # 5. AI 예측 정보
@@ -172,7 +332,7 @@ st.markdown("---")
 # 6. 차트
 st.subheader("📈 시계열 트렌드")
 
-tab1, tab2, tab3 = st.tabs(["가격 추이", "VFM 추이", "예측 비교"])
+tab1, tab2, tab3, tab4 = st.tabs(["가격 추이", "VFM 추이", "예측 비교", "구 대비"])
 
 with tab1:
     fig = go.Figure()
@@ -273,6 +433,76 @@ with tab3:
         )
         st.plotly_chart(fig_pred, use_container_width=True)
 
+with tab4:
+    # 선택 그리드 vs 구 월별 분위수 밴드 (사전 계산 분위수 스케치 합집합 조회)
+    band_col1, band_col2 = st.columns(2)
+    with band_col1:
+        band = st.radio("분위수 구간", [(0.25, 0.75), (0.1, 0.9), (0.05, 0.95)],
+                        format_func=lambda b: f"{b[0] * 100:.0f}~{b[1] * 100:.0f}%",
+                        horizontal=True)
+    with band_col2:
+        band_scope = st.radio("비교 평형", ['selected', 'all'],
+                              format_func=lambda x: f"{selected_size}만" if x == 'selected' else "전체 평형",
+                              horizontal=True)
+
+    sketches = load_quantile_sketches(contract_type)
+    band_sizes = [selected_size] if band_scope == 'selected' else None
+    band_label = f"{selected_district} {selected_size if band_sizes else '전체 평형'}"
+
+    for value_col, value_label in [('custom_vfm', 'VFM 지수'),
+                                   ('total_deposit_median', f'{price_label} (만원)')]:
+        band_start = time.perf_counter()
+        band_df = sketch_quantiles_by_month(
+            sketches, value_col, [band[0], 0.5, band[1]], [selected_district], band_sizes)
+        band_ms = (time.perf_counter() - band_start) * 1000
+        if band_df.empty:
+            st.info("구별 분위수 데이터가 없습니다.")
+            break
+
+        bench_dates = pd.to_datetime(band_df.index + '-01', errors='coerce')
+        fig_bench = go.Figure()
+        fig_bench.add_trace(go.Scatter(
+            x=bench_dates,
+            y=band_df[band[1]],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig_bench.add_trace(go.Scatter(
+            x=bench_dates,
+            y=band_df[band[0]],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(118, 75, 162, 0.15)',
+            name=f'{band_label} {band[0] * 100:.0f}~{band[1] * 100:.0f}%'
+        ))
+        fig_bench.add_trace(go.Scatter(
+            x=bench_dates,
+            y=band_df[0.5],
+            mode='lines',
+            line=dict(color='#764ba2', dash='dash', width=2),
+            name=f'{band_label} 중앙값'
+        ))
+        fig_bench.add_trace(go.Scatter(
+            x=history_df['datetime'],
+            y=history_df[value_col],
+            mode='lines+markers',
+            line=dict(color='#667eea', width=2),
+            name=f'선택 그리드 ({selected_grid})'
+        ))
+        fig_bench.update_layout(
+            title=f"{value_label}: 선택 그리드 vs {band_label}",
+            xaxis_title="날짜",
+            yaxis_title=value_label,
+            height=400,
+            plot_bgcolor='white',
+            paper_bgcolor='white'
+        )
+        st.plotly_chart(fig_bench, use_container_width=True)
+        st.caption(f"근사 분위수 {len(band_df)}개월 조회 {band_ms:.1f}ms (순위 오차 최대 ±{100 / SKETCH_POINTS:.1f}%p)")
+
 # 7. 데이터 테이블
 with st.expander("📄 히스토리 데이터 보기"):
     display_cols = ['datetime', 'grid_id', 'district', 'size_category',